@@ -63,6 +63,8 @@ REMOTE_EXECUTABLE=start.sh
 LOCAL_LAUNCHER_PATH=launcher
 LAUNCHER_SVC_FILE=launcher.service
 LAUNCHER_EXECUTABLE=start.sh
+RELAY_SVC_FILE=relay.service
+RELAY_EXECUTABLE=relay.sh
 GENERATED_PATH=generated
 BUILD_PATH="red_builds/${LOCAL_REMOTE_PATH}"
 
@@ -141,7 +143,7 @@ cp -r "${LOCAL_REMOTE_PATH}/${GENERATED_PATH}" "${LOCAL_LAUNCHER_PATH}/"
 # Copy remote to game server
 echo "Deploying remote to game server..." >&2
 ssh "${GAME_SVR_HOST}" "mkdir -p \"${GAME_SVR_REMOTE}\""
-rsync -trph \
+rsync -trphL \
     --exclude '.*' \
     --exclude 'build.sh' \
     --exclude 'proto/' \
@@ -153,7 +155,7 @@ complete_setup "${GAME_SVR_HOST}" "${GAME_SVR_REMOTE}" "${REMOTE_SVC_FILE}" "${R
 # Copy launcher to control server
 echo "Deploying launcher to control server..." >&2
 ssh "${CONTROL_SVR_HOST}" "mkdir -p \"${CONTROL_SVR_PATH}\""
-rsync -trph \
+rsync -trphL \
     --exclude '.*' \
     --exclude '*.db' \
     --exclude '*.example' \
@@ -162,3 +164,9 @@ rsync -trph \
     "${CONTROL_SVR_HOST}:${CONTROL_SVR_PATH}/"
 
 complete_setup "${CONTROL_SVR_HOST}" "${CONTROL_SVR_PATH}" "${LAUNCHER_SVC_FILE}" "${LAUNCHER_EXECUTABLE}"
+
+# Frame relay runs next to the launcher, if configured
+if [ "`yq e '.control_server.frame_relay' deploy.yaml`" != "null" ]; then
+    echo "Setting up frame relay on control server..." >&2
+    complete_setup "${CONTROL_SVR_HOST}" "${CONTROL_SVR_PATH}" "${RELAY_SVC_FILE}" "${RELAY_EXECUTABLE}"
+fi
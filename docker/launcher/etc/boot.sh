@@ -16,9 +16,6 @@
 
 # Start HTTP server in the foreground
 exec gunicorn \
+    -c gunicorn.conf.py \
     -b :${HTTP_PORT} \
-    --access-logfile - \
-    --error-logfile - \
-    --worker-class eventlet \
-    -w 1 \
     launcher:app
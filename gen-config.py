@@ -18,6 +18,83 @@ import argparse
 import sys
 import yaml
 
+DEFAULT_SUBJECT_PREFIX = "red"
+DEFAULT_SOCKET_PATH = "/tmp/red-remote.sock"
+TRANSPORT_KEYS = [ 'transport', 'socket_path' ]
+
+def cabinet_configs(config):
+    # Cabinets with defaults filled in, so launcher and remotes agree on
+    # subjects without having to share defaults
+    return [
+        {
+            'id': cabinet['id'],
+            'name': cabinet.get('name', cabinet['id']),
+            'subject_prefix': cabinet.get('subject_prefix', f"{DEFAULT_SUBJECT_PREFIX}.{cabinet['id']}"),
+            'nats_url': cabinet.get('nats_url', config['common']['nats_url']),
+            **{ key: cabinet[key] for key in TRANSPORT_KEYS if key in cabinet },
+        } for cabinet in config.get('cabinets', [])
+    ]
+
+def parse_rect(value):
+    # x1,y1-x2,y2, as sub takes it
+    start, end = value.split('-')
+    return [ int(v) for v in start.split(',') + end.split(',') ]
+
+def frame_relay_config(config):
+    # Regions for the frame relay, rects given as sub takes them
+    frame_relay = dict(config['control_server']['frame_relay'])
+    frame_relay['regions'] = [
+        {
+            **region,
+            'rect': parse_rect(region['rect']),
+            **({ 'content': parse_rect(region['content']) } if 'content' in region else {}),
+        } for region in frame_relay.get('regions', [])
+    ]
+    return frame_relay
+
+def subscriber_regions(config, subject_prefix):
+    # Regions of the display shown by each subscriber on a subject
+    # prefix, for the launcher's LED power estimates
+    relayed = {}
+    if 'frame_relay' in config['control_server']:
+        relayed = { region['name']: region for region in frame_relay_config(config)['regions'] }
+    regions = []
+    for subscriber in config.get('subscribers', []):
+        args = [ arg for arg in subscriber.get('args', '').split() if arg != '\\' ]
+        options = {}
+        for i, arg in enumerate(args):
+            name, eq, value = arg.partition('=')
+            options[name] = value if eq else (args[i + 1] if i + 1 < len(args) else '')
+        if options.get('--subject-prefix', options.get('-sp', DEFAULT_SUBJECT_PREFIX)) != subject_prefix:
+            continue
+        if relay_region := relayed.get(options.get('--region', options.get('-rg'))):
+            # Relayed frames are already cropped; the relay knows the rects
+            region = {
+                'name': subscriber['hostname'],
+                'rect': relay_region['rect'],
+            }
+            if 'content' in relay_region:
+                region['content'] = relay_region['content']
+        elif rect := options.get('--src-rect', options.get('-sr')):
+            region = {
+                'name': subscriber['hostname'],
+                'rect': parse_rect(rect),
+            }
+            if content := options.get('--content-rect', options.get('-cr')):
+                region['content'] = parse_rect(content)
+        else:
+            continue
+        if brightness := options.get('--led-brightness'):
+            region['brightness'] = int(brightness)
+        regions.append(region)
+    return regions
+
+def led_power_config(config, subject_prefix):
+    led_power = dict(config['control_server']['led_power'])
+    if 'regions' not in led_power and (regions := subscriber_regions(config, subject_prefix)):
+        led_power['regions'] = regions
+    return led_power
+
 def write_remote_config(platform_config_path):
     with open(platform_config_path, 'r') as f:
         config = yaml.safe_load(f)
@@ -27,6 +104,16 @@ def write_remote_config(platform_config_path):
         'nats_url': config['common']['nats_url'],
         'platforms': config['game_server']['platforms'],
     }
+    if cabinets := cabinet_configs(config):
+        output_doc['cabinets'] = cabinets
+    if 'cabinet' in config['game_server']:
+        output_doc['cabinet'] = config['game_server']['cabinet']
+    for key in [ 'idle_after', 'active_after', 'idle_threshold' ]:
+        if key in config['game_server']:
+            output_doc[key] = config['game_server'][key]
+    if config['control_server'].get('transport') == 'socket':
+        # Launcher on the same host; listen for it on a socket
+        output_doc['socket_path'] = config['control_server'].get('socket_path', DEFAULT_SOCKET_PATH)
 
     yaml.safe_dump(output_doc, sys.stdout)
 
@@ -61,6 +148,25 @@ def write_launcher_config(platform_config_path):
             'flask_config': config['control_server']['flask_config'],
         },
     }
+    for key in [ 'state_max_age', 'frame_tap', 'frame_monitor', 'frame_cadence', *TRANSPORT_KEYS ]:
+        if key in config['control_server']:
+            out_config['game_server'][key] = config['control_server'][key]
+    if 'remote_requests' in config['control_server']:
+        out_config['remote_requests'] = config['control_server']['remote_requests']
+    for key in [ 'image_workers', 'image_queue' ]:
+        if key in config['control_server']:
+            out_config['control_server'][key] = config['control_server'][key]
+    if config['control_server'].get('transport') == 'inprocess':
+        out_config['game_server']['remote_path'] = config['game_server']['remote_path']
+    if 'led_power' in config['control_server']:
+        out_config['game_server']['led_power'] = led_power_config(config, DEFAULT_SUBJECT_PREFIX)
+    if 'frame_relay' in config['control_server']:
+        out_config['game_server']['frame_relay'] = frame_relay_config(config)
+    if cabinets := cabinet_configs(config):
+        if 'led_power' in config['control_server']:
+            for cabinet in cabinets:
+                cabinet['led_power'] = led_power_config(config, cabinet['subject_prefix'])
+        out_config['game_server']['cabinets'] = cabinets
 
     yaml.safe_dump(out_config, sys.stdout)
 
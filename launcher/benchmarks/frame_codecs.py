@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Compression ratio, throughput and per-frame time of candidate frame
+# codecs, over frames recorded with frame_capture.py. Results are per
+# title (one capture each) and pixel format. "lz4" is what pub sends
+# today; "xor+" codecs compress the XOR of each frame with the one
+# before it, which is all zeroes wherever the screen didn't change. KB/s
+# is the bandwidth one subscriber would need at the capture's frame rate.
+# zstd codecs need the zstandard package. Run from the launcher directory
+# with, e.g.:
+#
+#   python3 -m benchmarks.frame_codecs sf2.frc galaga=captures/galaga.frc
+
+import argparse
+import frame_capture as fc
+import frames
+import lz4.block
+import numpy as np
+import os
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+class Codec:
+
+    # compress(data) and decompress(data, size) of one frame's pixels.
+    # With delta, each frame is compressed as its XOR with the previous
+    # one, unless it is the first or its size changed.
+
+    def __init__(self, name, compress, decompress, delta=False):
+        self.name = name
+        self.compress = compress
+        self.decompress = decompress
+        self.delta = delta
+
+def lz4_codec(name, delta=False, **params):
+    return Codec(
+        name,
+        lambda data: lz4.block.compress(data, store_size=False, **params),
+        lambda data, size: lz4.block.decompress(data, uncompressed_size=size),
+        delta,
+    )
+
+def zstd_codec(name, level, delta=False):
+    compressor = zstandard.ZstdCompressor(level=level)
+    decompressor = zstandard.ZstdDecompressor()
+    return Codec(
+        name,
+        compressor.compress,
+        lambda data, size: decompressor.decompress(data, max_output_size=size),
+        delta,
+    )
+
+def codecs():
+    # pub compresses with LZ4_compress_fast at acceleration 4
+    candidates = [
+        lz4_codec('lz4', mode='fast', acceleration=4),
+        lz4_codec('lz4-accel1', mode='fast', acceleration=1),
+        lz4_codec('lz4hc-3', mode='high_compression', compression=3),
+        lz4_codec('lz4hc-9', mode='high_compression', compression=9),
+        lz4_codec('xor+lz4', delta=True, mode='fast', acceleration=4),
+        lz4_codec('xor+lz4hc-3', delta=True, mode='high_compression', compression=3),
+    ]
+    if zstandard:
+        candidates += [
+            zstd_codec('zstd-1', 1),
+            zstd_codec('zstd-3', 3),
+            zstd_codec('xor+zstd-1', 1, delta=True),
+        ]
+    return candidates
+
+def xor(a, b):
+    return np.bitwise_xor(np.frombuffer(a, np.uint8), np.frombuffer(b, np.uint8)).tobytes()
+
+class Result:
+
+    def __init__(self, raw_bytes, encoded_bytes, encode_times, decode_times):
+        self.raw_bytes = raw_bytes
+        self.encoded_bytes = encoded_bytes
+        self.encode_times = np.array(encode_times)
+        self.decode_times = np.array(decode_times)
+
+def run(codec, pixels):
+    # Compresses and decompresses the frames in order, as pub and sub
+    # would, checking that every frame comes back intact
+    encoded = []
+    encode_times = []
+    previous = None
+    for frame in pixels:
+        started = time.perf_counter()
+        if codec.delta and previous is not None and len(previous) == len(frame):
+            data = codec.compress(xor(frame, previous))
+        else:
+            data = codec.compress(frame)
+        encode_times.append(time.perf_counter() - started)
+        encoded.append(data)
+        previous = frame
+
+    decode_times = []
+    previous = None
+    for frame, data in zip(pixels, encoded):
+        started = time.perf_counter()
+        decoded = codec.decompress(data, len(frame))
+        if codec.delta and previous is not None and len(previous) == len(frame):
+            decoded = xor(decoded, previous)
+        decode_times.append(time.perf_counter() - started)
+        if decoded != frame:
+            raise AssertionError(f"{codec.name}: frame did not survive a round trip")
+        previous = decoded
+
+    return Result(
+        sum(len(frame) for frame in pixels),
+        sum(len(data) for data in encoded),
+        encode_times,
+        decode_times,
+    )
+
+def load(path, limit):
+    # Decompressed pixels of the first frames of a capture, by pixel
+    # format, and the capture's frame rate
+    pixels = {}
+    with fc.CaptureReader(path) as reader:
+        count = min(len(reader), limit) if limit else len(reader)
+        for i in range(count):
+            header, frame = frames.parse(reader[i])
+            pixels.setdefault(header.pixel_format, []).append(frame)
+        fps = (count - 1) / (reader.index['time_us'][count - 1] / 1e6) if count > 1 else 0
+    return pixels, fps
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("captures", help="Capture files, as path or title=path", nargs='+')
+    parser.add_argument("--frames", "-n", help="Frames to use from each capture (default: 600; 0 for all)", type=int, default=600)
+    parser.add_argument("--codecs", "-c", help="Comma-separated codecs to run (default: all)")
+    args = parser.parse_args()
+
+    candidates = codecs()
+    if args.codecs:
+        names = args.codecs.split(',')
+        if unknown := set(names) - { codec.name for codec in candidates }:
+            parser.error(f"Unknown codec(s): {', '.join(sorted(unknown))}")
+        candidates = [ codec for codec in candidates if codec.name in names ]
+    if not zstandard:
+        print("zstandard not installed; skipping zstd codecs")
+
+    pf_names = {
+        frames.PF_RGB565: 'RGB565',
+        frames.PF_RGBA8888: 'RGBA8888',
+        frames.PF_RGBA5551: 'RGBA5551',
+        frames.PF_ARGB8888: 'ARGB8888',
+    }
+    print(f"{'title':<12} {'format':<9} {'codec':<12} {'ratio':>6} {'KB/frame':>9} {'KB/s':>8} "
+        f"{'enc MB/s':>9} {'dec MB/s':>9} {'enc p50/p99 ms':>15} {'dec p50/p99 ms':>15}")
+    for capture in args.captures:
+        title, _, path = capture.rpartition('=')
+        title = title or os.path.splitext(os.path.basename(path))[0]
+        by_format, fps = load(path, args.frames)
+        for pixel_format, pixels in by_format.items():
+            for codec in candidates:
+                result = run(codec, pixels)
+                per_frame = result.encoded_bytes / len(pixels) / 1024
+                print(f"{title:<12} {pf_names.get(pixel_format, pixel_format):<9} {codec.name:<12} "
+                    f"{result.raw_bytes / result.encoded_bytes:6.2f} {per_frame:9.1f} {per_frame * fps:8.0f} "
+                    f"{result.raw_bytes / result.encode_times.sum() / 1e6:9.0f} "
+                    f"{result.raw_bytes / result.decode_times.sum() / 1e6:9.0f} "
+                    f"{np.percentile(result.encode_times, 50) * 1e3:7.2f}/{np.percentile(result.encode_times, 99) * 1e3:<7.2f} "
+                    f"{np.percentile(result.decode_times, 50) * 1e3:7.2f}/{np.percentile(result.decode_times, 99) * 1e3:<7.2f}")
+
+if __name__ == '__main__':
+    main()
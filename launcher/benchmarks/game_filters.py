@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Per-request cost of /games over a generated catalog: the bitset index
+# in config.GameConfig versus the per-game scan it replaced, which it
+# must agree with. Run from the launcher directory with:
+# python3 -m benchmarks.game_filters
+
+import argparse
+import config
+import json
+import os
+import random
+import tempfile
+import timeit
+import yaml
+
+TAGS = [ f"tag{i}" for i in range(40) ]
+GENRES = [ "Action", "Fighting", "Platformer", "Puzzle", "Racing", "Shooter", "Sports" ]
+SERIES = [ f"Series {i}" for i in range(200) ]
+SYSTEMS = [ "arcade", "snes", "genesis", "pce", "neogeo" ]
+WORDS = [ "super", "street", "fighter", "star", "dragon", "force", "world", "zero", "legend", "blast" ]
+
+def generate(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            'title_id': f"game{i}",
+            'app_id': rng.choice([ "fbneo", "snes9x", "genesis_plus_gx" ]),
+            'title': f"{' '.join(rng.sample(WORDS, 3)).title()} {i}",
+            'tags': rng.sample(TAGS, rng.randint(0, 4)),
+            'genres': rng.sample(GENRES, rng.randint(1, 2)),
+            'series': rng.sample(SERIES, 1) if rng.random() < 0.3 else [],
+            'orientation': rng.choice([ "landscape", "portrait" ]),
+            'system': rng.choice(SYSTEMS),
+        } for i in range(count)
+    ]
+
+def legacy_games(konfig, search="", filter_map={}):
+    all_games = konfig.game_map.values()
+    if not (search or filter_map):
+        return sorted([ game.as_dict() for game in all_games ], key=lambda x: x['title'].lower())
+
+    filtered_games = []
+    for game in all_games:
+        if search and search.lower() not in game.title.lower():
+            continue
+        filter_match = True
+        for (k, v_list) in filter_map.items():
+            filters = set(v_list)
+            if k == 't' and filters.intersection(set(game.tags)) != filters:
+                filter_match = False
+                break
+            elif k == 'o' and filters != { game.orientation }:
+                filter_match = False
+                break
+            elif k == 'p' and filters != { game.app_id }:
+                filter_match = False
+                break
+            elif k == 'g' and filters.intersection(set(game.genres)) != filters:
+                filter_match = False
+                break
+            elif k == 's' and filters.intersection(set(game.series)) != filters:
+                filter_match = False
+                break
+            elif k == 'y' and filters != { game.system }:
+                filter_match = False
+                break
+        if filter_match:
+            filtered_games.append(game)
+
+    return sorted([ game.as_dict() for game in filtered_games ], key=lambda x: x['title'].lower())
+
+def agree(konfig, search="", filter_map={}):
+    # Whether the index returns what the scan did, as /games sends it
+    results = konfig.games(search=search, filter_map=filter_map)
+    return json.dumps(results) == json.dumps(legacy_games(konfig, search=search, filter_map=filter_map))
+
+def random_queries(count, seed=0):
+    # Several values per key, as the UI sends for multi-select filters,
+    # plus values and keys that match nothing
+    rng = random.Random(seed)
+    values = {
+        't': TAGS + [ "tag?" ],
+        'g': GENRES + [ "Genre?" ],
+        's': SERIES[:5] + [ "Series?" ],
+        'o': [ "landscape", "portrait" ],
+        'p': [ "fbneo", "snes9x", "genesis_plus_gx" ],
+        'y': SYSTEMS,
+        'x': [ "unknown" ],
+    }
+    for _ in range(count):
+        filter_map = {
+            key: rng.sample(values[key], rng.randint(1, min(3, len(values[key]))))
+            for key in rng.sample(list(values), rng.randint(1, 3))
+        }
+        yield rng.choice([ "", "", "star", "o" ]), filter_map
+
+QUERIES = [
+    ("everything", "", {}),
+    ("one genre", "", { 'g': [ "Shooter" ] }),
+    ("two genres", "", { 'g': [ "Action", "Shooter" ] }),
+    ("system + orientation", "", { 'y': [ "arcade" ], 'o': [ "portrait" ] }),
+    ("two tags", "", { 't': [ "tag1", "tag2" ] }),
+    ("tags + genres", "", { 't': [ "tag1", "tag2" ], 'g': [ "Action", "Shooter" ] }),
+    ("search", "dragon", {}),
+    ("search + genre", "star", { 'g': [ "Fighting" ] }),
+    ("no match", "", { 'o': [ "landscape", "portrait" ] }),
+]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", "-g", help="Titles in the catalog (default: 20000)", type=int, default=20000)
+    parser.add_argument("--iterations", "-n", help="Calls per measurement (default: 20)", type=int, default=20)
+    parser.add_argument("--repeat", "-r", help="Measurements to take the best of (default: 3)", type=int, default=3)
+    parser.add_argument("--check", "-c", help="Random queries to check the index against the scan with (default: 500)", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile('w', suffix='.yaml', delete=False) as fd:
+        yaml.safe_dump(generate(args.games), fd)
+    try:
+        konfig = config.GameConfig(fd.name)
+    finally:
+        os.unlink(fd.name)
+    # Parsing the YAML takes far longer; that is the same either way
+    best = min(timeit.repeat(konfig._build_index, number=1, repeat=args.repeat))
+    print(f"indexed {args.games} games in {best * 1000:.0f} ms")
+
+    for search, filter_map in random_queries(args.check):
+        if not agree(konfig, search=search, filter_map=filter_map):
+            raise SystemExit(f"{search!r} {filter_map}: index and scan disagree")
+    print(f"index and scan agree on {args.check} random queries")
+
+    for name, search, filter_map in QUERIES:
+        if not agree(konfig, search=search, filter_map=filter_map):
+            raise SystemExit(f"{name}: index and scan disagree")
+        results = konfig.games(search=search, filter_map=filter_map)
+        timings = []
+        for fn in [ legacy_games, config.GameConfig.games ]:
+            best = min(timeit.repeat(lambda: fn(konfig, search=search, filter_map=filter_map), number=args.iterations, repeat=args.repeat))
+            timings.append(best / args.iterations * 1000)
+        print(f"{name:<22} {len(results):6} games  scan {timings[0]:8.2f} ms  index {timings[1]:8.2f} ms")
+
+if __name__ == '__main__':
+    main()
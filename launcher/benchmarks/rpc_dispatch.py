@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Per-call overhead of resolving RPC methods: the static table in rpc.py
+# versus the regex/importlib lookup it replaced. Run from the launcher
+# directory with: python3 -m benchmarks.rpc_dispatch
+
+from generated.common_pb2 import LaunchId
+from generated.responses_pb2 import Result
+import argparse
+import generated.requests_pb2 as requests
+import generated.responses_pb2 as responses
+import importlib
+import re
+import rpc
+import timeit
+
+REQUEST = requests.SwitchRequest(
+    launch_id=LaunchId(
+        app_id="fbneo",
+        title_id="sf2",
+    ),
+)
+RESPONSE_DATA = responses.SwitchResponse(
+    result=Result(
+        status=Result.Status.STATUS_OK,
+    ),
+    launch_id=REQUEST.launch_id,
+    was_running=True,
+).SerializeToString()
+REQUEST_DATA = REQUEST.SerializeToString()
+
+def legacy_client():
+    request_class_name = REQUEST.__class__.__name__.removesuffix('Request')
+    topic = re.sub(r'(?<!^)(?=[A-Z])', '_', request_class_name).lower()
+    response_type = f"generated.responses_pb2.{request_class_name}Response"
+    module_, class_ = response_type.rsplit('.', 1)
+    class_ = getattr(importlib.import_module(module_), class_)
+    rv = class_()
+    rv.ParseFromString(RESPONSE_DATA)
+    return f"red.query.{topic}", rv
+
+def table_client():
+    method = rpc.method_for(REQUEST)
+    return method.subject, method.parse_response(RESPONSE_DATA)
+
+def legacy_server():
+    match "switch":
+        case "state":
+            req = requests.StateRequest()
+        case "set_volume":
+            req = requests.SetVolumeRequest()
+        case "stop":
+            req = requests.StopRequest()
+        case "launch":
+            req = requests.LaunchRequest()
+        case "switch":
+            req = requests.SwitchRequest()
+    req.ParseFromString(REQUEST_DATA)
+    return req
+
+dispatcher = rpc.Dispatcher({ topic: lambda req: req for topic in rpc.TOPICS })
+
+def table_server():
+    method, handler = dispatcher.lookup("switch")
+    return handler(method.parse_request(REQUEST_DATA))
+
+def parse_only():
+    rv = responses.SwitchResponse()
+    rv.ParseFromString(RESPONSE_DATA)
+    return rv
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", "-n", help="Calls per measurement (default: 100000)", type=int, default=100000)
+    parser.add_argument("--repeat", "-r", help="Measurements to take the best of (default: 5)", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, fn in [
+        ("parse only (floor)", parse_only),
+        ("client, legacy", legacy_client),
+        ("client, table", table_client),
+        ("server, legacy", legacy_server),
+        ("server, table", table_server),
+    ]:
+        best = min(timeit.repeat(fn, number=args.iterations, repeat=args.repeat))
+        print(f"{name:<20} {best / args.iterations * 1e9:8.0f} ns/call")
+
+if __name__ == '__main__':
+    main()
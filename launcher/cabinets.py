@@ -0,0 +1,265 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import generated.requests_pb2 as requests
+import frame_cadence as fc
+import frame_monitor as fm
+import frame_tap as ft
+import generated.responses_pb2 as responses
+import launch_tracker as lt
+import led_power as lp
+import logging
+import loop_client as lc
+import nats_client as nc
+import resilience as rz
+import rpc
+import single_flight as sf
+import state_cache as sc
+import threading
+import time
+import transports as tr
+
+REQUEST_TIMEOUT = 0.5
+# Least time requests on these topics get, however fast they usually
+# answer. Stopping a title gives it up to 2s to exit, and 2s more once
+# killed (see stop_proc in the remote)
+TIMEOUT_FLOORS = {
+    'stop': 5.0,
+    'switch': 5.0,
+}
+# Topics whose requests can be retried, and whose concurrent identical
+# requests can share one round trip
+IDEMPOTENT_TOPICS = { 'state' }
+MAX_RETRIES = 2
+PROBE_TIMEOUT = 1.0
+
+class Cabinet:
+
+    # A display and the game server driving it. Each cabinet has its own
+    # subjects, state cache and failure tracking, so a cabinet that is
+    # down doesn't slow down the others. Cabinets on the same NATS server
+    # share a client. Requests to the remote and its state go through the
+    # control client, which is the NATS client unless another transport
+    # is configured; frames and requests to pub always use NATS. With a
+    # frame tap, the cabinet's latest frames are kept in memory; with a
+    # frame monitor, the health of its frame stream is tracked; with a
+    # cadence recorder, the frame rate of each launch is recorded; with a
+    # power recorder, the LED current it draws is estimated. Both start
+    # when the launch tracker sees a launch become active.
+
+    def __init__(self, id, name, subjects, client, control=None, state_max_age=sc.DEFAULT_MAX_AGE, tap=None, monitor=None, cadence=None, power=None):
+        self.id = id
+        self.name = name
+        self.subjects = subjects
+        self.client = client
+        self.control = control or client
+        self.tap = tap
+        self.monitor = monitor
+        self.cadence = cadence
+        self.power = power
+        self.state_cache = sc.StateCache(max_age=state_max_age)
+        self.flight = sf.SingleFlight()
+        self.launches = lt.LaunchTracker()
+        self.latency = rz.LatencyTracker()
+        self.breaker = rz.CircuitBreaker(f"Remote '{id}'", self.probe)
+
+    def request_pub(self, request):
+        subject = self.subjects.pub_request
+        logging.info(f"Requesting '{subject}'")
+
+        try:
+            data = self.client.request(subject, request.SerializeToString(), timeout=REQUEST_TIMEOUT)
+        except TimeoutError:
+            logging.error(f"Request for subject '{subject}' timed out")
+            raise
+
+        resp = responses.ResponseEnvelope()
+        resp.ParseFromString(data)
+        logging.debug(f"Received response for subject '{subject}': {resp}")
+
+        return resp
+
+    def request_topic(self, request, timeout=None):
+        method = rpc.method_for(request)
+        subject = self.subjects.query(method.topic)
+        logging.debug(f"Requesting subject '{subject}'")
+
+        encoded_data = request.SerializeToString()
+        if method.topic in IDEMPOTENT_TOPICS:
+            data = self.flight.do(
+                (subject, encoded_data),
+                lambda: self.request_remote(method, encoded_data, timeout),
+            )
+        else:
+            data = self.request_remote(method, encoded_data, timeout)
+
+        response_obj = method.parse_response(data)
+        logging.debug(f"Received response for subject '{subject}': {response_obj}")
+
+        return response_obj
+
+    def request_remote(self, method, data, timeout=None):
+        self.breaker.check()
+        if timeout is None:
+            timeout = max(
+                self.latency.timeout_for(method.topic, REQUEST_TIMEOUT),
+                TIMEOUT_FLOORS.get(method.topic, 0),
+            )
+
+        subject = self.subjects.query(method.topic)
+        attempts = 1 + (MAX_RETRIES if method.topic in IDEMPOTENT_TOPICS else 0)
+        for attempt in range(attempts):
+            started = time.monotonic()
+            try:
+                response = self.control.request(subject, data, timeout=timeout)
+            except lc.BusyError:
+                # Local congestion, says nothing about the remote
+                raise
+            except Exception as e:
+                self.breaker.record_failure()
+                if self.breaker.is_open:
+                    raise rz.RemoteUnavailableError(f"Remote '{self.id}' unavailable ({e!r})") from e
+                if attempt + 1 >= attempts:
+                    logging.error(f"Request for subject '{subject}' failed: {e!r}")
+                    raise
+                delay = rz.retry_delay(attempt)
+                logging.warning(f"Request for subject '{subject}' failed ({e!r}); retrying in {delay * 1000:.0f}ms")
+                time.sleep(delay)
+                continue
+
+            self.latency.record(method.topic, time.monotonic() - started)
+            self.breaker.record_success()
+            return response
+
+    def probe(self):
+        method = rpc.TOPICS['state']
+        self.control.request(
+            self.subjects.query(method.topic),
+            method.request_type().SerializeToString(),
+            timeout=PROBE_TIMEOUT,
+        )
+
+    def state(self):
+        # Cached state if fresh, otherwise asks the remote
+        if state := self.state_cache.get():
+            return state
+
+        result = self.request_topic(requests.StateRequest())
+        active = result.active
+        state = sc.State(
+            active=f"{active.app_id}:{active.title_id}" if result.is_running else None,
+            is_running=result.is_running,
+            volume=result.volume,
+            idle=result.idle,
+        )
+        self.state_cache.put(state)
+
+        return state
+
+    def stats(self):
+        stats = {
+            'rpc': {
+                'single_flight': self.flight.stats(),
+                'latency': self.latency.stats(),
+                'breaker': self.breaker.stats(),
+            },
+            'state_cache': {
+                'age': self.state_cache.age,
+            },
+        }
+        if self.tap:
+            stats['frame_tap'] = self.tap.stats()
+        if self.monitor:
+            stats['frames'] = self.monitor.stats()
+        if self.power:
+            stats['led_power'] = self.power.stats()
+        return stats
+
+def load_cabinets(config, max_in_flight=lc.DEFAULT_MAX_IN_FLIGHT):
+    # Cabinets listed in the game server config, keyed by id in config
+    # order. Without a list, there is a single cabinet on the default
+    # subject prefix. Cabinet entries may override game server settings.
+    # max_in_flight bounds the requests in flight on each client
+    entries = config.get('cabinets') or [
+        {
+            'id': rpc.DEFAULT_CABINET_ID,
+            'subject_prefix': rpc.DEFAULT_SUBJECT_PREFIX,
+        },
+    ]
+
+    clients = {}
+    cabinets = {}
+    for entry in entries:
+        if not (id := entry.get('id')):
+            raise ValueError("Cabinet missing id")
+        if id in cabinets:
+            raise ValueError(f"Duplicate cabinet id: {id}")
+
+        settings = { **config, **entry }
+        nats_url = settings['nats_url']
+        if nats_url not in clients:
+            clients[nats_url] = nc.NatsClient(
+                nats_url,
+                max_in_flight=max_in_flight,
+            )
+
+        transport = settings.get('transport', tr.TRANSPORT_NATS)
+        if transport == tr.TRANSPORT_IN_PROCESS and any(isinstance(cabinet.control, tr.InProcessClient) for cabinet in cabinets.values()):
+            # There is only one remote module to run
+            raise ValueError("Only one cabinet can use the in-process transport")
+        cabinets[id] = Cabinet(
+            id,
+            entry.get('name', id),
+            rpc.Subjects(entry.get('subject_prefix', rpc.cabinet_prefix(id))),
+            clients[nats_url],
+            control=tr.create_control_client(
+                transport,
+                settings,
+                clients[nats_url],
+                cabinet_id=id if config.get('cabinets') else None,
+                max_in_flight=max_in_flight,
+            ),
+            state_max_age=config.get('state_max_age', sc.DEFAULT_MAX_AGE),
+            tap=ft.FrameTap(tap_size) if (tap_size := settings.get('frame_tap', 0)) > 0 else None,
+            monitor=fm.FrameMonitor() if settings.get('frame_monitor', False) else None,
+            cadence=fc.CadenceRecorder() if settings.get('frame_cadence', False) else None,
+            power=lp.load_recorder(power_settings) if (power_settings := settings.get('led_power')) else None,
+        )
+        if transport != tr.TRANSPORT_NATS:
+            logging.info(f"Cabinet '{id}' uses {transport} transport")
+
+    return cabinets
+
+def fan_out(cabinets, fn):
+    # Calls fn(cabinet) for all cabinets at once, so the slowest cabinet
+    # rather than the sum of all of them bounds the wait. Returns
+    # (cabinet, result, error) tuples in cabinet order
+    results = [ None ] * len(cabinets)
+
+    def run(index, cabinet):
+        try:
+            results[index] = (cabinet, fn(cabinet), None)
+        except Exception as e:
+            results[index] = (cabinet, None, e)
+
+    threads = [
+        threading.Thread(target=run, args=(index, cabinet), name=f"fan-out-{cabinet.id}", daemon=True)
+        for index, cabinet in enumerate(cabinets)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return results
@@ -0,0 +1,361 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Animated clips of the frame stream. Frames are encoded as they arrive,
+# so only the frame being encoded and the one before it are ever held
+# decoded. Repeats of a frame extend its duration instead of being
+# encoded again, and after the first frame, GIF and APNG frames only
+# cover the region that changed.
+
+from PIL import Image
+from PIL import GifImagePlugin
+import frames
+import io
+import logging
+import numpy as np
+import queue
+import struct
+import time
+import zlib
+
+try:
+    from PIL import _webp
+except ImportError:
+    _webp = None
+
+def _webp_streaming():
+    # WebpWriter drives Pillow's private animation encoder (as Pillow's own
+    # WebPImagePlugin._save_all does), with the argument order of the
+    # Pillow pinned in requirements.txt. If an upgrade changes it, WebP
+    # clips are reported unsupported rather than failing mid-clip
+    try:
+        encoder = _webp.WebPAnimEncoder((1, 1), 0, 0, False, 9, 17, False, False)
+        encoder.add(Image.new('RGB', (1, 1)).getim(), 0, True, 0, 100, 0)
+        encoder.add(None, 1, True, 0, 100, 0)
+        return encoder.assemble("", b"", "") is not None
+    except Exception as e:
+        logging.warning(f"WebP animation encoder unusable, WebP clips disabled: {e}")
+        return False
+
+if _webp and not _webp_streaming():
+    _webp = None
+
+DEFAULT_FORMAT = 'webp'
+DEFAULT_SECONDS = 5
+MAX_SECONDS = 30
+DEFAULT_FPS = 30
+MAX_SCALE = 4
+# Time to wait for the first frame
+FIRST_FRAME_TIMEOUT = 2.0
+# Frames received but not yet encoded; any more are dropped
+QUEUE_SIZE = 16
+# Frames may arrive this much before they are due, so that jitter doesn't
+# halve the rate of a stream that is right at the cap
+JITTER = 0.005
+
+class FrameSizeChanged(Exception):
+    pass
+
+class ClipFormat:
+
+    def __init__(self, mimetype, extension, max_fps):
+        self.mimetype = mimetype
+        self.extension = extension
+        self.max_fps = max_fps
+
+FORMATS = {
+    'webp': ClipFormat('image/webp', 'webp', 60),
+    'apng': ClipFormat('image/apng', 'png', 60),
+    # Browsers slow down frames shorter than 20ms
+    'gif': ClipFormat('image/gif', 'gif', 50),
+}
+
+class ClipOptions:
+
+    def __init__(self, format=DEFAULT_FORMAT, seconds=DEFAULT_SECONDS, fps=DEFAULT_FPS, scale=1):
+        self.format = format
+        self.seconds = seconds
+        self.fps = fps
+        self.scale = scale
+
+    @staticmethod
+    def from_args(args):
+        # Options from request arguments; raises ValueError if invalid
+        name = args.get('format', DEFAULT_FORMAT).lower()
+        if not (format := FORMATS.get(name)):
+            raise ValueError(f"Unsupported format: {name} (expected one of {', '.join(FORMATS)})")
+        if name == 'webp' and not _webp:
+            raise ValueError("WebP is not supported by this Pillow build")
+        seconds = args.get('seconds', DEFAULT_SECONDS, type=float)
+        if not 0 < seconds <= MAX_SECONDS:
+            raise ValueError(f"seconds must be greater than 0 and at most {MAX_SECONDS}")
+        fps = args.get('fps', min(DEFAULT_FPS, format.max_fps), type=int)
+        if not 1 <= fps <= format.max_fps:
+            raise ValueError(f"fps must be between 1 and {format.max_fps}")
+        scale = args.get('scale', 1, type=int)
+        if not 1 <= scale <= MAX_SCALE:
+            raise ValueError(f"scale must be between 1 and {MAX_SCALE}")
+        return ClipOptions(name, seconds, fps, scale)
+
+def changed_region(previous, current):
+    # (x, y, width, height) of the area that differs between two frames
+    rows = np.flatnonzero((previous != current).any(axis=(1, 2)))
+    if not len(rows):
+        # Same pixels from a different payload; a 1x1 frame keeps timing
+        return (0, 0, 1, 1)
+    cols = np.flatnonzero((previous[rows[0]:rows[-1] + 1] != current[rows[0]:rows[-1] + 1]).any(axis=(0, 2)))
+    return (int(cols[0]), int(rows[0]), int(cols[-1] - cols[0] + 1), int(rows[-1] - rows[0] + 1))
+
+class GifWriter:
+
+    # Writes the GIF one frame at a time. The palette of the first frame
+    # is the global palette, and later frames are mapped onto it, so no
+    # frame needs a palette of its own. Frame delays are in hundredths of
+    # a second; the rounding error is carried over to the next frame.
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self._out = io.BytesIO()
+        self._palette = None
+        self._previous = None
+        self._carry = 0
+
+    def add(self, rgb, duration):
+        centis = duration / 10 + self._carry
+        delay = max(round(centis), 1)
+        self._carry = centis - delay
+
+        if self._palette is None:
+            image = Image.fromarray(rgb).quantize(256, method=Image.Quantize.MEDIANCUT)
+            header, _ = GifImagePlugin.getheader(image, info={ 'loop': 0 })
+            self._out.write(b''.join(header))
+            self._palette = image
+            offset = (0, 0)
+        else:
+            x, y, w, h = changed_region(self._previous, rgb)
+            image = Image.fromarray(rgb[y:y + h, x:x + w]).quantize(palette=self._palette, dither=Image.Dither.NONE)
+            offset = (x, y)
+
+        # Disposal 1 leaves the frame in place for the next one to draw on
+        self._out.write(b''.join(GifImagePlugin.getdata(image, offset, duration=delay * 10, disposal=1)))
+        self._previous = rgb
+
+    def finish(self):
+        self._out.write(b';')
+        return self._out.getvalue()
+
+class ApngWriter:
+
+    # Writes an animated PNG one frame at a time. The frame count in the
+    # acTL chunk isn't known until the end, so it is filled in then.
+
+    SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self._out = io.BytesIO()
+        self._out.write(self.SIGNATURE)
+        self._chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        self._actl_offset = self._out.tell()
+        self._chunk(b'acTL', struct.pack('>II', 0, 0))
+        self._sequence = 0
+        self._frames = 0
+        self._previous = None
+
+    def _chunk(self, type, data):
+        self._out.write(struct.pack('>I', len(data)))
+        self._out.write(type)
+        self._out.write(data)
+        self._out.write(struct.pack('>I', zlib.crc32(type + data)))
+
+    def add(self, rgb, duration):
+        if self._previous is None:
+            x, y, w, h = 0, 0, self.width, self.height
+        else:
+            x, y, w, h = changed_region(self._previous, rgb)
+        self._previous = rgb
+
+        # Every row starts with filter type 0 (none)
+        region = rgb[y:y + h, x:x + w].reshape(h, w * 3)
+        data = zlib.compress(np.hstack([ np.zeros((h, 1), np.uint8), region ]).tobytes())
+
+        # Delay in milliseconds; dispose op none, blend op source
+        self._chunk(b'fcTL', struct.pack('>IIIIIHHBB', self._sequence, w, h, x, y, round(duration), 1000, 0, 0))
+        self._sequence += 1
+        if self._frames == 0:
+            self._chunk(b'IDAT', data)
+        else:
+            self._chunk(b'fdAT', struct.pack('>I', self._sequence) + data)
+            self._sequence += 1
+        self._frames += 1
+
+    def finish(self):
+        self._chunk(b'IEND', b'')
+        self._out.seek(self._actl_offset)
+        self._chunk(b'acTL', struct.pack('>II', self._frames, 0))
+        return self._out.getvalue()
+
+class WebpWriter:
+
+    # Feeds frames to libwebp's animation encoder as they come; it keeps
+    # encoded frames rather than images, so a long or scaled clip doesn't
+    # hold every frame in memory, as Image.save(save_all=True) would.
+    # Lossless, at the fastest method.
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self._encoder = _webp.WebPAnimEncoder(
+            (width, height),    # size
+            0xff000000,         # background: opaque black, as ARGB
+            0,                  # loop: forever
+            False,              # minimize_size
+            9,                  # kmin, kmax: keyframe spacing, Pillow's
+            17,                 # defaults for lossless
+            False,              # allow_mixed
+            False,              # verbose
+        )
+        self._timestamp = 0
+
+    def _add(self, im):
+        self._encoder.add(
+            im,                 # frame (core image), or None to flush
+            round(self._timestamp),  # timestamp, ms
+            True,               # lossless
+            0,                  # quality: for lossless, effort; fastest
+            100,                # alpha_quality
+            0,                  # method: fastest
+        )
+
+    def add(self, rgb, duration):
+        self._add(Image.fromarray(rgb).getim())
+        self._timestamp += duration
+
+    def finish(self):
+        self._add(None)
+        if (data := self._encoder.assemble(
+            "",                 # icc_profile
+            b"",                # exif
+            "",                 # xmp
+        )) is None:
+            raise OSError("WebP encoder returned no data")
+        return data
+
+WRITERS = {
+    'webp': WebpWriter,
+    'apng': ApngWriter,
+    'gif': GifWriter,
+}
+
+class ClipRecorder:
+
+    # Turns received frames into a clip. A frame is only encoded once the
+    # next different frame arrives and its duration is known; until then
+    # it is kept as received (compressed). run, if given, runs the
+    # decoding and encoding (see image_pool.py).
+
+    def __init__(self, options, run=None):
+        self.options = options
+        self._run = run
+        self.interval = 1.0 / options.fps
+        self.received = 0
+        self.encoded = 0
+        self._writer = None
+        self._pending = None
+        self._pending_since = None
+        self._due = 0
+
+    def add(self, data, received):
+        self.received += 1
+        # Repeats differ in the header extension, if nothing else
+        data = frames.without_ext(data)
+        if self._pending is not None:
+            if data == self._pending or received < self._due - JITTER:
+                # Repeated or too soon; the pending frame covers it
+                return
+            self._write(received)
+        self._pending = data
+        self._pending_since = received
+        self._due = max(self._due + self.interval, received)
+
+    def _write(self, until):
+        if self._run:
+            self._run(self._encode, until)
+        else:
+            self._encode(until)
+        self.encoded += 1
+
+    def _encode(self, until):
+        header, pixels = frames.parse(self._pending)
+        rgb = frames.to_array(pixels, header.width, header.height, header.pitch, header.pixel_format, header.attrs)
+        if (scale := self.options.scale) > 1:
+            rgb = rgb.repeat(scale, axis=0).repeat(scale, axis=1)
+        if self._writer is None:
+            self._writer = WRITERS[self.options.format](rgb.shape[1], rgb.shape[0])
+        elif (rgb.shape[1], rgb.shape[0]) != (self._writer.width, self._writer.height):
+            # e.g. a different title; the clip ends here
+            raise FrameSizeChanged()
+        self._writer.add(np.ascontiguousarray(rgb), (until - self._pending_since) * 1000)
+
+    def finish(self, until):
+        if self._pending is not None:
+            try:
+                self._write(until)
+            except FrameSizeChanged:
+                pass
+        if not self._writer:
+            return None
+        return self._run(self._writer.finish) if self._run else self._writer.finish()
+
+def record(client, subject, options, run=None):
+    # Records a clip from the frames published on subject. Raises
+    # TimeoutError if no frames arrive; run is passed to the recorder
+    received = queue.Queue(QUEUE_SIZE)
+    dropped = 0
+
+    def on_frame(data):
+        nonlocal dropped
+        try:
+            received.put_nowait((data, time.monotonic()))
+        except queue.Full:
+            dropped += 1
+
+    recorder = ClipRecorder(options, run)
+    client.subscribe(subject, on_frame)
+    try:
+        try:
+            data, started = received.get(timeout=FIRST_FRAME_TIMEOUT)
+        except queue.Empty:
+            raise TimeoutError("No frames received")
+        ends = started + options.seconds
+        recorder.add(data, started)
+        while (remaining := ends - time.monotonic()) > 0:
+            try:
+                data, at = received.get(timeout=remaining)
+            except queue.Empty:
+                break
+            try:
+                recorder.add(data, at)
+            except FrameSizeChanged:
+                ends = at
+                break
+    finally:
+        client.unsubscribe(subject, on_frame)
+
+    clip = recorder.finish(ends)
+    logging.info(f"Recorded {options.seconds}s {options.format} clip: "
+        f"{recorder.received} frames received, {recorder.encoded} encoded, {dropped} dropped, {len(clip)} bytes")
+    return clip
@@ -14,6 +14,7 @@
 
 from collections import defaultdict
 import itertools
+import numpy as np
 import yaml
 
 class GameConfig:
@@ -41,6 +42,35 @@ class GameConfig:
                 self.platforms[game.app_id].append(game.id)
                 self.systems[game.system].append(game.id)
 
+        self._build_index()
+
+    def _build_index(self):
+        # Games get dense ids in title order, and each filter value a
+        # bitset of the ids it matches, so that games() ANDs a few arrays
+        # and reads the result out already sorted. Each game's dict is
+        # built once, with tuples for lists, so that games() only has to
+        # copy the top level for callers to be unable to change it
+        order = sorted(self.game_map.values(), key=lambda game: game.title.lower())
+        ids = { game.id: i for i, game in enumerate(order) }
+        self._dicts = [
+            { k: tuple(v) if isinstance(v, list) else v for k, v in game.as_dict().items() }
+            for game in order
+        ]
+        self._titles = [ game.title.lower() for game in order ]
+        self._bitsets = {}
+        for prefix, postings in [
+            ('t', self.tags),
+            ('g', self.genres),
+            ('s', self.series),
+            ('o', self.orientations),
+            ('p', self.platforms),
+            ('y', self.systems),
+        ]:
+            bitsets = self._bitsets[prefix] = {}
+            for value, game_ids in postings.items():
+                bitset = bitsets[value] = np.zeros(len(order), dtype=bool)
+                bitset[[ ids[game_id] for game_id in game_ids ]] = True
+
     def filters(self):
         return [
             {
@@ -107,39 +137,26 @@ class GameConfig:
         ]
 
     def games(self, search="", filter_map={}):
-        all_games = self.game_map.values()
+        # Games with every filter value given (a game has one orientation,
+        # platform and system, so two of those match nothing), and search
+        # in their title, sorted by title. Results are copies
         if not (search or filter_map):
-            return sorted([ game.as_dict() for game in all_games ], key=lambda x: x['title'].lower())
+            return [ dict(game) for game in self._dicts ]
 
-        filtered_games = []
-        for game in all_games:
-            if search and search.lower() not in game.title.lower():
+        matches = None
+        for (k, v_list) in filter_map.items():
+            if (bitsets := self._bitsets.get(k)) is None:
                 continue
-            filter_match = True
-            for (k, v_list) in filter_map.items():
-                filters = set(v_list)
-                if k == 't' and filters.intersection(set(game.tags)) != filters:
-                    filter_match = False
-                    break
-                elif k == 'o' and filters != { game.orientation }:
-                    filter_match = False
-                    break
-                elif k == 'p' and filters != { game.app_id }:
-                    filter_match = False
-                    break
-                elif k == 'g' and filters.intersection(set(game.genres)) != filters:
-                    filter_match = False
-                    break
-                elif k == 's' and filters.intersection(set(game.series)) != filters:
-                    filter_match = False
-                    break
-                elif k == 'y' and filters != { game.system }:
-                    filter_match = False
-                    break
-            if filter_match:
-                filtered_games.append(game)
-
-        return sorted([ game.as_dict() for game in filtered_games ], key=lambda x: x['title'].lower())
+            for v in v_list:
+                if (bitset := bitsets.get(v)) is None:
+                    return []
+                matches = bitset.copy() if matches is None else np.logical_and(matches, bitset, out=matches)
+
+        ids = np.flatnonzero(matches).tolist() if matches is not None else range(len(self._dicts))
+        if search:
+            search = search.lower()
+            ids = [ i for i in ids if search in self._titles[i] ]
+        return [ dict(self._dicts[i]) for i in ids ]
 
 class Config:
 
@@ -16,6 +16,7 @@ from launcher import app
 from flask import g
 from secrets import token_urlsafe
 import logging
+import rpc
 import sqlite3
 
 def get_db():
@@ -55,6 +56,9 @@ def close_connection(_):
 def generate_pubid():
     return token_urlsafe(nbytes=8)
 
+def column_exists(table, column):
+    return any(row["name"] == column for row in query_db(f"PRAGMA table_info({table})"))
+
 def init_db():
     run_query("""
         CREATE TABLE IF NOT EXISTS users (
@@ -82,18 +86,28 @@ def init_db():
     run_query("""
         CREATE INDEX IF NOT EXISTS sessions_user_id ON sessions (user_id)
     """, autocommit=False)
-    run_query("""
+    run_query(f"""
         CREATE TABLE IF NOT EXISTS launches (
             id INTEGER PRIMARY KEY,
             session_id INTEGER NOT NULL,
             uid TEXT NOT NULL,
             launched_at INTEGER NOT NULL,
-            stopped_at INTEGER
+            stopped_at INTEGER,
+            cabinet TEXT NOT NULL DEFAULT '{rpc.DEFAULT_CABINET_ID}'
         )
     """, autocommit=False)
     run_query("""
         CREATE INDEX IF NOT EXISTS launches_launched_at ON launches (launched_at)
     """, autocommit=False)
+    if not column_exists("launches", "cabinet"):
+        # Launches predating multiple cabinets were made on the sole
+        # cabinet, which is the first one configured now
+        run_query(f"""
+            ALTER TABLE launches ADD COLUMN cabinet TEXT NOT NULL DEFAULT '{rpc.DEFAULT_CABINET_ID}'
+        """, autocommit=False)
+        run_query("""
+            UPDATE launches SET cabinet = ?
+        """, (app.config.get("DEFAULT_CABINET_ID", rpc.DEFAULT_CABINET_ID),), autocommit=False)
     run_query("""
         CREATE TABLE IF NOT EXISTS launch_counts (
             id INTEGER PRIMARY KEY,
@@ -107,4 +121,45 @@ def init_db():
     run_query("""
         CREATE UNIQUE INDEX IF NOT EXISTS launch_counts_uid ON launch_counts (uid)
     """, autocommit=False)
+    run_query("""
+        CREATE TABLE IF NOT EXISTS launch_performance (
+            launch_id INTEGER PRIMARY KEY,
+            uid TEXT NOT NULL,
+            cabinet TEXT NOT NULL,
+            nominal_fps REAL NOT NULL,
+            frames INTEGER NOT NULL,
+            lost INTEGER NOT NULL,
+            duration REAL NOT NULL,
+            long_2 INTEGER NOT NULL,
+            long_3 INTEGER NOT NULL,
+            long_4_7 INTEGER NOT NULL,
+            stalls INTEGER NOT NULL,
+            max_interval REAL NOT NULL
+        )
+    """, autocommit=False)
+    run_query("""
+        CREATE INDEX IF NOT EXISTS launch_performance_uid ON launch_performance (uid)
+    """, autocommit=False)
+    run_query("""
+        CREATE TABLE IF NOT EXISTS launch_power (
+            launch_id INTEGER NOT NULL,
+            region TEXT NOT NULL,
+            uid TEXT NOT NULL,
+            cabinet TEXT NOT NULL,
+            frames INTEGER NOT NULL,
+            mean_amps REAL NOT NULL,
+            peak_amps REAL NOT NULL,
+            over_budget INTEGER NOT NULL,
+            mean_r REAL NOT NULL,
+            mean_g REAL NOT NULL,
+            mean_b REAL NOT NULL,
+            peak_r REAL NOT NULL,
+            peak_g REAL NOT NULL,
+            peak_b REAL NOT NULL,
+            PRIMARY KEY (launch_id, region)
+        )
+    """, autocommit=False)
+    run_query("""
+        CREATE INDEX IF NOT EXISTS launch_power_uid ON launch_power (uid)
+    """, autocommit=False)
     get_db().commit()
@@ -14,6 +14,7 @@
 
 import data.common as dc
 import logging
+import rpc
 from datetime import datetime
 from data.entity import Entity
 
@@ -38,6 +39,14 @@ class Launch(Entity):
     def uid(self, val: str):
         self.set_prop("uid", val)
 
+    @property
+    def cabinet(self) -> str:
+        return self.get_prop("cabinet")
+
+    @cabinet.setter
+    def cabinet(self, val: str):
+        self.set_prop("cabinet", val)
+
     @property
     def launched_at(self) -> int:
         return self.get_prop("launched_at")
@@ -55,19 +64,22 @@ class Launch(Entity):
         self.set_prop("stopped_at", val)
 
 
-def create_launch(session_id: int, uid: str) -> Launch:
+def create_launch(session_id: int, uid: str, cabinet: str = rpc.DEFAULT_CABINET_ID) -> Launch:
     launch = Launch({
         "session_id": session_id,
         "uid": uid,
+        "cabinet": cabinet,
         "launched_at": datetime.now().timestamp(),
     })
     launch.id = dc.run_query("""
         INSERT INTO launches(
                     session_id,
                     uid,
+                    cabinet,
                     launched_at
                     )
              VALUES (
+                    ?,
                     ?,
                     ?,
                     ?
@@ -75,14 +87,15 @@ def create_launch(session_id: int, uid: str) -> Launch:
     """, (
         launch.session_id,
         launch.uid,
+        launch.cabinet,
         launch.launched_at,
         )
     )
 
     return launch
 
-def end_launch():
-    launch = fetch_latest_launch()
+def end_launch(cabinet: str = rpc.DEFAULT_CABINET_ID):
+    launch = fetch_latest_launch(cabinet)
     if not launch or launch.stopped_at:
         logging.warning("Unexpected launch state")
         return
@@ -98,13 +111,14 @@ def end_launch():
         )
     )
 
-def fetch_latest_launch() -> Launch | None:
+def fetch_latest_launch(cabinet: str = rpc.DEFAULT_CABINET_ID) -> Launch | None:
     launch_row = dc.query_db("""
         SELECT *
           FROM launches
+         WHERE cabinet = ?
          ORDER BY launched_at DESC
          LIMIT 1
-    """, (), one=True)
+    """, (cabinet,), one=True)
 
     if not launch_row:
         return None
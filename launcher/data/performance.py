@@ -0,0 +1,90 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import data.common as dc
+
+def create_launch_performance(cabinet: str, cadence):
+    # Frame cadence of a finished launch (see frame_cadence.Cadence)
+    dc.run_query("""
+        INSERT OR REPLACE INTO launch_performance(
+                    launch_id,
+                    uid,
+                    cabinet,
+                    nominal_fps,
+                    frames,
+                    lost,
+                    duration,
+                    long_2,
+                    long_3,
+                    long_4_7,
+                    stalls,
+                    max_interval
+                    )
+             VALUES (
+                    ?,
+                    ?,
+                    ?,
+                    ?,
+                    ?,
+                    ?,
+                    ?,
+                    ?,
+                    ?,
+                    ?,
+                    ?,
+                    ?
+                    )
+    """, (
+        cadence.launch_id,
+        cadence.uid,
+        cabinet,
+        cadence.nominal_fps,
+        cadence.frames,
+        cadence.lost,
+        cadence.duration,
+        *cadence.long_frames,
+        cadence.stalls,
+        cadence.max_interval,
+        )
+    )
+
+def fetch_title_performance(cabinet: str | None = None, min_duration: float = 0) -> list[dict]:
+    # Cadence of every title over all of its recorded launches, slowest
+    # relative to its nominal rate first. Rates and counts are per
+    # second of play, so long and short launches weigh in by length
+    rows = dc.query_db(f"""
+        SELECT uid,
+               COUNT(*) AS launches,
+               SUM(duration) AS duration,
+               MAX(nominal_fps) AS nominal_fps,
+               SUM(frames + lost - 1) / SUM(duration) AS fps,
+               SUM(lost) AS lost,
+               SUM(long_2) AS long_2,
+               SUM(long_3) AS long_3,
+               SUM(long_4_7) AS long_4_7,
+               SUM(stalls) AS stalls,
+               MAX(max_interval) AS max_interval
+          FROM launch_performance
+         WHERE duration > 0
+               {"AND cabinet = ?" if cabinet else ""}
+         GROUP BY uid
+        HAVING SUM(duration) >= ?
+    """, (cabinet, min_duration) if cabinet else (min_duration,))
+
+    for row in rows:
+        row['speed'] = row['fps'] / row['nominal_fps']
+        row['stalls_per_min'] = row['stalls'] * 60 / row['duration']
+        row['long_frames_per_min'] = (row['long_2'] + row['long_3'] + row['long_4_7']) * 60 / row['duration']
+
+    return sorted(rows, key=lambda row: (row['speed'], -row['stalls_per_min']))
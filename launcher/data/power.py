@@ -0,0 +1,113 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import data.common as dc
+
+def create_launch_power(cabinet: str, profile):
+    # Estimated draw of each region over a finished launch (see
+    # led_power.PowerProfile)
+    for region, stats in profile.regions.items():
+        if not stats.frames:
+            continue
+        dc.run_query("""
+            INSERT OR REPLACE INTO launch_power(
+                        launch_id,
+                        region,
+                        uid,
+                        cabinet,
+                        frames,
+                        mean_amps,
+                        peak_amps,
+                        over_budget,
+                        mean_r,
+                        mean_g,
+                        mean_b,
+                        peak_r,
+                        peak_g,
+                        peak_b
+                        )
+                 VALUES (
+                        ?,
+                        ?,
+                        ?,
+                        ?,
+                        ?,
+                        ?,
+                        ?,
+                        ?,
+                        ?,
+                        ?,
+                        ?,
+                        ?,
+                        ?,
+                        ?
+                        )
+        """, (
+            profile.launch_id,
+            region,
+            profile.uid,
+            cabinet,
+            stats.frames,
+            stats.mean_amps,
+            stats.peak_amps,
+            stats.over_budget,
+            *stats.mean.tolist(),
+            *stats.peak_mean.tolist(),
+            ), autocommit=False
+        )
+    dc.get_db().commit()
+
+def fetch_title_power(cabinet: str | None = None) -> list[dict]:
+    # Estimated draw of every title by region, over all of its recorded
+    # launches, hungriest first. Means are weighted by frames measured
+    rows = dc.query_db(f"""
+        SELECT uid,
+               region,
+               COUNT(*) AS launches,
+               SUM(frames) AS frames,
+               SUM(mean_amps * frames) / SUM(frames) AS mean_amps,
+               MAX(peak_amps) AS peak_amps,
+               CAST(SUM(over_budget) AS REAL) / SUM(frames) AS over_budget,
+               SUM(mean_r * frames) / SUM(frames) AS mean_r,
+               SUM(mean_g * frames) / SUM(frames) AS mean_g,
+               SUM(mean_b * frames) / SUM(frames) AS mean_b,
+               MAX(peak_r) AS peak_r,
+               MAX(peak_g) AS peak_g,
+               MAX(peak_b) AS peak_b
+          FROM launch_power
+         WHERE frames > 0
+               {"AND cabinet = ?" if cabinet else ""}
+         GROUP BY uid, region
+    """, (cabinet,) if cabinet else ())
+
+    titles = {}
+    for row in rows:
+        title = titles.setdefault(row['uid'], {
+            'uid': row['uid'],
+            'peak_amps': 0.0,
+            'regions': {},
+        })
+        title['peak_amps'] = max(title['peak_amps'], row['peak_amps'])
+        title['regions'][row.pop('region')] = {
+            'launches': row['launches'],
+            'frames': row['frames'],
+            'mean_amps': row['mean_amps'],
+            'peak_amps': row['peak_amps'],
+            # Share of frames measured over budget
+            'over_budget': row['over_budget'],
+            'mean': [ row['mean_r'], row['mean_g'], row['mean_b'] ],
+            'peak': [ row['peak_r'], row['peak_g'], row['peak_b'] ],
+        }
+
+    return sorted(titles.values(), key=lambda title: -title['peak_amps'])
@@ -0,0 +1,139 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import bisect
+import frames
+import threading
+import time
+
+DEFAULT_FPS = 60
+# Frames in the first this many seconds of a launch are not counted,
+# since titles load, and cores boot, at their own pace
+SETTLE_TIME = 3.0
+# Long frames are counted by how many frame periods they took, in
+# buckets starting at these (2, 3 and 4-7). A frame taking
+# STALL_PERIODS or more is a stall
+LONG_FRAMES = [ 2, 3, 4 ]
+STALL_PERIODS = 8
+# Sequence numbers going back, or ahead by more than this, mean pub
+# restarted rather than that frames went missing
+SEQUENCE_RESTART = 1 << 31
+
+class Cadence:
+
+    # Frame timing over one launch. Intervals are in frame periods of
+    # the title's nominal rate, so that 1 is a frame on time
+
+    def __init__(self, launch_id, uid, nominal_fps):
+        self.launch_id = launch_id
+        self.uid = uid
+        self.nominal_fps = nominal_fps
+        self.frames = 0
+        # Frames published but never received (needs pub --frame-ext)
+        self.lost = 0
+        self.first = None
+        self.last = None
+        self.long_frames = [ 0 ] * len(LONG_FRAMES)
+        self.stalls = 0
+        self.max_interval = 0.0
+
+    @property
+    def duration(self):
+        return self.last - self.first if self.frames else 0.0
+
+    @property
+    def fps(self):
+        return (self.frames + self.lost - 1) / self.duration if self.duration > 0 else None
+
+class CadenceRecorder:
+
+    # Times a cabinet's frames from launch to exit, to tell which titles
+    # can't keep up with their nominal frame rate. Frames are timed by
+    # when pub published them if they carry a header extension, and by
+    # when they arrived otherwise. Under the prefork server, only the
+    # worker that launched a title records it; the others see frames
+    # but have nothing started, and drop them.
+
+    def __init__(self, settle_time=SETTLE_TIME):
+        self.settle_time = settle_time
+        self._lock = threading.Lock()
+        self._cadence = None
+        self._started = None
+        self._sequence = None
+
+    def start(self, launch_id, uid, nominal_fps=None):
+        # Starts timing a launch. Returns the launch that was being timed
+        # before, if any, as finish() does
+        with self._lock:
+            previous = self._take()
+            self._cadence = Cadence(launch_id, uid, nominal_fps or DEFAULT_FPS)
+            self._started = time.monotonic()
+        return previous
+
+    def finish(self):
+        # Stops timing; returns the Cadence of the launch, or None if
+        # nothing was being timed
+        with self._lock:
+            return self._take()
+
+    def check_state(self, active):
+        # Finishes the launch if the title running is no longer the one
+        # being timed (active is its id, or None if nothing is running)
+        with self._lock:
+            if self._cadence and self._cadence.uid != active:
+                return self._take()
+        return None
+
+    def put(self, data):
+        # Subscription callback; runs on the client's loop thread
+        if not self._cadence:
+            return
+        now = time.monotonic()
+        try:
+            header = frames.parse_header(data)
+        except ValueError:
+            return
+        stamp = header.timestamp if header.timestamp is not None else now
+
+        with self._lock:
+            cadence = self._cadence
+            if not cadence or now - self._started < self.settle_time:
+                return
+            periods = 1
+            if header.sequence is not None:
+                if self._sequence is not None:
+                    delta = (header.sequence - self._sequence) & 0xffffffff
+                    if 0 < delta < SEQUENCE_RESTART:
+                        # Frames lost on the way took no longer to make
+                        cadence.lost += delta - 1
+                        periods = delta
+                self._sequence = header.sequence
+
+            cadence.frames += 1
+            if cadence.first is None:
+                cadence.first = stamp
+            else:
+                interval = (stamp - cadence.last) / periods * cadence.nominal_fps
+                cadence.max_interval = max(cadence.max_interval, interval)
+                if (taken := round(interval)) >= STALL_PERIODS:
+                    cadence.stalls += 1
+                elif taken >= LONG_FRAMES[0]:
+                    cadence.long_frames[bisect.bisect_right(LONG_FRAMES, taken) - 1] += 1
+            cadence.last = stamp
+
+    def _take(self):
+        cadence = self._cadence
+        self._cadence = None
+        self._sequence = None
+        return cadence
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Records published frames to a file, and plays them back to NATS with
+# the original timing, faster, or as fast as possible. Frames are stored
+# as published, so playback exercises sub and the launcher exactly like
+# the emulator did. Run from the launcher directory:
+#
+#   python3 frame_capture.py record -o sf2.frc --seconds 30
+#   python3 frame_capture.py info sf2.frc
+#   python3 frame_capture.py replay sf2.frc --speed 2 --loop 5
+#
+# A capture file is a header, then one record per frame (receipt time
+# and length, then the frame) appended as frames arrive, then an index
+# of each frame's time, offset and length, then a footer pointing at the
+# index. A file that was never closed has no index; reading it rebuilds
+# the index from the records. Files are memory-mapped for reading.
+
+import argparse
+import asyncio
+import frames
+import mmap
+import nats
+import numpy as np
+import struct
+import sys
+import time
+
+MAGIC = b"REDFRAME"
+INDEX_MAGIC = b"REDINDEX"
+VERSION = 1
+# magic, version, reserved, capture start (Unix time)
+FILE_HEADER = struct.Struct("<8sHHxxxxd")
+# receipt time (us since the first frame), frame length
+RECORD = struct.Struct("<QI")
+# index offset, frame count, magic
+FOOTER = struct.Struct("<QI8s")
+INDEX_DTYPE = np.dtype([ ('time_us', '<u8'), ('offset', '<u8'), ('length', '<u4') ])
+
+DEFAULT_SUBJECT = "red.frames"
+DEFAULT_NATS_URL = "nats://127.0.0.1:4222"
+# Replays flush to the server every this many frames
+FLUSH_EVERY = 64
+
+class CaptureWriter:
+
+    # Appends frames to a new capture file. Frames are written as they
+    # come; the index is only written on close.
+
+    def __init__(self, path):
+        self._file = open(path, 'wb')
+        self._file.write(FILE_HEADER.pack(MAGIC, VERSION, 0, time.time()))
+        self._index = []
+        self._first = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def count(self):
+        return len(self._index)
+
+    def write(self, data, received=None):
+        # received is a time.monotonic() timestamp, now if not given
+        received = time.monotonic() if received is None else received
+        if self._first is None:
+            self._first = received
+        time_us = round((received - self._first) * 1e6)
+        offset = self._file.tell() + RECORD.size
+        self._file.write(RECORD.pack(time_us, len(data)))
+        self._file.write(data)
+        self._index.append((time_us, offset, len(data)))
+
+    def close(self):
+        if self._file.closed:
+            return
+        index = np.array(self._index, dtype=INDEX_DTYPE)
+        index_offset = self._file.tell()
+        self._file.write(index.tobytes())
+        self._file.write(FOOTER.pack(index_offset, len(index), INDEX_MAGIC))
+        self._file.close()
+
+class CaptureReader:
+
+    # Frames of a capture file, by position. The file is mapped rather
+    # than read, so opening a large capture costs nothing, and only the
+    # frames used are ever paged in.
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.started = FILE_HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a frame capture")
+        if version != VERSION:
+            raise ValueError(f"Unsupported capture version: {version}")
+        self.index = self._read_index()
+        self.complete = self.index is not None
+        if self.index is None:
+            self.index = self._scan()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, i):
+        entry = self.index[i]
+        return self._map[entry['offset']:entry['offset'] + entry['length']]
+
+    def header(self, i):
+        # Header of a frame, without reading the rest of it
+        entry = self.index[i]
+        length = min(entry['length'], frames.HEADER.size + 0xff)
+        return frames.parse_header(self._map[entry['offset']:entry['offset'] + length])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def duration(self):
+        # Seconds from the first frame to the last
+        return self.index['time_us'][-1] / 1e6 if len(self) else 0
+
+    def _read_index(self):
+        if len(self._map) < FILE_HEADER.size + FOOTER.size:
+            return None
+        index_offset, count, magic = FOOTER.unpack_from(self._map, len(self._map) - FOOTER.size)
+        if magic != INDEX_MAGIC or index_offset + count * INDEX_DTYPE.itemsize != len(self._map) - FOOTER.size:
+            return None
+        return np.frombuffer(self._map, dtype=INDEX_DTYPE, count=count, offset=index_offset)
+
+    def _scan(self):
+        # Index of an unfinished capture; a truncated last record is left out
+        entries = []
+        offset = FILE_HEADER.size
+        while offset + RECORD.size <= len(self._map):
+            time_us, length = RECORD.unpack_from(self._map, offset)
+            offset += RECORD.size
+            if offset + length > len(self._map):
+                break
+            entries.append((time_us, offset, length))
+            offset += length
+        return np.array(entries, dtype=INDEX_DTYPE)
+
+    def close(self):
+        # The index is a view of the file, and must go first
+        self.index = None
+        self._map.close()
+
+def restamp(data, sequence):
+    # The frame with its extension's sequence number replaced and its
+    # timestamp set to now, so that the frame tap sees a live stream
+    frame = bytearray(data)
+    struct.pack_into("<IQ", frame, frames.HEADER.size + 4, sequence & 0xffffffff, time.monotonic_ns() // 1000)
+    return frame
+
+async def record(args):
+    nc = await nats.connect(args.nats_url)
+    stop = asyncio.Event()
+    with CaptureWriter(args.output) as writer:
+        async def on_frame(msg):
+            writer.write(msg.data)
+            if args.frames and writer.count >= args.frames:
+                stop.set()
+
+        sub = await nc.subscribe(args.subject, cb=on_frame)
+        print(f"Recording '{args.subject}' to {args.output}", file=sys.stderr)
+        try:
+            await asyncio.wait_for(stop.wait(), args.seconds)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            await sub.unsubscribe()
+            await nc.close()
+        print(f"Recorded {writer.count} frames", file=sys.stderr)
+
+async def replay(args):
+    nc = await nats.connect(args.nats_url)
+    with CaptureReader(args.input) as reader:
+        if not len(reader):
+            print("Capture has no frames", file=sys.stderr)
+            await nc.close()
+            return
+        times = reader.index['time_us'] / 1e6
+        # Later loops carry on the sequence where the previous one ended
+        first = reader.header(0)
+        sequence_span = 0
+        if first.sequence is not None:
+            sequence_span = reader.header(len(reader) - 1).sequence - first.sequence + 1
+
+        sent = 0
+        late = 0
+        started = time.monotonic()
+        for loop in range(args.loop):
+            loop_started = time.monotonic()
+            for i in range(len(reader)):
+                if args.speed:
+                    due = loop_started + times[i] / args.speed
+                    if (delay := due - time.monotonic()) > 0:
+                        await asyncio.sleep(delay)
+                    elif delay < -0.005:
+                        late += 1
+                data = reader[i]
+                if not args.keep_stamps and (sequence := reader.header(i).sequence) is not None:
+                    data = restamp(data, sequence + loop * sequence_span)
+                await nc.publish(args.subject, bytes(data))
+                sent += 1
+                if sent % FLUSH_EVERY == 0:
+                    await nc.flush()
+            if args.speed and loop + 1 < args.loop and len(reader) > 1:
+                # Leave a typical gap between the last frame and the first
+                await asyncio.sleep(times[-1] / (len(reader) - 1) / args.speed)
+        await nc.flush()
+        await nc.close()
+
+        elapsed = time.monotonic() - started
+        print(f"Replayed {sent} frames in {elapsed:.2f}s ({sent / elapsed:.1f} fps); {late} sent late", file=sys.stderr)
+
+def info(args):
+    with CaptureReader(args.input) as reader:
+        print(f"Frames:   {len(reader)}{'' if reader.complete else ' (no index; capture unfinished)'}")
+        print(f"Started:  {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(reader.started))}")
+        if not len(reader):
+            return
+        sizes = reader.index['length'].astype(np.int64)
+        print(f"Duration: {reader.duration:.2f}s ({(len(reader) - 1) / reader.duration if reader.duration else 0:.1f} fps)")
+        print(f"Bytes:    {sizes.sum()} ({sizes.mean():.0f} per frame)")
+        formats = {}
+        for i in range(len(reader)):
+            header = reader.header(i)
+            key = (header.width, header.height, header.pixel_format, header.attrs)
+            formats[key] = formats.get(key, 0) + 1
+        for (width, height, pixel_format, attrs), count in formats.items():
+            print(f"Format:   {width}x{height}, pixel format {pixel_format}, attrs 0x{attrs:02x}: {count} frames")
+
+def main():
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    p = subparsers.add_parser('record', help="Record published frames")
+    p.add_argument("--output", "-o", help="Capture file to write", required=True)
+    p.add_argument("--seconds", help="Stop after this many seconds (default: until interrupted)", type=float)
+    p.add_argument("--frames", help="Stop after this many frames", type=int)
+    p.add_argument("--subject", help=f"Subject to record (default: {DEFAULT_SUBJECT})", default=DEFAULT_SUBJECT)
+    p.add_argument("--nats-url", help=f"NATS server (default: {DEFAULT_NATS_URL})", default=DEFAULT_NATS_URL)
+
+    p = subparsers.add_parser('replay', help="Publish recorded frames")
+    p.add_argument("input", help="Capture file to read")
+    p.add_argument("--speed", help="Playback speed; 0 to send as fast as possible (default: 1)", type=float, default=1.0)
+    p.add_argument("--loop", help="Times to play the capture (default: 1)", type=int, default=1)
+    p.add_argument("--keep-stamps", help="Send header extensions as recorded, rather than with new timestamps", action="store_true")
+    p.add_argument("--subject", help=f"Subject to publish to (default: {DEFAULT_SUBJECT})", default=DEFAULT_SUBJECT)
+    p.add_argument("--nats-url", help=f"NATS server (default: {DEFAULT_NATS_URL})", default=DEFAULT_NATS_URL)
+
+    p = subparsers.add_parser('info', help="Describe a capture")
+    p.add_argument("input", help="Capture file to read")
+
+    args = parser.parse_args()
+    try:
+        if args.command == 'record':
+            asyncio.run(record(args))
+        elif args.command == 'replay':
+            if args.speed < 0:
+                parser.error("--speed can't be negative")
+            asyncio.run(replay(args))
+        else:
+            info(args)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
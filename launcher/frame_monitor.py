@@ -0,0 +1,115 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import deque
+import frames
+import numpy as np
+import threading
+import time
+
+# Stats cover the frames received in the last this many seconds
+DEFAULT_WINDOW = 5.0
+# Upper bound on the frames kept for the window
+MAX_SAMPLES = 1024
+
+class FrameSample:
+
+    def __init__(self, received, size, raw_size):
+        self.received = received
+        # Published (compressed) and decompressed size, header excluded
+        self.size = size
+        self.raw_size = raw_size
+
+class FrameMonitor:
+
+    # Health of a cabinet's frame stream, as seen by the launcher: frame
+    # rate, how evenly frames arrive, bandwidth, and how well they
+    # compress. Only headers are read, so keeping track costs next to
+    # nothing per frame; stats are worked out when asked for.
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=MAX_SAMPLES)
+        self._header = None
+        self._received = 0
+        self._malformed = 0
+
+    def put(self, data):
+        # Subscription callback; runs on the client's loop thread
+        now = time.monotonic()
+        try:
+            header = frames.parse_header(data)
+        except ValueError:
+            with self._lock:
+                self._malformed += 1
+            return
+        sample = FrameSample(now, len(data) - header.offset, header.size)
+        with self._lock:
+            self._samples.append(sample)
+            self._header = header
+            self._received += 1
+            while self._samples[0].received < now - self.window:
+                self._samples.popleft()
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            samples = [ sample for sample in self._samples if sample.received >= now - self.window ]
+            header = self._header
+            stats = {
+                'received': self._received,
+                'malformed': self._malformed,
+                'age': now - self._samples[-1].received if self._samples else None,
+            }
+
+        if header:
+            stats['format'] = {
+                'width': header.width,
+                'height': header.height,
+                'pitch': header.pitch,
+                'pixel_format': header.pixel_format,
+                'attrs': header.attrs,
+            }
+        if len(samples) < 2:
+            return stats
+
+        received = np.array([ sample.received for sample in samples ])
+        sizes = np.array([ sample.size for sample in samples ])
+        raw_sizes = np.array([ sample.raw_size for sample in samples ])
+        span = received[-1] - received[0]
+        # Time between frames, and how far each one is off the median
+        intervals = np.diff(received) * 1000
+        jitter = np.abs(intervals - np.median(intervals))
+
+        stats.update({
+            'window': span,
+            'fps': (len(samples) - 1) / span if span > 0 else None,
+            'interval_ms': {
+                'p50': float(np.percentile(intervals, 50)),
+                'p95': float(np.percentile(intervals, 95)),
+                'p99': float(np.percentile(intervals, 99)),
+                'max': float(intervals.max()),
+            },
+            'jitter_ms': {
+                'p50': float(np.percentile(jitter, 50)),
+                'p95': float(np.percentile(jitter, 95)),
+                'p99': float(np.percentile(jitter, 99)),
+            },
+            # The first frame's bytes arrived before the window started
+            'bytes_per_sec': float(sizes[1:].sum() / span) if span > 0 else None,
+            'frame_bytes': float(sizes.mean()),
+            'compression_ratio': float(raw_sizes.sum() / sizes.sum()) if sizes.sum() else None,
+        })
+        return stats
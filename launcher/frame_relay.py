@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Splits each cabinet's frames into the regions its subscribers show,
+# and republishes every region as a frame of its own on
+# <prefix>.frames.<region>. A subscriber started with --region then
+# receives and decompresses only its share of each frame, rather than
+# the whole frame to crop most of it away. Regions are configured in
+# the launcher's config (game_server.frame_relay), and the relay runs
+# as a service of its own next to the launcher:
+#
+#   python3 frame_relay.py --platform-config config.yaml
+
+import argparse
+import asyncio
+import config
+import frames
+import logging
+import lz4.block
+import nats
+import numpy as np
+import rpc
+import time
+
+# Matches pub; see LZ4_compress_fast in xm_pub.c
+LZ4_ACCELERATION = 4
+DEFAULT_STATS_INTERVAL = 60.0
+
+class RegionRelay:
+
+    # One region of the display, cropped from frames as sub would crop
+    # it, and sent as a frame exactly the size of the region. The frame
+    # is centered the way sub would center it, and parts of the region it
+    # doesn't cover are black, so a subscriber shows the region one to
+    # one (--src-rect and --content-rect both 0,0-<width>,<height>).
+    # The header extension is passed through unchanged.
+
+    def __init__(self, name, rect, content, subject):
+        self.name = name
+        self.rect = rect
+        self.content = content
+        self.subject = subject
+        self.width = rect[2] - rect[0]
+        self.height = rect[3] - rect[1]
+        self._pixels = None
+        self._payload = None
+
+    def split(self, header, values):
+        # The region's frame: the header, then its compressed pixels.
+        # values is the upright view of the source frame (frames.to_values),
+        # so the region goes out upright whatever way the frame came in
+        rows, columns, x, y = frames.crop(header.width, header.height, self.rect, self.content)
+        region = np.zeros((self.height, self.width) + values.shape[2:], dtype=values.dtype)
+        region[y:y + rows.stop - rows.start, x:x + columns.stop - columns.start] = values[rows, columns]
+
+        pixels = region.tobytes()
+        if pixels != self._pixels:
+            # A still region compresses to what it did last time
+            self._pixels = pixels
+            self._payload = lz4.block.compress(pixels, mode='fast', acceleration=LZ4_ACCELERATION, store_size=False)
+        return frames.HEADER.pack(
+            len(pixels) // self.height,
+            self.width,
+            self.height,
+            header.pixel_format,
+            header.attrs & ~frames.ATTR_ROT180,
+        ), self._payload
+
+class FrameRelay:
+
+    # Relays one cabinet's frames
+
+    def __init__(self, source, regions):
+        self.source = source
+        self.regions = regions
+        self.received = 0
+        self.dropped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.busy = 0.0
+
+    async def on_frame(self, nc, data):
+        started = time.perf_counter()
+        try:
+            header, pixels = frames.parse(data)
+            values = frames.to_values(pixels, header.width, header.height, header.pitch, header.pixel_format, header.attrs)
+        except Exception as e:
+            logging.debug(f"Dropping frame from '{self.source}': {e}")
+            self.dropped += 1
+            return
+        # The extension, if any, goes with every region
+        ext = data[frames.HEADER.size:header.offset]
+
+        self.received += 1
+        self.bytes_in += len(data)
+        for region in self.regions:
+            head, payload = region.split(header, values)
+            await nc.publish(region.subject, head + ext + payload)
+            self.bytes_out += len(head) + len(ext) + len(payload)
+        self.busy += time.perf_counter() - started
+
+    def log_stats(self, elapsed):
+        if self.received:
+            logging.info(
+                f"'{self.source}': {self.received / elapsed:.1f} fps, "
+                f"{self.bytes_in / elapsed / 1024:.0f} KB/s in, "
+                f"{self.bytes_out / len(self.regions) / elapsed / 1024:.0f} KB/s out per region, "
+                f"{self.busy / self.received * 1000:.2f} ms per frame, {self.dropped} dropped")
+        self.received = self.dropped = self.bytes_in = self.bytes_out = 0
+        self.busy = 0.0
+
+def load_relays(config):
+    # A FrameRelay for each cabinet with regions to relay, by NATS server
+    entries = config.get('cabinets') or [
+        {
+            'subject_prefix': rpc.DEFAULT_SUBJECT_PREFIX,
+        },
+    ]
+    relays = {}
+    for entry in entries:
+        settings = { **config, **entry }
+        if not (regions := (settings.get('frame_relay') or {}).get('regions')):
+            continue
+        subjects = rpc.Subjects(entry.get('subject_prefix') or rpc.cabinet_prefix(entry['id']))
+        relays.setdefault(settings['nats_url'], []).append(FrameRelay(
+            subjects.frames,
+            [
+                RegionRelay(
+                    region['name'],
+                    region['rect'],
+                    region.get('content', region['rect']),
+                    f"{subjects.frames}.{region['name']}",
+                ) for region in regions
+            ],
+        ))
+    return relays
+
+async def run(relays, stats_interval):
+    connections = []
+    for nats_url, cabinet_relays in relays.items():
+        nc = await nats.connect(nats_url)
+        connections.append(nc)
+        for relay in cabinet_relays:
+            async def on_frame(msg, nc=nc, relay=relay):
+                await relay.on_frame(nc, msg.data)
+            await nc.subscribe(relay.source, cb=on_frame)
+            logging.info(f"Relaying '{relay.source}' to {', '.join(region.subject for region in relay.regions)}")
+
+    try:
+        while True:
+            await asyncio.sleep(stats_interval)
+            for cabinet_relays in relays.values():
+                for relay in cabinet_relays:
+                    relay.log_stats(stats_interval)
+    finally:
+        for nc in connections:
+            await nc.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--platform-config", "-pc", help="Path to platform configuration file (default: config.yaml)", default="config.yaml")
+    parser.add_argument("--stats-interval", help=f"Seconds between stats in the log (default: {DEFAULT_STATS_INTERVAL:.0f})", type=float, default=DEFAULT_STATS_INTERVAL)
+    parser.add_argument("--log-level", "-l", help="Logging level (default: INFO)", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"])
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=getattr(logging, args.log_level),
+        format='%(asctime)s:%(levelname)s:%(message)s',
+    )
+
+    konfig = config.Config(args.platform_config)
+    if not (relays := load_relays(konfig.game_server)):
+        logging.error("No frame_relay regions configured")
+        return
+    try:
+        asyncio.run(run(relays, args.stats_interval))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import deque
+import frames
+import threading
+import time
+
+# Newest frame older than this means the publisher has stopped
+DEFAULT_MAX_AGE = 2.0
+# Latencies kept for the percentiles
+LATENCY_WINDOW = 256
+# A sequence number further back than this from the last one (modulo
+# 2^32) means the publisher restarted, rather than that frames were lost
+SEQUENCE_RESTART = 1 << 31
+
+class TappedFrame:
+
+    def __init__(self, data, received):
+        # data is the frame as published: header and LZ4 payload
+        self.data = data
+        self.received = received
+
+    @property
+    def age(self):
+        return time.monotonic() - self.received
+
+class FrameTap:
+
+    # Last frames published by a cabinet, as received, in a bounded ring
+    # buffer. One subscription feeds every reader, so a snapshot is served
+    # from memory instead of waiting for the next frame. Frames are kept
+    # compressed and only decoded when asked for.
+    #
+    # If the publisher sends sequence numbers and timestamps (pub
+    # --frame-ext), gaps in the sequence are counted as dropped frames,
+    # and the time from publication to receipt is tracked. The latency is
+    # only meaningful with the launcher and pub on the same host, as the
+    # timestamps are from the publisher's monotonic clock.
+
+    def __init__(self, capacity, max_age=DEFAULT_MAX_AGE):
+        self.capacity = capacity
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._frames = deque(maxlen=capacity)
+        self._received = 0
+        self._sequence = None
+        self._dropped = 0
+        self._restarts = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def put(self, data):
+        # Subscription callback; runs on the client's loop thread
+        frame = TappedFrame(data, time.monotonic())
+        try:
+            header = frames.parse_header(data)
+        except ValueError:
+            header = None
+        with self._lock:
+            self._frames.append(frame)
+            self._received += 1
+            if header and header.sequence is not None:
+                self._track(header, frame.received)
+
+    def _track(self, header, received):
+        if self._sequence is not None:
+            gap = (header.sequence - self._sequence - 1) & 0xffffffff
+            if gap < SEQUENCE_RESTART:
+                self._dropped += gap
+            else:
+                self._restarts += 1
+        self._sequence = header.sequence
+        self._latencies.append(received - header.timestamp)
+
+    def get(self, index=0):
+        # index 0 is the newest frame. Returns None if there is no such
+        # frame, or if the newest frame is too old to be current
+        with self._lock:
+            if index < 0 or index >= len(self._frames):
+                return None
+            if self._frames[-1].age > self.max_age:
+                return None
+            return self._frames[-1 - index]
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                'capacity': self.capacity,
+                'buffered': len(self._frames),
+                'received': self._received,
+                'age': self._frames[-1].age if self._frames else None,
+            }
+            if self._sequence is None:
+                return stats
+            latencies = sorted(self._latencies)
+            stats.update({
+                'sequence': self._sequence,
+                'dropped': self._dropped,
+                'restarts': self._restarts,
+                'latency_ms': {
+                    'p50': latencies[len(latencies) // 2] * 1000,
+                    'p99': latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1000,
+                    'max': latencies[-1] * 1000,
+                },
+            })
+            return stats
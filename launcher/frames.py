@@ -0,0 +1,172 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Frames published by pub (see pubsub/frame.h): a FrameHeader followed by
+# the LZ4-compressed pixel buffer. Pixels are decoded with array views and
+# lookup tables rather than per-pixel Python, to the same colors the LED
+# matrix renderers in sub.c produce.
+
+from PIL import Image
+import lz4.block
+import numpy as np
+import struct
+
+# pitch(u16), width(u16), height(u16), pixel_format(u8), attrs(u8)
+HEADER = struct.Struct("<HHHBB")
+
+PF_RGB565   = 1
+PF_RGBA8888 = 2
+PF_RGBA5551 = 3
+PF_ARGB8888 = 4
+
+# Frame is upside down, e.g. for a title rotated 180 degrees
+ATTR_ROT180 = 0x01
+# Header is followed by an extension (FrameHeaderExt in frame.h)
+ATTR_EXT = 0x80
+
+# version(u8), size(u8), reserved(u16), sequence(u32), timestamp_us(u64).
+# size covers the whole extension, which later versions may add to
+HEADER_EXT = struct.Struct("<BBHIQ")
+
+BYTES_PER_PIXEL = {
+    PF_RGB565: 2,
+    PF_RGBA8888: 4,
+    PF_RGBA5551: 2,
+    PF_ARGB8888: 4,
+}
+
+class Header:
+
+    def __init__(self, pitch, width, height, pixel_format, attrs):
+        self.pitch = pitch
+        self.width = width
+        self.height = height
+        self.pixel_format = pixel_format
+        self.attrs = attrs
+        # From the extension, if the publisher sends one. The timestamp
+        # is the publisher's CLOCK_MONOTONIC, as is time.monotonic()
+        self.sequence = None
+        self.timestamp_us = None
+        # Where the compressed pixels start
+        self.offset = HEADER.size
+
+    @property
+    def size(self):
+        # Size of the uncompressed pixel buffer
+        return self.pitch * self.height
+
+    @property
+    def timestamp(self):
+        # Publication time in seconds, if known
+        return self.timestamp_us / 1e6 if self.timestamp_us is not None else None
+
+def build_lut(r_shift, g_shift, g_bits, b_shift):
+    # RGB for every 16-bit pixel value, scaled the way sub.c scales it
+    c = np.arange(0x10000, dtype=np.uint32)
+    g_max = (1 << g_bits) - 1
+    return np.stack([
+        ((c >> r_shift) & 0x1f) * 255 // 31,
+        ((c >> g_shift) & g_max) * 255 // g_max,
+        ((c >> b_shift) & 0x1f) * 255 // 31,
+    ], axis=-1).astype(np.uint8)
+
+LUTS = {
+    PF_RGB565: build_lut(11, 5, 6, 0),
+    PF_RGBA5551: build_lut(11, 6, 5, 1),
+}
+# Byte offsets of R, G and B in a little-endian 32-bit pixel, and the
+# Pillow raw mode that unpacks the same bytes
+CHANNELS = {
+    PF_ARGB8888: [ 2, 1, 0 ],
+    PF_RGBA8888: [ 3, 2, 1 ],
+}
+RAW_MODES = {
+    PF_ARGB8888: 'BGRX',
+    PF_RGBA8888: 'XBGR',
+}
+
+def parse_header(raw):
+    # Header of a published frame, including the extension if there is
+    # one. Raises ValueError if the frame is too short
+    if len(raw) < HEADER.size:
+        raise ValueError(f"Frame too short: {len(raw)} bytes")
+    header = Header(*HEADER.unpack_from(raw))
+    if header.attrs & ATTR_EXT:
+        size = raw[HEADER.size + 1] if len(raw) >= HEADER.size + 2 else 0
+        if size < 2 or len(raw) < HEADER.size + size:
+            raise ValueError("Malformed header extension")
+        if size >= HEADER_EXT.size:
+            _, _, _, header.sequence, header.timestamp_us = HEADER_EXT.unpack_from(raw, HEADER.size)
+        header.offset += size
+    return header
+
+def without_ext(raw):
+    # The frame as it would have been published without the extension,
+    # so that frames with the same contents compare and hash the same
+    if len(raw) < HEADER.size or not raw[HEADER.size - 1] & ATTR_EXT:
+        return raw
+    header = parse_header(raw)
+    return raw[:HEADER.size - 1] + bytes([ header.attrs & ~ATTR_EXT ]) + raw[header.offset:]
+
+def parse(raw):
+    # Header and decompressed pixels of a published frame
+    header = parse_header(raw)
+    pixels = lz4.block.decompress(raw[header.offset:], uncompressed_size=header.size)
+    return header, pixels
+
+def crop(width, height, rect, content):
+    # Where a width x height frame overlaps rect (x1, y1, x2, y2), once
+    # centered in the content rect the way sub centers it: the frame's
+    # rows and columns inside rect, and where they start in rect (x, y)
+    x_delta = int((content[2] - width) / 2)
+    y_delta = int((content[3] - height) / 2)
+    top = max(0, rect[1] - y_delta)
+    left = max(0, rect[0] - x_delta)
+    rows = slice(top, max(top, min(height, rect[3] - y_delta)))
+    columns = slice(left, max(left, min(width, rect[2] - x_delta)))
+    return rows, columns, left + x_delta - rect[0], top + y_delta - rect[1]
+
+def to_values(pixels, width, height, pitch, pixel_format, attrs=0):
+    # Upright view of the pixel values, without copying: height x width
+    # 16-bit values, or height x width x 4 bytes for 32-bit formats. Row
+    # padding is skipped with strides rather than copied out
+    if not (bpp := BYTES_PER_PIXEL.get(pixel_format)):
+        raise ValueError(f"Unsupported pixel format: {pixel_format}")
+    if pitch < width * bpp or len(pixels) < pitch * (height - 1) + width * bpp:
+        raise ValueError(f"Buffer too small for {width}x{height} frame with pitch {pitch}")
+
+    if bpp == 2:
+        values = np.ndarray((height, width), dtype='<u2', buffer=pixels, strides=(pitch, 2))
+    else:
+        values = np.ndarray((height, width, 4), dtype=np.uint8, buffer=pixels, strides=(pitch, 4, 1))
+    # Rotating the view is free
+    if attrs & ATTR_ROT180:
+        values = values[::-1, ::-1]
+    return values
+
+def to_array(pixels, width, height, pitch, pixel_format, attrs=0):
+    # Upright height x width x 3 RGB array
+    values = to_values(pixels, width, height, pitch, pixel_format, attrs)
+    if values.ndim == 2:
+        return LUTS[pixel_format][values]
+    return values[..., CHANNELS[pixel_format]]
+
+def decode_frame(pixels, width, height, pitch, pixel_format, attrs=0):
+    if raw_mode := RAW_MODES.get(pixel_format):
+        # Pillow unpacks these natively, faster than an array copy
+        image = Image.frombuffer('RGB', (width, height), pixels, 'raw', raw_mode, pitch, 1)
+        if attrs & ATTR_ROT180:
+            image = image.transpose(Image.Transpose.ROTATE_180)
+        return image
+    return Image.fromarray(to_array(pixels, width, height, pitch, pixel_format, attrs))
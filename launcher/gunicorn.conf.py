@@ -0,0 +1,53 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Production server config. The app, including the game catalog, is
+# loaded once in the master before forking, so the workers share it
+# copy-on-write. Workers connect to NATS after the fork, relay Socket.IO
+# messages between each other over it, and ask the master to reload (by
+# SIGHUP) when the game config changes. WEB_CONCURRENCY sets the number
+# of workers; it defaults to one per core.
+
+import gc
+import multiprocessing
+import os
+
+os.environ.setdefault('PRODUCTION', 'true')
+
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+os.environ['LAUNCHER_WORKERS'] = str(workers)
+
+bind = f":{os.environ.get('HTTP_PORT', 8080)}"
+worker_class = 'eventlet'
+preload_app = True
+accesslog = '-'
+errorlog = '-'
+# The control socket runs asyncio in a thread of the master, which the
+# preloaded app has monkey patched for eventlet. The setting is new in
+# gunicorn 25.1 (older versions reject it); requirements.txt pins 25.3.0
+control_socket_disable = True
+
+def when_ready(server):
+    # Keep the collector from touching (and so copying) the pages of
+    # objects loaded before the fork
+    gc.freeze()
+
+def on_reload(server):
+    import launcher
+    launcher.reload_game_config()
+    gc.freeze()
+
+def post_worker_init(worker):
+    import launcher
+    launcher.start_service()
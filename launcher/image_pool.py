@@ -0,0 +1,133 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import deque
+import threading
+import time
+
+try:
+    from eventlet import patcher
+    from eventlet import tpool
+except ImportError:
+    tpool = None
+
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE = 8
+# Longest a job waits for a worker before it is turned away
+DEFAULT_QUEUE_TIMEOUT = 2.0
+SAMPLE_WINDOW = 200
+
+class PoolBusyError(Exception):
+    pass
+
+def _execute(fn, *args):
+    # Under eventlet, every request shares the hub's thread, so the job
+    # runs on one of eventlet's native threads while the request yields.
+    # Decompression, decoding and encoding release the GIL, so other
+    # requests are served meanwhile. Otherwise each request has a thread
+    # of its own already
+    if tpool and patcher.is_monkey_patched('thread'):
+        return tpool.execute(fn, *args)
+    return fn(*args)
+
+def _percentile(samples, p):
+    if not samples:
+        return None
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+class ImagePool:
+
+    # Runs CPU-bound image work (decoding frames, encoding snapshots and
+    # clips) off the request thread. At most max_workers jobs run at once
+    # and at most max_queue wait for a turn; anything past that fails
+    # right away with PoolBusyError, rather than piling up behind work
+    # that will take seconds to clear. Jobs must not take locks that the
+    # request threads hold, since under eventlet those are green locks.
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, max_queue=DEFAULT_QUEUE, queue_timeout=DEFAULT_QUEUE_TIMEOUT):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self._running = 0
+        self._waiting = 0
+        self._waits = deque(maxlen=SAMPLE_WINDOW)
+        self._runs = deque(maxlen=SAMPLE_WINDOW)
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def run(self, fn, *args):
+        # Result of fn(*args), once a worker has run it. Raises
+        # PoolBusyError if the queue is full, or if no worker frees up in
+        # time
+        queued = time.monotonic()
+        with self._cond:
+            if self._running >= self.max_workers:
+                if self._waiting >= self.max_queue:
+                    self.rejected += 1
+                    raise PoolBusyError("Too many image jobs queued")
+                self._waiting += 1
+                try:
+                    if not self._cond.wait_for(lambda: self._running < self.max_workers, self.queue_timeout):
+                        self.timeouts += 1
+                        raise PoolBusyError("Timed out waiting for an image worker")
+                finally:
+                    self._waiting -= 1
+            self._running += 1
+
+        started = time.monotonic()
+        try:
+            result = _execute(fn, *args)
+        except BaseException:
+            with self._cond:
+                self.failed += 1
+            raise
+        finally:
+            finished = time.monotonic()
+            with self._cond:
+                self._running -= 1
+                self._waits.append(started - queued)
+                self._runs.append(finished - started)
+                self._cond.notify()
+
+        with self._cond:
+            self.completed += 1
+        return result
+
+    def stats(self):
+        with self._cond:
+            waits = list(self._waits)
+            runs = list(self._runs)
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'running': self._running,
+                'waiting': self._waiting,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'queue_wait': {
+                    'p50': _percentile(waits, 0.5),
+                    'p99': _percentile(waits, 0.99),
+                    'max': max(waits, default=None),
+                },
+                'run_time': {
+                    'p50': _percentile(runs, 0.5),
+                    'p99': _percentile(runs, 0.99),
+                },
+            }
@@ -0,0 +1,76 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+class Launch:
+
+    def __init__(self, uid, title=None):
+        self.uid = uid
+        self.title = title
+        # launches row id, once the launch has been recorded
+        self.id = None
+        # The remote has reported the title launched
+        self.arrived = False
+
+class LaunchTracker:
+
+    # Tells when a launch made by this worker has become active, so that
+    # per-launch recorders start with the title actually running. A
+    # switch answers before its state events go out, and those are an
+    # exit of the title that was running, then a launch of the new one;
+    # starting on the response would let that exit end the new launch.
+    # A launch is active once the remote has reported the title launched
+    # and the launch has been recorded, in whichever order they happen.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = None
+
+    def expect(self, uid, title=None):
+        # Called before asking the remote to launch uid
+        with self._lock:
+            self._pending = Launch(uid, title)
+
+    def cancel(self):
+        with self._lock:
+            self._pending = None
+
+    def recorded(self, uid, launch_id):
+        # The launch has its row. Returns the Launch if it is now active
+        with self._lock:
+            if not (launch := self._pending) or launch.uid != uid:
+                return None
+            launch.id = launch_id
+            return self._activate()
+
+    def launched(self, uid):
+        # The remote reported uid launched (a TYPE_LAUNCH state event).
+        # Returns the Launch if it is now active
+        with self._lock:
+            if not (launch := self._pending):
+                return None
+            if launch.uid != uid:
+                # Something else launched in the meantime
+                self._pending = None
+                return None
+            launch.arrived = True
+            return self._activate()
+
+    def _activate(self):
+        launch = self._pending
+        if launch.id is None or not launch.arrived:
+            return None
+        self._pending = None
+        return launch
@@ -24,100 +24,109 @@ from flask import session
 from generated.common_pb2 import LaunchId
 from generated.responses_pb2 import Result
 import argparse
-import asyncio
+import cabinets as cab
+import clips
 import config
 import flask
 import flask_login
 import flask_socketio
-import generated.responses_pb2 as responses
+import functools
+import generated.events_pb2 as events
 import generated.requests_pb2 as requests
 import generated.replay_pb2 as replay
 import http
-import importlib
-import io
+import image_pool as ip
 import logging
-import lz4.block
-import nats
+import loop_client as lc
+import nats_client as nc
+import preview as pv
 import re
-import struct
+import resilience as rz
+import signal
+import snapshots
+import socketio_nats
 import subprocess
-from PIL import Image
+import transports as tr
 
 app = flask.Flask(__name__)
 
-socketio = flask_socketio.SocketIO(app)
+socketio = flask_socketio.SocketIO()
 
 import data.launches as dl
+import data.performance as dp
+import data.power as dpw
 
 import users
 
-RESPONSE_PACKAGE_NAME = "generated.responses_pb2"
 ROM_UPLOAD_FILENAME_REGEX = r'^[A-Za-z0-9]+\.[A-Za-z0-9]{1,7}$'
 ROM_UPLOAD_ALLOWED_TYPES = [ '.zip', '.7z' ]
 ROM_UPLOAD_MAX_FILES = 5
-
+# Set by the prefork server config to the number of workers. The app is
+# then loaded once in the master, and each worker starts its own clients
+WORKERS_ENV = "LAUNCHER_WORKERS"
+# Launcher-wide subjects, shared by all workers
+CONFIG_SUBJECT = "red.launcher.config"
+SOCKETIO_SUBJECT = "red.launcher.socketio"
+# Titles need this much play recorded to be ranked by /performance
+PERFORMANCE_MIN_SECONDS = 60
+
+workers = int(os.environ.get(WORKERS_ENV, 0))
+bus = None
+cabinets = {}
+default_cabinet = None
+# Live preview relays, by cabinet id
+previews = {}
+snapshot_cache = snapshots.SnapshotCache()
+image_pool = None
 platform_config_file = None
 games_config_file = None
 games_config_last_modified = 0
 
-def deserialize(message, type):
-    module_, class_ = type.rsplit('.', 1)
-    class_ = getattr(importlib.import_module(module_), class_)
-    rv = class_()
-    rv.ParseFromString(message)
-    return rv
-
-async def request_pub_async(request):
-    subject = f"red.pub.request"
-    logging.info(f"Requesting '{subject}'")
-
-    nc = await nats.connect(konfig.game_server['nats_url'])
-    try:
-        encoded_data = request.SerializeToString()
-        response = await nc.request(subject, encoded_data, timeout=0.5)
-        resp = responses.ResponseEnvelope()
-        resp.ParseFromString(response.data)
-
-        logging.debug(f"Received response for subject '{subject}': {resp}")
-    except TimeoutError:
-        # FIXME: return a more specific error to client
-        logging.error("Request timed out")
-
-    await nc.close()
-
-    return resp
-
-def request_pub(request):
-    return asyncio.run(request_pub_async(request))
-
-async def request_topic_async(topic, request, response_type):
-    subject = f"red.query.{topic}"
-    logging.info(f"Requesting subject '{subject}'")
-
-    nc = await nats.connect(konfig.game_server['nats_url'])
-    try:
-        encoded_data = request.SerializeToString()
-        response = await nc.request(subject, encoded_data, timeout=0.5)
-        response_obj = deserialize(response.data, response_type)
-        logging.debug(f"Received response for subject '{subject}': {response_obj}")
-    except TimeoutError:
-        # FIXME: return a more specific error to client
-        logging.error("Request timed out")
-
-    # Terminate connection to NATS.
-    await nc.drain()
-
-    return response_obj
-
-def request_topic(request, topic=None, response_type=None):
-    request_class_name = request.__class__.__name__.removesuffix('Request')
-    if topic is None:
-        topic = re.sub(r'(?<!^)(?=[A-Z])', '_', request_class_name).lower()
-    if response_type is None:
-        response_type = f"{RESPONSE_PACKAGE_NAME}.{request_class_name}Response"
+def remote_unavailable(e):
+    logging.warning(f"Failing fast: {e.message}")
+    return {
+        'status': 'ERR',
+        'message': 'Game server unavailable',
+    }, http.HTTPStatus.SERVICE_UNAVAILABLE
 
-    logging.debug(f"Requesting '{topic}' with response type of '{response_type}'")
-    return asyncio.run(request_topic_async(topic, request, response_type))
+def image_pool_busy(e):
+    # Shed load rather than queue requests that would time out anyway
+    logging.warning(f"Image request rejected: {e}")
+    return {
+        'status': 'ERR',
+        'message': 'Server busy, try again shortly',
+    }, http.HTTPStatus.SERVICE_UNAVAILABLE, { 'Retry-After': '1' }
+
+def requested_cabinet():
+    # Cabinet named by the "cabinet" query or JSON parameter, or the first
+    # configured one if not specified. None if there is no such cabinet
+    id = flask.request.args.get('cabinet')
+    if id is None and flask.request.is_json:
+        id = (flask.request.get_json(silent=True) or {}).get('cabinet')
+    return cabinets.get(id) if id is not None else default_cabinet
+
+def with_cabinet(f):
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        if not (cabinet := requested_cabinet()):
+            return {
+                'status': 'ERR',
+                'message': 'Cabinet not found',
+            }, http.HTTPStatus.NOT_FOUND
+        return f(cabinet, *args, **kwargs)
+    return wrapper
+
+def cabinet_room(cabinet):
+    return f"cabinet:{cabinet.id}"
+
+def state_as_dict(state):
+    title = game_konfig.game_map.get(state.active) if state.active else None
+    return {
+        'title': title.as_dict() if title else None,
+        'is_running': state.is_running,
+        'volume': state.volume,
+        'idle': state.idle,
+    }
 
 @app.route('/')
 @flask_login.login_required
@@ -143,9 +152,12 @@ def games():
 
 @app.route('/query')
 @flask_login.login_required
-def query():
+@with_cabinet
+def query(cabinet):
     try:
-        result = request_topic(requests.StateRequest())
+        state = cabinet.state()
+    except rz.RemoteUnavailableError as e:
+        return remote_unavailable(e)
     except Exception as e:
         logging.error(f"Failed to query game state: {e}")
         return {
@@ -153,18 +165,164 @@ def query():
             'message': 'Failed to query game state',
         }, http.HTTPStatus.INTERNAL_SERVER_ERROR
 
-    active = result.active
-    tag = f"{active.app_id}:{active.title_id}" if result.is_running else None
+    return state_as_dict(state)
+
+@app.route('/status')
+@flask_login.login_required
+def status():
+    # State of all cabinets, queried in parallel
+    results = []
+    for cabinet, state, error in cab.fan_out(list(cabinets.values()), lambda cabinet: cabinet.state()):
+        result = {
+            'id': cabinet.id,
+            'name': cabinet.name,
+        }
+        if error:
+            logging.warning(f"Failed to query state of cabinet '{cabinet.id}': {error}")
+            result['status'] = 'ERR'
+        else:
+            result['status'] = 'OK'
+            result.update(state_as_dict(state))
+        results.append(result)
+
+    return { 'cabinets': results }
 
+@app.route('/metrics')
+@flask_login.login_required
+def metrics():
     return {
-        'title': game_konfig.game_map.get(tag).as_dict() if tag else None,
-        'is_running': result.is_running,
-        'volume': result.volume,
+        'cabinets': {
+            id: {
+                **cabinet.stats(),
+                'preview': previews[id].stats(),
+            } for id, cabinet in cabinets.items()
+        },
+        'snapshot_cache': snapshot_cache.stats(),
+        'image_pool': image_pool.stats(),
     }
 
+@socketio.on('connect')
+def socket_connect():
+    if not flask_login.current_user.is_authenticated:
+        return False
+    # Clients only get events for the cabinet they control
+    if not (cabinet := requested_cabinet()):
+        return False
+    flask_socketio.join_room(cabinet_room(cabinet))
+
+@socketio.on('disconnect')
+def socket_disconnect(reason=None):
+    if cabinet := requested_cabinet():
+        previews[cabinet.id].stop(flask.request.sid)
+
+@socketio.on('preview_start')
+def socket_preview_start(options=None):
+    # Streams the cabinet's frames to the client, which acknowledges each
+    # one; options may cap the frame rate
+    if cabinet := requested_cabinet():
+        fps = (options or {}).get('fps', pv.DEFAULT_MAX_FPS)
+        previews[cabinet.id].start(flask.request.sid, int(fps))
+
+@socketio.on('preview_stop')
+def socket_preview_stop():
+    if cabinet := requested_cabinet():
+        previews[cabinet.id].stop(flask.request.sid)
+
+def on_state_event(cabinet, data):
+    event = events.StateEvent()
+    event.ParseFromString(data)
+    logging.debug(f"Received state event: {event}")
+
+    tag = f"{event.active.app_id}:{event.active.title_id}" if event.is_running else None
+    if cabinet.cadence:
+        record_cadence(cabinet, cabinet.cadence.check_state(tag))
+    if cabinet.power:
+        record_power(cabinet, cabinet.power.check_state(tag))
+    if event.type == events.StateEvent.Type.TYPE_LAUNCH and tag:
+        start_recorders(cabinet, cabinet.launches.launched(tag))
+
+    # Relay to browsers in the same shape as /query, with only the fields
+    # that the event is about
+    if event.type == events.StateEvent.Type.TYPE_VOLUME:
+        cabinet.state_cache.update(volume=event.volume)
+        state = {
+            'volume': event.volume,
+        }
+    elif event.type == events.StateEvent.Type.TYPE_IDLE:
+        logging.info(f"Cabinet '{cabinet.id}' is {'idle' if event.idle else 'active'}")
+        cabinet.state_cache.update(idle=event.idle)
+        state = {
+            'idle': event.idle,
+        }
+    else:
+        cabinet.state_cache.update(active=tag, is_running=event.is_running, idle=event.idle)
+        title = game_konfig.game_map.get(tag) if tag else None
+        state = {
+            'title': title.as_dict() if title else None,
+            'is_running': event.is_running,
+            'idle': event.idle,
+        }
+
+    # Every worker receives state events and relays them to its own
+    # clients, so this doesn't need to go through the message queue
+    socketio.emit('state', state, to=cabinet_room(cabinet), ignore_queue=True)
+
+def start_recorders(cabinet, launch):
+    # Starts the per-launch recorders once a launch is active (see
+    # launch_tracker.LaunchTracker)
+    if not launch:
+        return
+    if cabinet.cadence:
+        record_cadence(cabinet, cabinet.cadence.start(launch.id, launch.uid, getattr(launch.title, 'fps', None)))
+    if cabinet.power:
+        record_power(cabinet, cabinet.power.start(launch.id, launch.uid))
+
+def record_cadence(cabinet, cadence):
+    # Stores the frame cadence of a finished launch. Called from request
+    # handlers and from subscription callbacks, which have no app context
+    if not cadence or cadence.frames < 2:
+        return
+    logging.info(f"Launch {cadence.launch_id} of {cadence.uid} on cabinet '{cabinet.id}' ran at {cadence.fps:.1f}/{cadence.nominal_fps} fps over {cadence.duration:.0f}s, with {cadence.stalls} stall(s)")
+    try:
+        with app.app_context():
+            dp.create_launch_performance(cabinet.id, cadence)
+    except Exception as e:
+        logging.error(f"Failed to record frame cadence: {e}")
+
+def record_power(cabinet, profile):
+    # Stores the estimated LED draw of a finished launch
+    if not profile:
+        return
+    try:
+        with app.app_context():
+            dpw.create_launch_power(cabinet.id, profile)
+    except Exception as e:
+        logging.error(f"Failed to record power profile: {e}")
+
+def on_power_budget(cabinet, region, amps, over):
+    # A half of the display went over its power budget, or is back under
+    if over:
+        logging.warning(f"Cabinet '{cabinet.id}' region '{region}' estimated at {amps:.1f}A, over its {cabinet.power.budget_amps}A budget")
+    else:
+        logging.info(f"Cabinet '{cabinet.id}' region '{region}' back under its power budget")
+    # Only the worker profiling the launch sees this, so the event goes
+    # through the message queue to clients of other workers
+    socketio.emit('power', {
+        'region': region,
+        'amps': amps,
+        'over_budget': over,
+    }, to=cabinet_room(cabinet))
+
+def on_heartbeat(cabinet, data):
+    heartbeat = events.Heartbeat()
+    heartbeat.ParseFromString(data)
+    if not cabinet.state_cache.put_heartbeat(heartbeat):
+        logging.debug(f"Ignoring out-of-order heartbeat {heartbeat.epoch}/{heartbeat.seq} from cabinet '{cabinet.id}'")
+
 @app.route('/volume', methods=['POST'])
 @flask_login.login_required
-def volume():
+@with_cabinet
+def volume(cabinet):
     dict = flask.request.json
 
     volume = dict.get('volume')
@@ -177,7 +335,9 @@ def volume():
         }, http.HTTPStatus.BAD_REQUEST
 
     try:
-        result = request_topic(requests.SetVolumeRequest(volume=volume))
+        result = cabinet.request_topic(requests.SetVolumeRequest(volume=volume))
+    except rz.RemoteUnavailableError as e:
+        return remote_unavailable(e)
     except Exception as e:
         logging.error(f"Failed to set volume: {e}")
         return {
@@ -185,13 +345,18 @@ def volume():
             'message': 'Failed to set volume',
         }, http.HTTPStatus.INTERNAL_SERVER_ERROR
 
+    cabinet.state_cache.update(volume=result.volume)
+
     return { 'volume': result.volume }
 
 @app.route('/stop', methods=['POST'])
 @flask_login.login_required
-def stop():
+@with_cabinet
+def stop(cabinet):
     try:
-        request_topic(requests.StopRequest())
+        cabinet.request_topic(requests.StopRequest())
+    except rz.RemoteUnavailableError as e:
+        return remote_unavailable(e)
     except Exception as e:
         logging.error(f"Failed to stop game: {e}")
         return {
@@ -199,11 +364,14 @@ def stop():
             'message': 'Failed to stop game',
         }, http.HTTPStatus.INTERNAL_SERVER_ERROR
 
+    cabinet.state_cache.update(active=None, is_running=False)
+
     return { 'status': 'OK' }
 
 @app.route('/launch', methods=['POST'])
 @flask_login.login_required
-def launch():
+@with_cabinet
+def launch(cabinet):
     dict = flask.request.json
 
     if not (id := dict.get('id')):
@@ -220,36 +388,43 @@ def launch():
             'message': 'Game not found',
         }, http.HTTPStatus.NOT_FOUND
 
+    if cabinet.cadence or cabinet.power:
+        cabinet.launches.expect(title.id, title)
     try:
-        state = request_topic(requests.StateRequest())
-        if state.is_running:
-            request_topic(requests.StopRequest())
-            dl.end_launch()
-
-        response = request_topic(
-            requests.LaunchRequest(
+        response = cabinet.request_topic(
+            requests.SwitchRequest(
                 launch_id=LaunchId(
                     app_id=title.app_id,
                     title_id=title.title_id,
                 ),
-            )
+            ),
         )
+        if response.was_running:
+            dl.end_launch(cabinet=cabinet.id)
 
+    except rz.RemoteUnavailableError as e:
+        cabinet.launches.cancel()
+        return remote_unavailable(e)
     except Exception as e:
         logging.error(f"Error during launch: {e}")
+        cabinet.launches.cancel()
         return {
             'status': 'ERR',
             'message': 'Failed to launch game',
         }, http.HTTPStatus.INTERNAL_SERVER_ERROR
 
     if response.result.status == Result.Status.STATUS_OK:
-        dl.create_launch(session_id=session.get('id'), uid=title.id)
+        logging.info(f"Switched cabinet '{cabinet.id}' to {title.id} (stop: {response.stop_usec / 1000:.1f}ms, launch: {response.launch_usec / 1000:.1f}ms)")
+        cabinet.state_cache.update(active=title.id, is_running=True)
+        launch = dl.create_launch(session_id=session.get('id'), uid=title.id, cabinet=cabinet.id)
+        start_recorders(cabinet, cabinet.launches.recorded(title.id, launch.id))
         dl.increment_launch_count(uid=title.id)
         return {
             'status': 'OK',
             'title': title.as_dict(),
         }
     else:
+        cabinet.launches.cancel()
         return {
             'status': 'ERR',
             'message': 'Failed to launch',
@@ -332,12 +507,13 @@ def sync():
 
 @app.route('/record', methods=['POST'])
 @flask_login.login_required
-def record():
+@with_cabinet
+def record(cabinet):
     slot = flask.request.json.get('slot')
     slot = max(0, min(slot, 9)) if isinstance(slot, int) else 0
 
     try:
-        response = request_pub(
+        response = cabinet.request_pub(
             requests.RequestEnvelope(
                 replay_record=replay.ReplayRecordRequest(
                     slot = slot
@@ -358,12 +534,13 @@ def record():
 
 @app.route('/playback', methods=['POST'])
 @flask_login.login_required
-def playback():
+@with_cabinet
+def playback(cabinet):
     slot = flask.request.json.get('slot')
     slot = max(0, min(slot, 9)) if isinstance(slot, int) else 0
 
     try:
-        response = request_pub(
+        response = cabinet.request_pub(
             requests.RequestEnvelope(
                 replay_playback=replay.ReplayPlaybackRequest(
                     slot = slot
@@ -384,9 +561,10 @@ def playback():
 
 @app.route('/stop_replay', methods=['POST'])
 @flask_login.login_required
-def stop_replay():
+@with_cabinet
+def stop_replay(cabinet):
     try:
-        response = request_pub(
+        response = cabinet.request_pub(
             requests.RequestEnvelope(
                 replay_stop=replay.ReplayStopRequest()
             )
@@ -405,12 +583,13 @@ def stop_replay():
 
 @app.route('/resume_record', methods=['POST'])
 @flask_login.login_required
-def resume_record():
+@with_cabinet
+def resume_record(cabinet):
     slot = flask.request.json.get('slot')
     slot = max(0, min(slot, 9)) if isinstance(slot, int) else 0
 
     try:
-        response = request_pub(
+        response = cabinet.request_pub(
             requests.RequestEnvelope(
                 replay_resume_record=replay.ReplayResumeRecordRequest(
                     slot = slot
@@ -429,23 +608,84 @@ def resume_record():
         'status': 'OK' if response is not None and response.error_code == 0 else 'ERR',
     }
 
-FRAME_SUBJECT = "red.frames"
-# Wire format: FrameHeader — pitch(u16), width(u16), height(u16), pixel_format(u8), attrs(u8)
-FRAME_HEADER_FMT  = "<HHHBB"
-FRAME_HEADER_SIZE = struct.calcsize(FRAME_HEADER_FMT)  # 8 bytes
+@app.route('/frame_stats')
+@flask_login.login_required
+@with_cabinet
+def frame_stats(cabinet):
+    # Frame rate, jitter, bandwidth and compression of the frame stream
+    # over the last few seconds
+    if not cabinet.monitor:
+        return {
+            'status': 'ERR',
+            'message': 'Frame monitor not enabled',
+        }, http.HTTPStatus.NOT_FOUND
+    return cabinet.monitor.stats()
 
-PF_RGB565   = 1
-PF_RGBA8888 = 2
-PF_RGBA5551 = 3
-PF_ARGB8888 = 4
+@app.route('/performance')
+@flask_login.login_required
+def performance():
+    # Titles ranked by how close they come to their nominal frame rate,
+    # slowest first, over launches recorded with frame_cadence. Titles
+    # with less than min_seconds of play recorded are left out
+    try:
+        min_duration = float(flask.request.args.get('min_seconds', PERFORMANCE_MIN_SECONDS))
+    except ValueError:
+        return {
+            'status': 'ERR',
+            'message': 'Invalid min_seconds',
+        }, http.HTTPStatus.BAD_REQUEST
+
+    titles = dp.fetch_title_performance(cabinet=flask.request.args.get('cabinet'), min_duration=min_duration)
+    for row in titles:
+        game = game_konfig.game_map.get(row['uid'])
+        row['title'] = game.title if game else None
 
+    return { 'titles': titles }
+
+@app.route('/power')
+@flask_login.login_required
+def power():
+    # Titles ranked by the highest estimated LED draw of any region,
+    # over launches recorded with led_power
+    titles = dpw.fetch_title_power(cabinet=flask.request.args.get('cabinet'))
+    for row in titles:
+        game = game_konfig.game_map.get(row['uid'])
+        row['title'] = game.title if game else None
+
+    return { 'titles': titles }
 
 @app.route('/snapshot')
 @flask_login.login_required
-def snapshot():
+@with_cabinet
+def snapshot(cabinet):
+    # format, compression or quality, and scale pick the encoding (see
+    # snapshots.py); frame selects an earlier frame from the tap, 0 being
+    # the newest
     try:
-        raw = asyncio.run(grab_snapshot_async())
-    except asyncio.TimeoutError:
+        options = snapshots.SnapshotOptions.from_args(flask.request.args)
+    except ValueError as e:
+        return {
+            'status': 'ERR',
+            'message': str(e),
+        }, http.HTTPStatus.BAD_REQUEST
+
+    index = flask.request.args.get('frame', 0, type=int)
+    if cabinet.tap:
+        if not (frame := cabinet.tap.get(index)):
+            return {
+                'status': 'ERR',
+                'message': 'No frame available (publisher not running?)' if index == 0 else 'Frame not available',
+            }, http.HTTPStatus.SERVICE_UNAVAILABLE if index == 0 else http.HTTPStatus.NOT_FOUND
+        return send_snapshot(frame.data, options)
+    elif index:
+        return {
+            'status': 'ERR',
+            'message': 'Earlier frames require the frame tap',
+        }, http.HTTPStatus.BAD_REQUEST
+
+    try:
+        raw = cabinet.client.next_message(cabinet.subjects.frames, timeout=2.0)
+    except TimeoutError:
         return {
             'status': 'ERR',
             'message': 'No frame available (publisher not running?)',
@@ -457,68 +697,86 @@ def snapshot():
             'message': 'Failed to capture snapshot',
         }, http.HTTPStatus.INTERNAL_SERVER_ERROR
 
-    pitch, width, height, pixel_format, attrs = struct.unpack(FRAME_HEADER_FMT, raw[:FRAME_HEADER_SIZE])
-    pixels = lz4.block.decompress(raw[FRAME_HEADER_SIZE:], uncompressed_size=pitch * height)
-    img = decode_frame(pixels, width, height, pitch, pixel_format)
-
-    buf = io.BytesIO()
-    img.save(buf, format='PNG')
-    buf.seek(0)
-    return flask.send_file(buf, mimetype='image/png', download_name='snapshot.png')
-
+    return send_snapshot(raw, options)
 
-async def grab_snapshot_async():
-    nc = await nats.connect(konfig.game_server['nats_url'])
-    loop = asyncio.get_event_loop()
-    fut = loop.create_future()
-
-    async def handler(msg):
-        if not fut.done():
-            fut.set_result(msg.data)
+def send_snapshot(raw, options):
+    # The ETag identifies the frame and encoding, so a client that has the
+    # image already is answered without looking any further
+    hash = snapshots.frame_hash(raw)
+    etag = snapshots.etag_for(hash, options)
+    if flask.request.if_none_match.contains_weak(etag):
+        response = flask.Response(status=http.HTTPStatus.NOT_MODIFIED)
+    else:
+        try:
+            entry = snapshots.snapshot(snapshot_cache, raw, hash, options, image_pool.run)
+        except ip.PoolBusyError as e:
+            return image_pool_busy(e)
+        response = flask.Response(entry.data, mimetype=entry.format.mimetype)
+        response.headers['Content-Disposition'] = f"inline; filename=snapshot.{entry.format.extension}"
+    response.set_etag(etag)
+    # The newest frame changes, so always revalidate
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.route('/clip')
+@flask_login.login_required
+@with_cabinet
+def clip(cabinet):
+    # Records the next seconds of frames into an animated image; format,
+    # fps and scale as in clips.py
+    try:
+        options = clips.ClipOptions.from_args(flask.request.args)
+    except ValueError as e:
+        return {
+            'status': 'ERR',
+            'message': str(e),
+        }, http.HTTPStatus.BAD_REQUEST
 
-    sub = await nc.subscribe(FRAME_SUBJECT, cb=handler)
     try:
-        return await asyncio.wait_for(fut, timeout=2.0)
-    finally:
-        await sub.unsubscribe()
-        await nc.drain()
-
-
-def decode_frame(pixels, width, height, pitch, pixel_format):
-    if pixel_format == PF_ARGB8888:
-        # XRGB8888 in little-endian memory = [B, G, R, X] bytes per pixel
-        return Image.frombuffer('RGB', (width, height), pixels, 'raw', 'BGRX', pitch, 1)
-    elif pixel_format == PF_RGBA8888:
-        return Image.frombuffer('RGB', (width, height), pixels, 'raw', 'RGBX', pitch, 1)
-    elif pixel_format == PF_RGB565:
-        out = bytearray(width * height * 3)
-        for y in range(height):
-            for x in range(width):
-                c, = struct.unpack_from('<H', pixels, y * pitch + x * 2)
-                i = (y * width + x) * 3
-                out[i]   = ((c >> 11) & 0x1F) * 255 // 31
-                out[i+1] = ((c >>  5) & 0x3F) * 255 // 63
-                out[i+2] = ( c        & 0x1F) * 255 // 31
-        return Image.frombytes('RGB', (width, height), bytes(out))
-    elif pixel_format == PF_RGBA5551:
-        out = bytearray(width * height * 3)
-        for y in range(height):
-            for x in range(width):
-                c, = struct.unpack_from('<H', pixels, y * pitch + x * 2)
-                i = (y * width + x) * 3
-                out[i]   = ((c >> 11) & 0x1F) * 255 // 31
-                out[i+1] = ((c >>  6) & 0x1F) * 255 // 31
-                out[i+2] = ((c >>  1) & 0x1F) * 255 // 31
-        return Image.frombytes('RGB', (width, height), bytes(out))
-    raise ValueError(f"Unsupported pixel format: {pixel_format}")
+        data = clips.record(cabinet.client, cabinet.subjects.frames, options, image_pool.run)
+    except ip.PoolBusyError as e:
+        return image_pool_busy(e)
+    except TimeoutError:
+        return {
+            'status': 'ERR',
+            'message': 'No frame available (publisher not running?)',
+        }, http.HTTPStatus.SERVICE_UNAVAILABLE
+    except Exception as e:
+        logging.error(f"Clip failed: {e}")
+        return {
+            'status': 'ERR',
+            'message': 'Failed to record clip',
+        }, http.HTTPStatus.INTERNAL_SERVER_ERROR
 
+    format = clips.FORMATS[options.format]
+    response = flask.Response(data, mimetype=format.mimetype)
+    response.headers['Content-Disposition'] = f"inline; filename=clip.{format.extension}"
+    return response
 
 @app.before_request
 def check_configs_for_changes():
+    global games_config_last_modified
     modified = os.path.getmtime(games_config_file)
-    if modified != games_config_last_modified:
+    if modified == games_config_last_modified:
+        return
+
+    if not workers:
         logging.info("Game config file changed, reloading...")
         reload_game_config()
+        return
+
+    # Have the master reload the config and replace the workers, so the
+    # catalog stays shared between them. Other workers are told, so that
+    # they don't ask as well
+    logging.info("Game config file changed, asking master to reload...")
+    games_config_last_modified = modified
+    bus.publish(CONFIG_SUBJECT, str(modified).encode())
+    os.kill(os.getppid(), signal.SIGHUP)
+
+def on_config_changed(data):
+    global games_config_last_modified
+    games_config_last_modified = float(data.decode())
 
 def read_process_output(exe, args):
     result = subprocess.run([exe] + args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
@@ -534,7 +792,7 @@ def reload_game_config():
     logging.info(f"Loaded game config with {len(game_konfig.game_map)} items")
 
 def init_service():
-    global konfig, platform_config_file, games_config_file
+    global konfig, bus, cabinets, default_cabinet, previews, image_pool, platform_config_file, games_config_file
 
     # Parse command-line arguments
     parser = argparse.ArgumentParser()
@@ -559,9 +817,55 @@ def init_service():
     konfig = config.Config(platform_config_file)
     reload_game_config()
 
+    cabinets = cab.load_cabinets(
+        konfig.game_server,
+        max_in_flight=getattr(konfig, 'remote_requests', {}).get('max_in_flight', lc.DEFAULT_MAX_IN_FLIGHT),
+    )
+    default_cabinet = next(iter(cabinets.values()))
+    previews = { id: pv.PreviewRelay(socketio, cabinet) for id, cabinet in cabinets.items() }
+    logging.info(f"Controlling {len(cabinets)} cabinet(s): {', '.join(cabinets)}")
+
+    image_pool = ip.ImagePool(
+        konfig.control_server.get('image_workers', ip.DEFAULT_WORKERS),
+        konfig.control_server.get('image_queue', ip.DEFAULT_QUEUE),
+    )
+
+    socketio_options = {}
+    if workers:
+        if workers > 1 and any(isinstance(cabinet.control, tr.InProcessClient) for cabinet in cabinets.values()):
+            raise ValueError("In-process transport requires a single worker")
+        bus = nc.NatsClient(konfig.game_server['nats_url'])
+        if workers > 1:
+            socketio_options['client_manager'] = socketio_nats.NatsManager(bus, SOCKETIO_SUBJECT)
+
+    socketio.init_app(app, **socketio_options)
     app.config.update(konfig.control_server['flask_config'])
+    # Launches recorded before there were several cabinets are assigned
+    # to this one (see init_db)
+    app.config['DEFAULT_CABINET_ID'] = default_cabinet.id
+
+def start_service():
+    # Per-process part of startup. Under the prefork server, this runs in
+    # each worker, so the master never connects to anything
+    for cabinet in cabinets.values():
+        cabinet.control.subscribe(cabinet.subjects.state, functools.partial(on_state_event, cabinet))
+        cabinet.control.subscribe(cabinet.subjects.heartbeat, functools.partial(on_heartbeat, cabinet))
+        if cabinet.tap:
+            cabinet.client.subscribe(cabinet.subjects.frames, cabinet.tap.put)
+        if cabinet.monitor:
+            cabinet.client.subscribe(cabinet.subjects.frames, cabinet.monitor.put)
+        if cabinet.cadence:
+            cabinet.client.subscribe(cabinet.subjects.frames, cabinet.cadence.put)
+        if cabinet.power:
+            cabinet.power.on_budget = functools.partial(on_power_budget, cabinet)
+            socketio.start_background_task(cabinet.power.run, image_pool.run)
+            cabinet.client.subscribe(cabinet.subjects.frames, cabinet.power.put)
+    if bus:
+        bus.subscribe(CONFIG_SUBJECT, on_config_changed)
 
 init_service()
+if not workers:
+    start_service()
 
 if __name__ == '__main__':
     socketio.run(app, host='0.0.0.0', port='8080', debug=True)
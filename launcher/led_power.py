@@ -0,0 +1,341 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import frames
+import logging
+import lz4.block
+import numpy as np
+import threading
+import time
+
+# Draw of one half (ten 64x64 panels) showing full white at full
+# brightness, and with every LED off
+DEFAULT_FULL_WHITE_AMPS = 40.0
+DEFAULT_IDLE_AMPS = 1.0
+# Frames are measured no more often than this; 0 to measure every one
+DEFAULT_SAMPLE_FPS = 15
+# A region back under budget for this long can raise another event
+BUDGET_CLEAR_TIME = 2.0
+# The display as sub lays it out by default: a 320x256 frame, its top
+# and bottom halves on two subscribers. Rects are x1, y1, x2, y2, as
+# sub's --src-rect and --content-rect take them
+DEFAULT_REGIONS = [
+    { 'name': 'top', 'rect': [ 0, 0, 320, 128 ], 'content': [ 0, 0, 320, 256 ] },
+    { 'name': 'bottom', 'rect': [ 0, 128, 320, 256 ], 'content': [ 0, 0, 320, 256 ] },
+]
+
+def duty_lut(brightness):
+    # Share of the time an LED is lit for each 8-bit channel value. The
+    # matrix library maps values through CIE 1931 lightness, scaled by
+    # --led-brightness (percent), before PWM
+    lightness = np.arange(256) / 255 * brightness
+    return np.where(lightness <= 8, lightness / 902.3, ((lightness + 16) / 116) ** 3)
+
+class Region:
+
+    # The part of the frame one subscriber shows, as sub.c works it out:
+    # the frame is centered in the content rect, and rect picks the
+    # subscriber's share of the content rect. Parts of rect that the
+    # frame doesn't cover are dark.
+
+    def __init__(self, name, rect, content, brightness=100):
+        self.name = name
+        self.rect = rect
+        self.content = content
+        self.area = (rect[2] - rect[0]) * (rect[3] - rect[1])
+        # Channel value and duty cycle of each 8-bit value
+        self.table = np.stack([ np.arange(256), duty_lut(brightness) ], axis=-1)
+        self._tables = {}
+
+    def slices(self, width, height):
+        # Rows and columns of a width x height frame inside the region
+        rows, columns, _, _ = frames.crop(width, height, self.rect, self.content)
+        return rows, columns
+
+    def tables_16(self, pixel_format):
+        # R, G, B, and the duty cycle of each, for every 16-bit value; and
+        # for each channel, the values from brightest to darkest
+        if (tables := self._tables.get(pixel_format)) is None:
+            rgb = frames.LUTS[pixel_format]
+            tables = self._tables[pixel_format] = (
+                np.ascontiguousarray(np.concatenate([ rgb, self.table[rgb, 1] ], axis=-1).T),
+                np.argsort(-rgb.T.astype(np.int16), axis=-1, kind='stable'),
+            )
+        return tables
+
+class RegionSample:
+
+    def __init__(self, mean, peak, amps):
+        # Mean and peak of each channel (R, G, B; 0-255) over the region
+        self.mean = mean
+        self.peak = peak
+        self.amps = amps
+
+class PowerModel:
+
+    # Estimated current of each region for a frame. Each LED draws its
+    # share of full_white_amps for as long as it is lit, so a region's
+    # draw is proportional to the mean duty cycle of its LEDs. Pixels are
+    # counted by value, and the counts weighed against per-value tables,
+    # rather than converted one by one.
+
+    def __init__(self, regions, full_white_amps=DEFAULT_FULL_WHITE_AMPS, idle_amps=DEFAULT_IDLE_AMPS):
+        self.regions = regions
+        self.full_white_amps = full_white_amps
+        self.idle_amps = idle_amps
+
+    def measure(self, values, pixel_format):
+        # RegionSamples for a frame's upright pixel values (frames.to_values)
+        height, width = values.shape[:2]
+        samples = []
+        for region in self.regions:
+            pixels = values[region.slices(width, height)]
+            if not pixels.size:
+                samples.append(RegionSample(np.zeros(3), np.zeros(3), self.idle_amps))
+                continue
+            if pixels.ndim == 2:
+                counts = np.bincount(pixels.ravel(), minlength=0x10000)
+                table, order = region.tables_16(pixel_format)
+                sums = table @ counts
+                channels, duty = sums[:3], sums[3:]
+                # Brightest value of each channel present in the region
+                present = counts > 0
+                peak = np.array([
+                    table[channel, order[channel][present[order[channel]].argmax()]]
+                    for channel in range(3)
+                ])
+            else:
+                counts = np.stack([
+                    np.bincount(pixels[..., channel].ravel(), minlength=256)
+                    for channel in frames.CHANNELS[pixel_format]
+                ])
+                sums = counts @ region.table
+                channels, duty = sums[:, 0], sums[:, 1]
+                peak = np.array([ row.nonzero()[0].max() for row in counts ], dtype=np.float64)
+            samples.append(RegionSample(
+                channels / region.area,
+                peak,
+                self.idle_amps + self.full_white_amps * float(duty.mean()) / region.area,
+            ))
+        return samples
+
+class RegionProfile:
+
+    def __init__(self):
+        self.frames = 0
+        self.amps_sum = 0.0
+        self.peak_amps = 0.0
+        # Frames measured over budget
+        self.over_budget = 0
+        self.mean_sum = np.zeros(3)
+        # Channel means of the brightest frame for each channel
+        self.peak_mean = np.zeros(3)
+
+    @property
+    def mean_amps(self):
+        return self.amps_sum / self.frames if self.frames else 0.0
+
+    @property
+    def mean(self):
+        return self.mean_sum / self.frames if self.frames else self.mean_sum
+
+class PowerProfile:
+
+    # Estimated draw of each region over one launch
+
+    def __init__(self, launch_id, uid, regions):
+        self.launch_id = launch_id
+        self.uid = uid
+        self.regions = { region.name: RegionProfile() for region in regions }
+
+class PowerRecorder:
+
+    # Estimates the LED current each half of the display draws from the
+    # frames of a cabinet, keeps a profile of it for each launch, and
+    # calls on_budget(region name, amps, over) when a half goes over
+    # budget_amps and when it has been back under for a while. Frames
+    # are sampled, at up to sample_fps, so a single bright frame may go
+    # unseen; what trips a supply is sustained draw. As with frame
+    # cadence, only the worker that launched a title measures it. The
+    # subscription only hands sampled frames over; run() measures them
+    # off the client's loop, holding at most one frame waiting, so a
+    # slow measurement drops samples rather than holding up frames.
+
+    def __init__(self, model, budget_amps=None, sample_fps=DEFAULT_SAMPLE_FPS, on_budget=None):
+        self.model = model
+        self.budget_amps = budget_amps
+        self.sample_interval = 1 / sample_fps if sample_fps else 0
+        self.on_budget = on_budget
+        self._lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._pending = None
+        self._profile = None
+        self._next_sample = 0
+        self._latest = None
+        self._over = {}
+        self._under_since = {}
+        self.budget_events = 0
+        self.dropped = 0
+
+    def start(self, launch_id, uid):
+        # Starts profiling a launch. Returns the profile of the launch
+        # before, if any, as finish() does
+        with self._lock:
+            previous = self._take()
+            self._profile = PowerProfile(launch_id, uid, self.model.regions)
+        return previous
+
+    def finish(self):
+        with self._lock:
+            return self._take()
+
+    def check_state(self, active):
+        # Finishes the launch if the title running is no longer the one
+        # being profiled (active is its id, or None)
+        with self._lock:
+            if self._profile and self._profile.uid != active:
+                return self._take()
+        return None
+
+    def put(self, data):
+        # Subscription callback; runs on the client's loop thread, so only
+        # hands the frame over
+        now = time.monotonic()
+        if not (profile := self._profile) or now < self._next_sample:
+            return
+        self._next_sample = now + self.sample_interval
+        with self._cond:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = (now, profile, data)
+            self._cond.notify()
+
+    def run(self, execute):
+        # Measures frames as put() hands them over, running each
+        # measurement through execute(fn, *args) (ImagePool.run). Runs
+        # for as long as the process does
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                (received, profile, data), self._pending = self._pending, None
+            try:
+                if (samples := execute(self._measure, data)) is not None:
+                    self._record(received, profile, samples)
+            except Exception as e:
+                # Pool busy; drop the sample
+                self.dropped += 1
+                logging.debug(f"Dropped power sample: {e}")
+
+    def _measure(self, data):
+        try:
+            header = frames.parse_header(data)
+            pixels = lz4.block.decompress(data[header.offset:], uncompressed_size=header.size)
+            values = frames.to_values(pixels, header.width, header.height, header.pitch, header.pixel_format, header.attrs)
+        except Exception:
+            return None
+        return self.model.measure(values, header.pixel_format)
+
+    def _record(self, now, profile, samples):
+        events = []
+        with self._lock:
+            if self._profile is not profile:
+                # Launch ended while the frame was being measured
+                return
+            self._latest = (now, samples)
+            for region, sample in zip(self.model.regions, samples):
+                stats = profile.regions[region.name]
+                stats.frames += 1
+                stats.amps_sum += sample.amps
+                stats.peak_amps = max(stats.peak_amps, sample.amps)
+                stats.mean_sum += sample.mean
+                stats.peak_mean = np.maximum(stats.peak_mean, sample.mean)
+                if self.budget_amps:
+                    if sample.amps > self.budget_amps:
+                        stats.over_budget += 1
+                    if event := self._check_budget(region.name, sample.amps, now):
+                        events.append(event)
+
+        if self.on_budget:
+            for event in events:
+                self.on_budget(*event)
+
+    def _check_budget(self, name, amps, now):
+        # (name, amps, over) if the region just went over budget, or has
+        # just been back under long enough
+        over = self._over.get(name, False)
+        if amps > self.budget_amps:
+            self._under_since.pop(name, None)
+            if not over:
+                self._over[name] = True
+                self.budget_events += 1
+                return (name, amps, True)
+        elif over:
+            since = self._under_since.setdefault(name, now)
+            if now - since >= BUDGET_CLEAR_TIME:
+                self._over[name] = False
+                del self._under_since[name]
+                return (name, amps, False)
+        return None
+
+    def _take(self):
+        profile = self._profile
+        self._profile = None
+        self._latest = None
+        self._over.clear()
+        self._under_since.clear()
+        return profile
+
+    def stats(self):
+        with self._lock:
+            latest = self._latest
+            stats = {
+                'budget_amps': self.budget_amps,
+                'budget_events': self.budget_events,
+                'dropped': self.dropped,
+                'launch': self._profile.uid if self._profile else None,
+            }
+        if latest:
+            received, samples = latest
+            stats['age'] = time.monotonic() - received
+            stats['regions'] = {
+                region.name: {
+                    'amps': sample.amps,
+                    'mean': sample.mean.tolist(),
+                    'peak': sample.peak.tolist(),
+                } for region, sample in zip(self.model.regions, samples)
+            }
+        return stats
+
+def load_recorder(settings, on_budget=None):
+    # PowerRecorder for a cabinet's led_power settings
+    regions = [
+        Region(
+            entry.get('name', str(i)),
+            entry['rect'],
+            entry.get('content', entry['rect']),
+            entry.get('brightness', 100),
+        ) for i, entry in enumerate(settings.get('regions') or DEFAULT_REGIONS)
+    ]
+    model = PowerModel(
+        regions,
+        full_white_amps=settings.get('full_white_amps', DEFAULT_FULL_WHITE_AMPS),
+        idle_amps=settings.get('idle_amps', DEFAULT_IDLE_AMPS),
+    )
+    return PowerRecorder(
+        model,
+        budget_amps=settings.get('budget_amps'),
+        sample_fps=settings.get('sample_fps', DEFAULT_SAMPLE_FPS),
+        on_budget=on_budget,
+    )
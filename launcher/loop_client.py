@@ -0,0 +1,264 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import abc
+import asyncio
+import logging
+import os
+import queue
+import select
+import threading
+
+DEFAULT_MAX_IN_FLIGHT = 16
+# Extra time a caller waits beyond the request timeout, so that the loop
+# normally gets to report the timeout itself
+WAIT_GRACE = 0.25
+
+_loop_lock = threading.Lock()
+_loop = None
+_loop_pid = None
+
+class BusyError(TimeoutError):
+    pass
+
+class Waiter:
+
+    # One-shot result slot that can be signalled from the event loop
+    # thread. The caller blocks in select() on a pipe, which eventlet
+    # turns into a cooperative wait, so a pending request never pins the
+    # hub. Waiters are pooled and reused; the ticket guards against a late
+    # result from a timed-out request leaking into the next one.
+
+    def __init__(self):
+        self._rfd, self._wfd = os.pipe()
+        self._lock = threading.Lock()
+        self._ticket = 0
+        self._result = None
+        self._error = None
+        # Task working on the current ticket; only touched on the loop
+        self.task = None
+        self.task_ticket = None
+
+    def arm(self):
+        with self._lock:
+            self._ticket += 1
+            self._result = None
+            self._error = None
+            self._drain()
+            return self._ticket
+
+    def set_result(self, ticket, result=None, error=None):
+        with self._lock:
+            if ticket != self._ticket:
+                return
+            self._result = result
+            self._error = error
+            os.write(self._wfd, b'\0')
+
+    def wait(self, timeout):
+        readable, _, _ = select.select([self._rfd], [], [], timeout)
+        if not readable:
+            raise TimeoutError("Timed out waiting for result")
+        with self._lock:
+            self._drain()
+            if self._error:
+                raise self._error
+            return self._result
+
+    def _drain(self):
+        # Poll before reading; eventlet's os.read() waits on an empty pipe
+        # rather than raising, even for non-blocking descriptors
+        while select.select([self._rfd], [], [], 0)[0]:
+            os.read(self._rfd, 64)
+
+class LoopClient(abc.ABC):
+
+    # Client whose I/O is owned by a background event loop thread. Flask
+    # routes submit work with request()/next_message() and block on a
+    # pooled Waiter; the number of Waiters bounds the requests in flight.
+    # The client is started lazily, and again after a fork, so it can be
+    # created before the server spawns its workers. All clients in a
+    # process share one loop (see shared_loop()). Callbacks subscribed to
+    # the same subject share one subscription, so each message is
+    # received once however many consumers it has. Subclasses implement
+    # the abstract coroutines that do the actual I/O.
+
+    def __init__(self, max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+        self.max_in_flight = max_in_flight
+        self._waiters = queue.Queue()
+        for _ in range(max_in_flight):
+            self._waiters.put(Waiter())
+        self._start_lock = threading.Lock()
+        self._pid = None
+        self._loop = None
+        self._connected = None
+        # Callbacks by subject
+        self._subscriptions = {}
+
+    @property
+    def is_connected(self):
+        return self._connected is not None and self._connected.is_set()
+
+    def request(self, subject, data, timeout=0.5):
+        return self.submit(self._request(subject, data, timeout), timeout)
+
+    def next_message(self, subject, timeout=2.0):
+        return self.submit(self._next_message(subject, timeout), timeout)
+
+    def publish(self, subject, data):
+        self._ensure_started()
+        self._loop.call_soon_threadsafe(self._spawn, self._publish(subject, data), None, None)
+
+    def subscribe(self, subject, cb):
+        # cb is invoked on the loop thread with the raw message data.
+        # Subscriptions are remembered, and renewed if the loop restarts
+        # after a fork
+        self._ensure_started()
+        with self._start_lock:
+            callbacks = self._subscriptions.setdefault(subject, [])
+            callbacks.append(cb)
+            if len(callbacks) == 1:
+                self._loop.call_soon_threadsafe(self._spawn, self._subscribe(subject), None, None)
+
+    def unsubscribe(self, subject, cb):
+        self._ensure_started()
+        with self._start_lock:
+            callbacks = self._subscriptions[subject]
+            callbacks.remove(cb)
+            if not callbacks:
+                del self._subscriptions[subject]
+                self._loop.call_soon_threadsafe(self._spawn, self._unsubscribe(subject), None, None)
+
+    def submit(self, coro, timeout):
+        self._ensure_started()
+        try:
+            waiter = self._waiters.get(timeout=timeout)
+        except queue.Empty:
+            coro.close()
+            raise BusyError(f"No request slot available ({self.max_in_flight} in flight)")
+        try:
+            ticket = waiter.arm()
+            self._loop.call_soon_threadsafe(self._spawn, coro, waiter, ticket)
+            try:
+                return waiter.wait(timeout + WAIT_GRACE)
+            except TimeoutError:
+                # Nobody is waiting for it any more, and its slot is about
+                # to be handed out again, so don't let it run on
+                self._loop.call_soon_threadsafe(self._cancel, waiter, ticket)
+                raise
+        finally:
+            self._waiters.put(waiter)
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._loop = shared_loop()
+            self._connected = asyncio.Event()
+            self._reset()
+            self._loop.call_soon_threadsafe(self._start, list(self._subscriptions))
+            self._pid = os.getpid()
+
+    def _start(self, subjects):
+        self._spawn(self._connect(), None, None)
+        for subject in subjects:
+            self._spawn(self._subscribe(subject), None, None)
+
+    def _spawn(self, coro, waiter, ticket):
+        task = self._loop.create_task(coro)
+        if waiter:
+            waiter.task, waiter.task_ticket = task, ticket
+        def done(task):
+            error = task.exception() if not task.cancelled() else asyncio.CancelledError()
+            if waiter:
+                waiter.set_result(ticket, None if error else task.result(), error)
+            elif error:
+                logging.error(f"Background task of {type(self).__name__} failed: {error}")
+        task.add_done_callback(done)
+
+    def _deliver(self, subject, data):
+        # Hands a message received on the loop to the callbacks
+        # subscribed to its subject
+        for cb in tuple(self._subscriptions.get(subject, ())):
+            try:
+                cb(data)
+            except Exception as e:
+                logging.error(f"Error handling message on '{subject}': {e}")
+
+    def _cancel(self, waiter, ticket):
+        # The waiter may have moved on to another request since
+        if waiter.task_ticket == ticket and not waiter.task.done():
+            waiter.task.cancel()
+
+    async def _wait_connected(self, timeout):
+        # Returns what is left of timeout, so that waiting for the
+        # connection and the request after it share one deadline
+        if self._connected.is_set():
+            return timeout
+        started = self._loop.time()
+        await asyncio.wait_for(self._connected.wait(), timeout)
+        if timeout is not None:
+            return max(0, timeout - (self._loop.time() - started))
+
+    def _reset(self):
+        # Drops per-loop state when a new loop is started
+        pass
+
+    @abc.abstractmethod
+    async def _connect(self):
+        pass
+
+    @abc.abstractmethod
+    async def _request(self, subject, data, timeout):
+        pass
+
+    @abc.abstractmethod
+    async def _subscribe(self, subject):
+        # Passes messages on subject to _deliver()
+        pass
+
+    @abc.abstractmethod
+    async def _unsubscribe(self, subject):
+        pass
+
+    @abc.abstractmethod
+    async def _publish(self, subject, data):
+        pass
+
+    @abc.abstractmethod
+    async def _next_message(self, subject, timeout):
+        pass
+
+def shared_loop():
+    # Event loop for all clients of this process, started on first use and
+    # again after a fork. Under eventlet, threads are green and share one
+    # OS thread, which can only run one asyncio loop at a time
+    global _loop, _loop_pid
+    with _loop_lock:
+        if _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=run_loop,
+                args=(_loop,),
+                name="client-loop",
+                daemon=True,
+            ).start()
+            _loop_pid = os.getpid()
+        return _loop
+
+def run_loop(loop):
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
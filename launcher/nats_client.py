@@ -0,0 +1,113 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import loop_client as lc
+import nats
+
+CONNECT_RETRY_WAIT = 1.0
+RECONNECT_TIME_WAIT = 0.5
+
+class NatsClient(lc.LoopClient):
+
+    # Long-lived NATS connection owned by the client's event loop thread
+
+    def __init__(self, url, max_in_flight=lc.DEFAULT_MAX_IN_FLIGHT):
+        super().__init__(max_in_flight)
+        self.url = url
+        self._nc = None
+        self._subs = {}
+
+    @property
+    def is_connected(self):
+        return self._nc is not None and self._nc.is_connected
+
+    def _reset(self):
+        self._nc = None
+        self._subs = {}
+
+    async def _connect(self):
+        async def disconnected_cb():
+            logging.warning(f"Disconnected from NATS server")
+            self._connected.clear()
+
+        async def reconnected_cb():
+            logging.info(f"Reconnected to NATS server at {self._nc.connected_url.netloc}")
+            self._connected.set()
+
+        async def error_cb(e):
+            logging.error(f"NATS error: {e}")
+
+        while True:
+            try:
+                self._nc = await nats.connect(
+                    self.url,
+                    allow_reconnect=True,
+                    max_reconnect_attempts=-1,
+                    reconnect_time_wait=RECONNECT_TIME_WAIT,
+                    disconnected_cb=disconnected_cb,
+                    reconnected_cb=reconnected_cb,
+                    error_cb=error_cb,
+                )
+                break
+            except Exception as e:
+                logging.warning(f"Unable to connect to NATS server at {self.url}: {e}")
+                await asyncio.sleep(CONNECT_RETRY_WAIT)
+
+        logging.info(f"Connected to NATS server at {self.url}")
+        self._connected.set()
+
+    async def _request(self, subject, data, timeout):
+        timeout = await self._wait_connected(timeout)
+        response = await self._nc.request(subject, data, timeout=timeout)
+        return response.data
+
+    async def _subscribe(self, subject):
+        await self._wait_connected(None)
+
+        async def handler(msg):
+            self._deliver(subject, msg.data)
+
+        sub = await self._nc.subscribe(subject, cb=handler)
+        if subject not in self._subscriptions or subject in self._subs:
+            # Unsubscribed while waiting for the connection, or subscribed
+            # again before this subscription went through
+            await sub.unsubscribe()
+            return
+        self._subs[subject] = sub
+        logging.info(f"Subscribed to '{subject}'")
+
+    async def _unsubscribe(self, subject):
+        if sub := self._subs.pop(subject, None):
+            await sub.unsubscribe()
+            logging.info(f"Unsubscribed from '{subject}'")
+
+    async def _publish(self, subject, data):
+        await self._wait_connected(None)
+        await self._nc.publish(subject, data)
+
+    async def _next_message(self, subject, timeout):
+        timeout = await self._wait_connected(timeout)
+        fut = self._loop.create_future()
+
+        async def handler(msg):
+            if not fut.done():
+                fut.set_result(msg.data)
+
+        sub = await self._nc.subscribe(subject, cb=handler)
+        try:
+            return await asyncio.wait_for(fut, timeout=timeout)
+        finally:
+            await sub.unsubscribe()
@@ -0,0 +1,135 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import threading
+import time
+
+DEFAULT_MAX_FPS = 15
+MAX_FPS = 30
+# A frame not acknowledged by then is written off, and the next one sent
+ACK_TIMEOUT = 2.0
+
+class Viewer:
+
+    # A browser watching a cabinet. It holds at most one frame waiting to
+    # be sent; a newer frame replaces it, so a client that can't keep up
+    # gets fewer frames rather than older ones.
+
+    def __init__(self, sid, max_fps):
+        self.sid = sid
+        self.interval = 1.0 / max_fps
+        self.sent = 0
+        self.dropped = 0
+        self.timeouts = 0
+        self.closed = False
+        self._cond = threading.Condition()
+        self._pending = None
+        self._due = 0
+
+    def offer(self, data):
+        with self._cond:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = data
+            self._cond.notify()
+
+    def take(self):
+        # Newest frame, once the frame rate cap allows another one. Returns
+        # None once closed
+        if (delay := self._due - time.monotonic()) > 0:
+            time.sleep(delay)
+        with self._cond:
+            while self._pending is None and not self.closed:
+                self._cond.wait()
+            data, self._pending = self._pending, None
+        self._due = time.monotonic() + self.interval
+        return None if self.closed else data
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+
+class PreviewRelay:
+
+    # Relays a cabinet's frames, as published (FrameHeader and LZ4
+    # payload), to the Socket.IO clients watching it, which decode them
+    # themselves. Each viewer has its own sender task that waits for the
+    # client to acknowledge a frame before sending the next one, so a slow
+    # client never holds up the subscription or the other viewers. The
+    # relay is only subscribed to frames while someone is watching.
+
+    def __init__(self, socketio, cabinet):
+        self.socketio = socketio
+        self.cabinet = cabinet
+        self._lock = threading.Lock()
+        self._viewers = {}
+
+    def start(self, sid, max_fps=DEFAULT_MAX_FPS):
+        # Starts sending frames to a client, or changes its frame rate
+        max_fps = min(max(max_fps, 1), MAX_FPS)
+        with self._lock:
+            if viewer := self._viewers.get(sid):
+                viewer.interval = 1.0 / max_fps
+                return
+            if not self._viewers:
+                self.cabinet.client.subscribe(self.cabinet.subjects.frames, self._on_frame)
+            viewer = self._viewers[sid] = Viewer(sid, max_fps)
+
+        logging.info(f"Preview of cabinet '{self.cabinet.id}' started for {sid} at up to {max_fps} fps")
+        self.socketio.start_background_task(self._send, viewer)
+
+    def stop(self, sid):
+        with self._lock:
+            if not (viewer := self._viewers.pop(sid, None)):
+                return
+            if not self._viewers:
+                self.cabinet.client.unsubscribe(self.cabinet.subjects.frames, self._on_frame)
+
+        viewer.close()
+        logging.info(f"Preview of cabinet '{self.cabinet.id}' stopped for {sid} ({viewer.sent} sent, {viewer.dropped} dropped)")
+
+    def _on_frame(self, data):
+        # Runs on the client's loop thread, so only hands the frame over
+        with self._lock:
+            viewers = list(self._viewers.values())
+        for viewer in viewers:
+            viewer.offer(data)
+
+    def _send(self, viewer):
+        while (data := viewer.take()) is not None:
+            acked = threading.Event()
+            # The client is connected to this process, so the frame doesn't
+            # need to go through the message queue
+            self.socketio.emit(
+                'frame',
+                data,
+                to=viewer.sid,
+                callback=lambda *args: acked.set(),
+                ignore_queue=True,
+            )
+            viewer.sent += 1
+            if not acked.wait(ACK_TIMEOUT):
+                viewer.timeouts += 1
+
+    def stats(self):
+        with self._lock:
+            viewers = list(self._viewers.values())
+        return {
+            'viewers': len(viewers),
+            'sent': sum(viewer.sent for viewer in viewers),
+            'dropped': sum(viewer.dropped for viewer in viewers),
+            'timeouts': sum(viewer.timeouts for viewer in viewers),
+        }
@@ -0,0 +1,155 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import defaultdict
+from collections import deque
+import logging
+import random
+import threading
+import time
+
+SAMPLE_WINDOW = 200
+MIN_SAMPLES = 20
+TIMEOUT_PERCENTILE = 0.99
+TIMEOUT_FACTOR = 4
+MIN_TIMEOUT = 0.25
+MAX_TIMEOUT = 2.0
+
+FAILURE_THRESHOLD = 3
+PROBE_INTERVAL = 2.0
+
+RETRY_BASE_DELAY = 0.05
+
+class RemoteUnavailableError(Exception):
+
+    def __init__(self, message: str, *args: object) -> None:
+        super().__init__(message, *args)
+        self._message = message
+
+    @property
+    def message(self) -> str|None:
+        return self._message
+
+class LatencyTracker:
+
+    # Rolling round-trip times per topic. Once enough samples are in, the
+    # timeout for a topic is a multiple of its observed p99, so a slow but
+    # healthy server isn't timed out while a dead one is detected quickly.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=SAMPLE_WINDOW))
+
+    def record(self, topic, rtt):
+        with self._lock:
+            self._samples[topic].append(rtt)
+
+    def percentile(self, topic, p):
+        with self._lock:
+            samples = sorted(self._samples.get(topic, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+    def timeout_for(self, topic, default):
+        with self._lock:
+            count = len(self._samples.get(topic, ()))
+        if count < MIN_SAMPLES:
+            return default
+        p = self.percentile(topic, TIMEOUT_PERCENTILE)
+        return max(MIN_TIMEOUT, min(MAX_TIMEOUT, p * TIMEOUT_FACTOR))
+
+    def stats(self):
+        with self._lock:
+            topics = list(self._samples.keys())
+        return {
+            topic: {
+                'count': len(self._samples[topic]),
+                'p50': self.percentile(topic, 0.5),
+                'p99': self.percentile(topic, 0.99),
+                'timeout': self.timeout_for(topic, None),
+            } for topic in topics
+        }
+
+class CircuitBreaker:
+
+    # Opens after a run of consecutive failures. While open, check() fails
+    # immediately instead of letting each request wait out its timeout; a
+    # background probe closes the breaker once the probe call succeeds.
+
+    def __init__(self, name, probe, failure_threshold=FAILURE_THRESHOLD, probe_interval=PROBE_INTERVAL):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self._probe = probe
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def check(self):
+        if self._opened_at is not None:
+            with self._lock:
+                self.rejected += 1
+            raise RemoteUnavailableError(f"{self.name} is unavailable")
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._opened_at is not None or self._failures < self.failure_threshold:
+                return
+            self._opened_at = time.monotonic()
+            self.trips += 1
+
+        logging.warning(f"{self.name} failed {self._failures} times in a row; failing fast until it responds")
+        threading.Thread(target=self._run_probe, name=f"probe-{self.name}", daemon=True).start()
+
+    def _run_probe(self):
+        while True:
+            time.sleep(self.probe_interval)
+            try:
+                self._probe()
+            except Exception as e:
+                logging.debug(f"Probe of {self.name} failed: {e}")
+                continue
+            break
+
+        with self._lock:
+            down_for = time.monotonic() - self._opened_at
+            self._opened_at = None
+            self._failures = 0
+        logging.info(f"{self.name} is responding again after {down_for:.1f}s")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'open': self._opened_at is not None,
+                'open_for': time.monotonic() - self._opened_at if self._opened_at is not None else None,
+                'consecutive_failures': self._failures,
+                'trips': self.trips,
+                'rejected': self.rejected,
+            }
+
+def retry_delay(attempt):
+    # Exponential backoff with full jitter
+    return random.uniform(0, RETRY_BASE_DELAY * (2 ** attempt))
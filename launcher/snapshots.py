@@ -0,0 +1,164 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Snapshot encoding. Frames are identified by a hash of the published
+# payload, which is the same whenever the screen is, so an unchanged
+# screen is served from cache without decoding or encoding anything.
+
+from collections import OrderedDict
+from PIL import Image
+import frames
+import hashlib
+import io
+import threading
+
+DEFAULT_FORMAT = 'png'
+DEFAULT_CACHE_SIZE = 32
+MAX_SCALE = 8
+
+class Format:
+
+    def __init__(self, pil_format, mimetype, extension, option, option_range, default=None):
+        self.pil_format = pil_format
+        self.mimetype = mimetype
+        self.extension = extension
+        # Name and range of the format's compression parameter
+        self.option = option
+        self.option_range = option_range
+        self.default = default
+
+FORMATS = {
+    'png': Format('PNG', 'image/png', 'png', 'compression', range(0, 10), 6),
+    # Lossless unless a quality is given
+    'webp': Format('WEBP', 'image/webp', 'webp', 'quality', range(1, 101)),
+    'jpeg': Format('JPEG', 'image/jpeg', 'jpg', 'quality', range(1, 101), 85),
+}
+
+class SnapshotOptions:
+
+    def __init__(self, format=DEFAULT_FORMAT, level=None, scale=1):
+        self.format = format
+        self.level = level
+        self.scale = scale
+
+    @staticmethod
+    def from_args(args):
+        # Options from request arguments; raises ValueError if invalid
+        name = args.get('format', DEFAULT_FORMAT).lower()
+        if not (format := FORMATS.get(name)):
+            raise ValueError(f"Unsupported format: {name} (expected one of {', '.join(FORMATS)})")
+        level = args.get(format.option, format.default, type=int)
+        if level is not None and level not in format.option_range:
+            raise ValueError(f"{format.option} must be between {format.option_range.start} and {format.option_range.stop - 1}")
+        scale = args.get('scale', 1, type=int)
+        if not 1 <= scale <= MAX_SCALE:
+            raise ValueError(f"scale must be between 1 and {MAX_SCALE}")
+        return SnapshotOptions(name, level, scale)
+
+    @property
+    def key(self):
+        return (self.format, self.level, self.scale)
+
+class EncodedSnapshot:
+
+    def __init__(self, data, format, etag):
+        self.data = data
+        self.format = format
+        self.etag = etag
+
+class SnapshotCache:
+
+    # Encoded snapshots, least recently used first
+
+    def __init__(self, capacity=DEFAULT_CACHE_SIZE):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if (entry := self._entries.get(key)) is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': sum(len(entry.data) for entry in self._entries.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+def frame_hash(raw):
+    return hashlib.blake2b(frames.without_ext(raw), digest_size=12).hexdigest()
+
+def etag_for(hash, options):
+    level = '' if options.level is None else options.level
+    return f"{hash}-{options.format}{level}-x{options.scale}"
+
+def encode(raw, options):
+    header, pixels = frames.parse(raw)
+    image = frames.decode_frame(
+        pixels,
+        header.width,
+        header.height,
+        header.pitch,
+        header.pixel_format,
+        header.attrs,
+    )
+    if options.scale > 1:
+        image = image.resize(
+            (header.width * options.scale, header.height * options.scale),
+            Image.Resampling.NEAREST,
+        )
+
+    format = FORMATS[options.format]
+    params = {}
+    if format.pil_format == 'PNG':
+        params['compress_level'] = options.level
+    elif options.level is not None:
+        params['quality'] = options.level
+    else:
+        # Fastest method; the default one is ~20x slower on scaled-up
+        # frames and saves little on screens this flat
+        params['lossless'] = True
+        params['method'] = 0
+
+    buf = io.BytesIO()
+    image.save(buf, format=format.pil_format, **params)
+    return buf.getvalue()
+
+def snapshot(cache, raw, hash, options, run=None):
+    # Encoded snapshot of a published frame with the given hash, from
+    # cache if possible. run, if given, runs the encoding (see
+    # image_pool.py)
+    key = (hash, *options.key)
+    if not (entry := cache.get(key)):
+        data = run(encode, raw, options) if run else encode(raw, options)
+        entry = EncodedSnapshot(data, FORMATS[options.format], etag_for(hash, options))
+        cache.put(key, entry)
+    return entry
@@ -0,0 +1,48 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import queue
+import socketio
+import uuid
+
+class NatsManager(socketio.PubSubManager):
+
+    # Socket.IO client manager that shares emits, room changes and
+    # disconnects between server processes over NATS, so that a message
+    # reaches a client whichever worker it is connected to. Uses an
+    # existing client rather than a connection of its own.
+
+    name = 'nats'
+
+    def __init__(self, client, channel, write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.client = client
+
+    def initialize(self):
+        # Runs in each worker on first use. The manager itself was made in
+        # the prefork master, so every worker inherited the same host id,
+        # and ignored the others' messages as its own
+        self.host_id = uuid.uuid4().hex
+        super().initialize()
+
+    def _publish(self, data):
+        self.client.publish(self.channel, self.json.dumps(data).encode())
+
+    def _listen(self):
+        # Runs in a server background task; the client's callbacks run on
+        # its loop thread, so hand messages over through a queue
+        messages = queue.Queue()
+        self.client.subscribe(self.channel, messages.put)
+        while True:
+            yield messages.get()
@@ -21,6 +21,4 @@ echo "Activating virtual environment..." >&2
 source .venv/bin/activate
 
 echo "Starting server..." >&2
-gunicorn \
-    --access-logfile - --error-logfile - \
-    --worker-class eventlet -b :8080 -w 1 launcher:app
+gunicorn -c gunicorn.conf.py launcher:app
@@ -0,0 +1,88 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+
+DEFAULT_MAX_AGE = 5.0
+
+class State:
+
+    def __init__(self, active=None, is_running=False, volume=0, pid=0, uptime=0, idle=False):
+        # active is the "app_id:title_id" tag of the running title
+        self.active = active
+        self.is_running = is_running
+        self.volume = volume
+        self.pid = pid
+        self.uptime = uptime
+        # Screen has been static for a while; only set if the remote
+        # detects idle screens
+        self.idle = idle
+
+class StateCache:
+
+    # Last known game server state, fed by remote heartbeats and state
+    # events, and by responses to requests made by the launcher itself.
+    # get() only returns state younger than max_age, so callers fall back
+    # to a live request while heartbeats aren't arriving.
+
+    def __init__(self, max_age=DEFAULT_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._state = None
+        self._updated = 0
+        self._position = None
+
+    def get(self):
+        with self._lock:
+            if self._state is None or time.monotonic() - self._updated > self.max_age:
+                return None
+            return self._state
+
+    @property
+    def age(self):
+        with self._lock:
+            return time.monotonic() - self._updated if self._state else None
+
+    def put(self, state):
+        with self._lock:
+            self._state = state
+            self._updated = time.monotonic()
+
+    def update(self, **changes):
+        # Applies a partial change to the cached state, if any. Never
+        # refreshes the age: the rest of the state is no more current
+        # than it was, so it still expires when it would have
+        with self._lock:
+            if self._state is None:
+                return
+            self._state = State(**{ **self._state.__dict__, **changes })
+
+    def put_heartbeat(self, heartbeat):
+        # Heartbeats may arrive out of order; seq restarts with each epoch
+        position = (heartbeat.epoch, heartbeat.seq)
+        with self._lock:
+            if self._position and self._position[0] == heartbeat.epoch and position <= self._position:
+                return False
+            self._position = position
+
+        self.put(State(
+            active=f"{heartbeat.active.app_id}:{heartbeat.active.title_id}" if heartbeat.is_running else None,
+            is_running=heartbeat.is_running,
+            volume=heartbeat.volume,
+            pid=heartbeat.pid,
+            uptime=heartbeat.uptime,
+            idle=heartbeat.idle,
+        ))
+        return True
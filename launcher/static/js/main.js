@@ -19,9 +19,13 @@ $(function() {
     const cookies = Cookies.withAttributes({ expires: 31 });
     const orientations = [ 'portrait', 'landscape' ];
     const compactLayoutQuery = window.matchMedia("(max-width: 800px)");
+    // Cabinet to control, if not the default one
+    const cabinet = new URLSearchParams(location.search).get('cabinet');
     var syncTimeoutId = -1;
+    var queryTimeoutId = -1;
     var lastSync = 0;
     var lastSensorOrientation = null;
+    var socket = null;
 
     const hashMap = function(destructureFilters = false) {
         return location.hash
@@ -200,6 +204,67 @@ $(function() {
             }
         })();
     };
+    const queryState = function() {
+        $.get(
+            "query",
+            function(resp) {
+                updateSelection(resp.title);
+                setUiVolume(resp.volume || 0);
+            },
+        );
+    };
+    const listenForState = function() {
+        // State changes are pushed over Socket.IO; poll only while the
+        // socket is down
+        const pollIntervalMs = 5000;
+        const stopPolling = function() {
+            if (queryTimeoutId > -1) {
+                clearTimeout(queryTimeoutId);
+                queryTimeoutId = -1;
+            }
+        };
+        const startPolling = function() {
+            if (queryTimeoutId > -1) {
+                return; // Already polling
+            }
+            (function poll() {
+                if (!document.hidden) {
+                    queryState();
+                }
+                queryTimeoutId = setTimeout(poll, pollIntervalMs);
+            })();
+        };
+        // Websocket only, since long polling needs sticky sessions when the
+        // server runs several workers
+        socket = io({
+            transports: ['websocket'],
+            ...(cabinet ? { query: { cabinet } } : {}),
+        });
+        socket.on('connect', function() {
+            stopPolling();
+            queryState();
+            if ($("body").hasClass("preview-open")) {
+                startPreview();
+            }
+        });
+        socket.on('connect_error', startPolling);
+        socket.on('disconnect', startPolling);
+        socket.on('frame', function(frame, ack) {
+            // Acknowledging asks for the next frame
+            if ($("body").hasClass("preview-open")) {
+                Preview.draw($("#preview-canvas")[0], frame);
+            }
+            ack();
+        });
+        socket.on('state', function(state) {
+            if ('title' in state) {
+                updateSelection(state.title);
+            }
+            if ('volume' in state) {
+                setUiVolume(state.volume);
+            }
+        });
+    };
     const closeSearch = function() {
         $("#search").trigger("blur");
         $("#search").val("");
@@ -229,6 +294,22 @@ $(function() {
     const closeVolumePanel = function() {
         setVolumePanelOpen(false);
     };
+    const startPreview = function() {
+        // Phones get fewer frames
+        socket.emit('preview_start', { fps: isCompactLayout() ? 10 : 20 });
+    };
+    const setPreviewOpen = function(open) {
+        $("body").toggleClass("preview-open", open);
+        $("#preview-toggle").attr("aria-expanded", open ? "true" : "false");
+        if (!socket || !socket.connected) {
+            return;
+        }
+        if (open) {
+            startPreview();
+        } else {
+            socket.emit('preview_stop');
+        }
+    };
     const positionVolumePanel = function() {
         const $panel = $("#volume-panel");
         const $button = $("#volume-toggle");
@@ -552,13 +633,6 @@ $(function() {
         });
         setUiVolume(0);
         // set current selection
-        $.get(
-            "query",
-            function(resp) {
-                updateSelection(resp.title);
-                setUiVolume(resp.volume || 0);
-            },
-        );
         updateSelection();
         fetchFilters();
         // prevent shift-select - interferes with tag multiselect
@@ -592,6 +666,9 @@ $(function() {
             }
             setVolumePanelOpen(shouldOpen);
         });
+        $("#preview-toggle").on("click", function() {
+            setPreviewOpen(!$("body").hasClass("preview-open"));
+        });
         $("#volume-mute").on("click", function() {
             toggleMute();
         });
@@ -751,6 +828,14 @@ $(function() {
         });
     };
 
+    if (cabinet) {
+        $.ajaxPrefilter(function(options) {
+            options.url += (options.url.includes('?') ? '&' : '?')
+                + 'cabinet=' + encodeURIComponent(cabinet);
+        });
+    }
+
     initialize();
     syncState();
+    listenForState();
 });
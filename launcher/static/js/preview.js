@@ -0,0 +1,130 @@
+/*****************************************************************************
+ ** Copyright (C) 2026 Akop Karapetyan
+ **
+ ** Licensed under the Apache License, Version 2.0 (the "License");
+ ** you may not use this file except in compliance with the License.
+ ** You may obtain a copy of the License at
+ **
+ **     http://www.apache.org/licenses/LICENSE-2.0
+ **
+ ** Unless required by applicable law or agreed to in writing, software
+ ** distributed under the License is distributed on an "AS IS" BASIS,
+ ** WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ ** See the License for the specific language governing permissions and
+ ** limitations under the License.
+ ******************************************************************************
+ */
+
+// Draws frames relayed as published by pub: an 8-byte FrameHeader,
+// optionally a header extension, then an LZ4 block. Colors are expanded the way the LED matrix
+// renderers in sub.c expand them.
+const Preview = (function() {
+    const HEADER_SIZE = 8;
+    const PF_RGB565 = 1;
+    const PF_RGBA8888 = 2;
+    const PF_RGBA5551 = 3;
+    const PF_ARGB8888 = 4;
+    const ATTR_ROT180 = 0x01;
+    const ATTR_EXT = 0x80;
+
+    const decompress = function(src, dst) {
+        var si = 0;
+        var di = 0;
+        while (si < src.length) {
+            const token = src[si++];
+            var literals = token >> 4;
+            if (literals == 15) {
+                var b;
+                do {
+                    b = src[si++];
+                    literals += b;
+                } while (b == 255);
+            }
+            dst.set(src.subarray(si, si + literals), di);
+            si += literals;
+            di += literals;
+            if (si >= src.length) {
+                break; // Last sequence has no match
+            }
+            const offset = src[si] | (src[si + 1] << 8);
+            si += 2;
+            var length = token & 15;
+            if (length == 15) {
+                var b;
+                do {
+                    b = src[si++];
+                    length += b;
+                } while (b == 255);
+            }
+            length += 4;
+            // Matches may overlap the output, so copy byte by byte
+            for (var ref = di - offset, end = di + length; di < end; ) {
+                dst[di++] = dst[ref++];
+            }
+        }
+        return di;
+    };
+    const draw = function(canvas, buffer) {
+        const view = new DataView(buffer);
+        const pitch = view.getUint16(0, true);
+        const width = view.getUint16(2, true);
+        const height = view.getUint16(4, true);
+        const pixelFormat = view.getUint8(6);
+        const attrs = view.getUint8(7);
+        // Skip the header extension (sequence number and timestamp)
+        const offset = HEADER_SIZE + ((attrs & ATTR_EXT) ? view.getUint8(HEADER_SIZE + 1) : 0);
+
+        const pixels = new Uint8Array(pitch * height);
+        decompress(new Uint8Array(buffer, offset), pixels);
+        const src = new DataView(pixels.buffer);
+
+        if (canvas.width != width || canvas.height != height) {
+            canvas.width = width;
+            canvas.height = height;
+        }
+        const context = canvas.getContext('2d');
+        const image = context.createImageData(width, height);
+        const out = image.data;
+        const rot180 = attrs & ATTR_ROT180;
+        for (var y = 0; y < height; y++) {
+            const row = y * pitch;
+            for (var x = 0; x < width; x++) {
+                var r, g, b;
+                if (pixelFormat == PF_RGB565) {
+                    const c = src.getUint16(row + x * 2, true);
+                    r = ((c >> 11) & 0x1f) * 255 / 31 | 0;
+                    g = ((c >> 5) & 0x3f) * 255 / 63 | 0;
+                    b = (c & 0x1f) * 255 / 31 | 0;
+                } else if (pixelFormat == PF_RGBA5551) {
+                    const c = src.getUint16(row + x * 2, true);
+                    r = ((c >> 11) & 0x1f) * 255 / 31 | 0;
+                    g = ((c >> 6) & 0x1f) * 255 / 31 | 0;
+                    b = ((c >> 1) & 0x1f) * 255 / 31 | 0;
+                } else if (pixelFormat == PF_ARGB8888) {
+                    const c = src.getUint32(row + x * 4, true);
+                    r = (c >> 16) & 0xff;
+                    g = (c >> 8) & 0xff;
+                    b = c & 0xff;
+                } else if (pixelFormat == PF_RGBA8888) {
+                    const c = src.getUint32(row + x * 4, true);
+                    r = c >>> 24;
+                    g = (c >> 16) & 0xff;
+                    b = (c >> 8) & 0xff;
+                } else {
+                    return false;
+                }
+                const i = (rot180 ? (height - 1 - y) * width + (width - 1 - x) : y * width + x) * 4;
+                out[i] = r;
+                out[i + 1] = g;
+                out[i + 2] = b;
+                out[i + 3] = 255;
+            }
+        }
+        context.putImageData(image, 0, 0);
+        return true;
+    };
+
+    return {
+        draw: draw,
+    };
+})();
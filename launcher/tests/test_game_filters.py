@@ -0,0 +1,55 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Run from the launcher directory with: python3 -m unittest discover tests
+
+import benchmarks.game_filters as gf
+import config
+import os
+import tempfile
+import unittest
+import yaml
+
+class GameFilterTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with tempfile.NamedTemporaryFile('w', suffix='.yaml', delete=False) as fd:
+            yaml.safe_dump(gf.generate(2000), fd)
+        try:
+            cls.konfig = config.GameConfig(fd.name)
+        finally:
+            os.unlink(fd.name)
+
+    def test_index_agrees_with_scan(self):
+        for name, search, filter_map in gf.QUERIES:
+            with self.subTest(name):
+                self.assertTrue(gf.agree(self.konfig, search=search, filter_map=filter_map))
+
+    def test_index_agrees_with_scan_on_multiple_values(self):
+        for search, filter_map in gf.random_queries(300):
+            with self.subTest(search=search, filter_map=filter_map):
+                self.assertTrue(gf.agree(self.konfig, search=search, filter_map=filter_map))
+
+    def test_results_are_copies(self):
+        for query in [ {}, { 'filter_map': { 'g': [ "Shooter" ] } } ]:
+            game = self.konfig.games(**query)[0]
+            id, title = game['id'], game['title']
+            game['title'] = "Changed"
+            with self.assertRaises(AttributeError):
+                game['genres'].append("Changed")
+            self.assertEqual(next(g['title'] for g in self.konfig.games(**query) if g['id'] == id), title)
+
+if __name__ == '__main__':
+    unittest.main()
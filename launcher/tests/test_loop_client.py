@@ -0,0 +1,100 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Run from the launcher directory with: python3 -m unittest discover tests
+
+import asyncio
+import loop_client as lc
+import queue
+import unittest
+
+class RecordingClient(lc.LoopClient):
+
+    # Records the subscriptions the transport is asked to make, and
+    # delivers whatever is sent with send()
+
+    def __init__(self):
+        super().__init__()
+        self.calls = queue.Queue()
+
+    def send(self, subject, data):
+        self._loop.call_soon_threadsafe(self._deliver, subject, data)
+
+    async def _connect(self):
+        self._connected.set()
+
+    async def _request(self, subject, data, timeout):
+        return data
+
+    async def _subscribe(self, subject):
+        self.calls.put(('subscribe', subject))
+
+    async def _unsubscribe(self, subject):
+        self.calls.put(('unsubscribe', subject))
+
+    async def _publish(self, subject, data):
+        pass
+
+    async def _next_message(self, subject, timeout):
+        await asyncio.sleep(timeout)
+
+class SubscriptionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = RecordingClient()
+
+    def assertCalls(self, *calls):
+        for call in calls:
+            self.assertEqual(self.client.calls.get(timeout=1.0), call)
+        # Anything else would have been made by now
+        self.client.request("sync", b"", timeout=1.0)
+        self.assertTrue(self.client.calls.empty())
+
+    def test_callbacks_share_a_subscription(self):
+        first, second = queue.Queue(), queue.Queue()
+        self.client.subscribe("red.frames", first.put)
+        self.client.subscribe("red.frames", second.put)
+        self.assertCalls(('subscribe', "red.frames"))
+
+        self.client.send("red.frames", b"frame")
+        self.assertEqual(first.get(timeout=1.0), b"frame")
+        self.assertEqual(second.get(timeout=1.0), b"frame")
+
+    def test_last_unsubscribe_ends_the_subscription(self):
+        first, second = queue.Queue(), queue.Queue()
+        self.client.subscribe("red.frames", first.put)
+        self.client.subscribe("red.frames", second.put)
+        self.client.unsubscribe("red.frames", first.put)
+        self.assertCalls(('subscribe', "red.frames"))
+
+        self.client.send("red.frames", b"frame")
+        self.assertEqual(second.get(timeout=1.0), b"frame")
+        self.assertTrue(first.empty())
+
+        self.client.unsubscribe("red.frames", second.put)
+        self.assertCalls(('unsubscribe', "red.frames"))
+
+    def test_failing_callback_does_not_starve_others(self):
+        def fail(data):
+            raise ValueError("Bad frame")
+
+        received = queue.Queue()
+        self.client.subscribe("red.frames", fail)
+        self.client.subscribe("red.frames", received.put)
+        with self.assertLogs(level='ERROR'):
+            self.client.send("red.frames", b"frame")
+            self.assertEqual(received.get(timeout=1.0), b"frame")
+
+if __name__ == '__main__':
+    unittest.main()
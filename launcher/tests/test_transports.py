@@ -0,0 +1,177 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Run from the launcher directory with: python3 -m unittest discover tests
+
+import asyncio
+import pathlib
+import queue
+import tempfile
+import threading
+import time
+import transports as tr
+import uds
+import unittest
+
+# Stands in for remote.py, with the parts the in-process client uses.
+# Requests are answered with "<topic>:<data>"; "slow" takes a second,
+# as stopping a title does
+FAKE_REMOTE = '''
+import asyncio
+import time
+
+listeners = []
+
+def load_configs(platform_config, game_config, cabinet=None):
+    pass
+
+async def publish(subject, data):
+    for listener in list(listeners):
+        listener(subject, data)
+
+async def flush_state_events():
+    pass
+
+def handle_topic(topic, data):
+    if topic == "slow":
+        time.sleep(1.0)
+    return topic.encode() + b":" + data
+
+async def start_listening(use_nats=True, socket_path=None):
+    while True:
+        await asyncio.sleep(3600)
+'''
+
+class FakeSocketRemote:
+
+    # Answers requests on a Unix domain socket as the remote does, and
+    # publishes what clients publish to all of them. Runs on a loop of
+    # its own
+
+    def __init__(self, path):
+        self.path = path
+        self._writers = []
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(
+            asyncio.start_unix_server(self._serve, path=path),
+            self._loop,
+        ).result()
+
+    async def _serve(self, reader, writer):
+        self._writers.append(writer)
+        try:
+            while True:
+                id, subject, data = await uds.read(reader)
+                if id == uds.PUSH_ID:
+                    for client in self._writers:
+                        client.write(uds.encode(uds.PUSH_ID, subject, data))
+                    continue
+                _, _, topic = subject.rpartition('.')
+                writer.write(uds.encode(id, subject, topic.encode() + b":" + data))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self._writers.remove(writer)
+
+def wait_connected(client, timeout=5.0):
+    client._ensure_started()
+    deadline = time.monotonic() + timeout
+    while not client.is_connected:
+        if time.monotonic() > deadline:
+            raise TimeoutError("Client did not connect")
+        time.sleep(0.01)
+
+def next_message_while_publishing(client, subject, data):
+    # The subscription for next_message() is made on the loop, so keep
+    # publishing until it has gone through
+    done = threading.Event()
+
+    def publish():
+        while not done.is_set():
+            client.publish(subject, data)
+            time.sleep(0.02)
+
+    threading.Thread(target=publish, daemon=True).start()
+    try:
+        return client.next_message(subject, timeout=2.0)
+    finally:
+        done.set()
+
+class TransportTest:
+
+    # Tests shared by the socket and in-process transports
+
+    def test_request(self):
+        self.assertEqual(self.client.request("red.query.state", b"x", timeout=1.0), b"state:x")
+
+    def test_publish_reaches_subscribers(self):
+        messages = queue.Queue()
+        self.client.subscribe("red.state", messages.put)
+        self.client.publish("red.state", b"event")
+        self.assertEqual(messages.get(timeout=2.0), b"event")
+        self.client.unsubscribe("red.state", messages.put)
+
+    def test_next_message(self):
+        self.assertEqual(next_message_while_publishing(self.client, "red.heartbeat", b"beat"), b"beat")
+
+    def test_next_message_times_out(self):
+        with self.assertRaises(TimeoutError):
+            self.client.next_message("red.frames", timeout=0.2)
+
+class SocketClientTest(TransportTest, unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._dir = tempfile.TemporaryDirectory()
+        cls.remote = FakeSocketRemote(str(pathlib.Path(cls._dir.name) / "remote.sock"))
+        cls.client = tr.SocketClient(cls.remote.path)
+        wait_connected(cls.client)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._dir.cleanup()
+
+class InProcessClientTest(TransportTest, unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # One remote module per process, as in the launcher
+        cls._dir = tempfile.TemporaryDirectory()
+        remote_path = pathlib.Path(cls._dir.name)
+        (remote_path / "remote.py").write_text(FAKE_REMOTE)
+        cls.client = tr.InProcessClient(str(remote_path))
+        wait_connected(cls.client)
+
+        cls.socket_dir = tempfile.TemporaryDirectory()
+        cls.remote = FakeSocketRemote(str(pathlib.Path(cls.socket_dir.name) / "remote.sock"))
+        cls.other = tr.SocketClient(cls.remote.path)
+        wait_connected(cls.other)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._dir.cleanup()
+        cls.socket_dir.cleanup()
+
+    def test_slow_handler_does_not_block_other_cabinets(self):
+        slow = threading.Thread(target=self.client.request, args=("red.query.slow", b"", 3.0))
+        slow.start()
+        time.sleep(0.1)
+
+        # Another cabinet's client shares the loop
+        started = time.monotonic()
+        self.assertEqual(self.other.request("red.lobby.query.state", b"x", timeout=0.5), b"state:x")
+        self.assertLess(time.monotonic() - started, 0.5)
+        slow.join()
+
+if __name__ == '__main__':
+    unittest.main()
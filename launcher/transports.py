@@ -0,0 +1,202 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Transports for requests to the remote and the state it publishes. NATS
+# is the default; when launcher and remote share a host, the remote can
+# be reached over a Unix domain socket, or run inside the launcher
+# process. Frames and requests to pub always go over NATS.
+
+from collections import defaultdict
+import asyncio
+import concurrent.futures
+import importlib
+import logging
+import loop_client as lc
+import pathlib
+import sys
+import uds
+
+TRANSPORT_NATS = "nats"
+TRANSPORT_SOCKET = "socket"
+TRANSPORT_IN_PROCESS = "inprocess"
+TRANSPORTS = [ TRANSPORT_NATS, TRANSPORT_SOCKET, TRANSPORT_IN_PROCESS ]
+
+CONNECT_RETRY_WAIT = 1.0
+
+class PushClient(lc.LoopClient):
+
+    # Client of a remote that pushes everything it publishes to the
+    # client, as if subscribed to all subjects, so subscriptions are just
+    # local filters
+
+    def _reset(self):
+        # Futures of next_message() calls by subject
+        self._waiting = defaultdict(list)
+
+    def _dispatch(self, subject, data):
+        self._deliver(subject, data)
+        for fut in self._waiting.pop(subject, ()):
+            if not fut.done():
+                fut.set_result(data)
+
+    async def _subscribe(self, subject):
+        pass
+
+    async def _unsubscribe(self, subject):
+        pass
+
+    async def _next_message(self, subject, timeout):
+        timeout = await self._wait_connected(timeout)
+        fut = self._loop.create_future()
+        self._waiting[subject].append(fut)
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            if fut in (waiting := self._waiting.get(subject, ())):
+                waiting.remove(fut)
+
+class SocketClient(PushClient):
+
+    # Connects to the Unix domain socket of a remote on the same host.
+    # What the client publishes, the remote publishes in turn.
+
+    def __init__(self, path, max_in_flight=lc.DEFAULT_MAX_IN_FLIGHT):
+        super().__init__(max_in_flight)
+        self.path = path
+        self._reset()
+
+    def _reset(self):
+        super()._reset()
+        self._writer = None
+        self._pending = {}
+        self._last_id = uds.PUSH_ID
+
+    async def _connect(self):
+        while True:
+            try:
+                reader, self._writer = await asyncio.open_unix_connection(self.path)
+            except OSError as e:
+                logging.warning(f"Unable to connect to remote at {self.path}: {e}")
+                await asyncio.sleep(CONNECT_RETRY_WAIT)
+                continue
+
+            logging.info(f"Connected to remote at {self.path}")
+            self._connected.set()
+            try:
+                while True:
+                    id, subject, data = await uds.read(reader)
+                    if id == uds.PUSH_ID:
+                        self._dispatch(subject, data)
+                    elif (fut := self._pending.pop(id, None)) and not fut.done():
+                        fut.set_result(data)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                logging.warning(f"Disconnected from remote at {self.path}")
+
+            self._connected.clear()
+            self._writer = None
+            for fut in self._pending.values():
+                if not fut.done():
+                    fut.set_exception(ConnectionError("Disconnected from remote"))
+            self._pending.clear()
+            await asyncio.sleep(CONNECT_RETRY_WAIT)
+
+    async def _request(self, subject, data, timeout):
+        timeout = await self._wait_connected(timeout)
+        self._last_id = self._last_id % 0xffffffff + 1
+        id = self._last_id
+        fut = self._pending[id] = self._loop.create_future()
+        self._writer.write(uds.encode(id, subject, data))
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            self._pending.pop(id, None)
+
+    async def _publish(self, subject, data):
+        await self._wait_connected(None)
+        self._writer.write(uds.encode(uds.PUSH_ID, subject, data))
+
+class InProcessClient(PushClient):
+
+    # Runs the remote on the client's event loop. The remote's configs
+    # are read from its own directory, and its dependencies must be
+    # installed alongside the launcher's. Its request handlers block
+    # (stopping a title waits for it to exit), so they run on a thread of
+    # their own, one at a time as in the remote service, rather than
+    # stall the loop all clients share. Only one cabinet of one launcher
+    # process may do this, or titles would be launched by several
+    # remotes at once.
+
+    def __init__(self, remote_path, cabinet_id=None, max_in_flight=lc.DEFAULT_MAX_IN_FLIGHT):
+        super().__init__(max_in_flight)
+        self.remote_path = pathlib.Path.home() / remote_path
+        self.cabinet_id = cabinet_id
+        self._reset()
+
+    def _reset(self):
+        super()._reset()
+        self._remote = None
+        # Threads don't survive a fork, so each loop gets its own
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="remote")
+
+    async def _connect(self):
+        remote = import_remote(self.remote_path)
+        remote.load_configs(
+            str(self.remote_path / "config.yaml"),
+            str(self.remote_path / "games.yaml"),
+            self.cabinet_id,
+        )
+        if self._dispatch not in remote.listeners:
+            remote.listeners.append(self._dispatch)
+        self._remote = remote
+
+        logging.info(f"Running remote from {self.remote_path} in process")
+        self._connected.set()
+        await remote.start_listening(use_nats=False)
+
+    async def _request(self, subject, data, timeout):
+        await self._wait_connected(timeout)
+        _, _, topic = subject.rpartition('.')
+        response = await self._loop.run_in_executor(self._executor, self._remote.handle_topic, topic, data)
+        await self._remote.flush_state_events()
+        return response
+
+    async def _publish(self, subject, data):
+        await self._wait_connected(None)
+        await self._remote.publish(subject, data)
+
+def import_remote(remote_path):
+    # Appended rather than prepended, so the launcher's own copies of the
+    # modules both share (generated protos, rpc) take precedence
+    if str(remote_path) not in sys.path:
+        sys.path.append(str(remote_path))
+    return importlib.import_module("remote")
+
+def create_control_client(transport, config, nats_client, cabinet_id=None, max_in_flight=lc.DEFAULT_MAX_IN_FLIGHT):
+    # Client for requests to the remote and for its state subjects
+    if transport == TRANSPORT_NATS:
+        return nats_client
+    elif transport == TRANSPORT_SOCKET:
+        return SocketClient(
+            config.get('socket_path', uds.DEFAULT_SOCKET_PATH),
+            max_in_flight=max_in_flight,
+        )
+    elif transport == TRANSPORT_IN_PROCESS:
+        if not (remote_path := config.get('remote_path')):
+            raise ValueError("In-process transport requires remote_path")
+        return InProcessClient(
+            remote_path,
+            cabinet_id=cabinet_id,
+            max_in_flight=max_in_flight,
+        )
+    raise ValueError(f"Unknown transport: {transport} (expected one of {', '.join(TRANSPORTS)})")
@@ -0,0 +1 @@
+../shared/uds.py
\ No newline at end of file
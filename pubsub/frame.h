@@ -28,6 +28,14 @@ typedef enum {
 
 #define ATTR_NONE   0x00
 #define ATTR_ROT180 0x01
+// Header is followed by a FrameHeaderExt. Publishers only set this when
+// asked to, since subscribers that predate it can't skip the extension
+#define ATTR_EXT    0x80
+
+#define FRAME_EXT_VERSION 1
+
+// Frames go to "<prefix>.frames"; each cabinet uses its own prefix
+#define XM_DEFAULT_SUBJECT_PREFIX "red"
 
 // Wire header: 8 bytes, little-endian, immediately followed by LZ4-compressed
 // pixel data. Decompressed size = pitch * height.
@@ -39,8 +47,20 @@ typedef struct __attribute__((packed)) {
     uint8_t  attrs;
 } FrameHeader;
 
+// Header extension: sits between the header and the compressed pixel data
+// when attrs has ATTR_EXT. size is the size of the whole extension, so that
+// subscribers can skip fields added by later versions.
+typedef struct __attribute__((packed)) {
+    uint8_t  version;      // FRAME_EXT_VERSION
+    uint8_t  size;         // sizeof(FrameHeaderExt)
+    uint16_t reserved;
+    uint32_t sequence;     // Incremented for every published frame
+    uint64_t timestamp_us; // CLOCK_MONOTONIC when the frame was published
+} FrameHeaderExt;
+
 typedef struct {
     FrameHeader  header;
+    FrameHeaderExt ext;    // Zeroed if the frame has no extension
     uint8_t     *content;
     size_t       content_size;
 } Frame;
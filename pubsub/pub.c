@@ -788,7 +788,8 @@ int main(int argc, const char **argv)
         kvstore_dump(&kv_store);
     }
 
-    xm_init(args.server_url);
+    xm_init(args.server_url, args.subject_prefix);
+    xm_set_frame_ext(args.frame_ext);
     input_init();
 
     if (args.rom_path) {
@@ -39,6 +39,7 @@ bool args_parse(int argc, const char **argv, ArgsOptions *opts, KvStore *kv_stor
     opts->log_overwrite = false;
     opts->background = false;
     opts->show_fps = false;
+    opts->frame_ext = false;
     opts->filter.brightness = 1.0f;
     opts->filter.phosphor = 0.0f;
     char temp[1024];
@@ -202,6 +203,12 @@ bool args_parse(int argc, const char **argv, ArgsOptions *opts, KvStore *kv_stor
                 return false;
             }
             opts->server_url = *(++arg);
+        } else if (strcmp(*arg, "--subject-prefix") == 0 || strcmp(*arg, "-sp") == 0) {
+            if (++i >= argc) {
+                log_e(LOG_TAG, "Missing argument for %s\n", *arg);
+                return false;
+            }
+            opts->subject_prefix = *(++arg);
         } else if (strcmp(*arg, "--tag") == 0 || strcmp(*arg, "-t") == 0) {
             if (++i >= argc) {
                 log_e(LOG_TAG, "Missing argument for %s\n", *arg);
@@ -212,6 +219,10 @@ bool args_parse(int argc, const char **argv, ArgsOptions *opts, KvStore *kv_stor
             opts->tag = *(++arg);
         } else if (strcmp(*arg, "--chatty-core") == 0 || strcmp(*arg, "-cc") == 0) {
             opts->chatty_core = true;
+        } else if (strcmp(*arg, "--frame-ext") == 0 || strcmp(*arg, "-fx") == 0) {
+            // Sequence numbers and timestamps in frame headers; every
+            // subscriber must understand ATTR_EXT
+            opts->frame_ext = true;
         } else if (strcmp(*arg, "--filter-brightness") == 0) {
             if (++i >= argc) {
                 log_e(LOG_TAG, "Missing argument for %s\n", *arg);
@@ -23,6 +23,7 @@
 
 typedef struct {
     const char *server_url;
+    const char *subject_prefix;
     const char *rom_path;
     const char *so_path;
     const char *log_path;
@@ -40,6 +41,7 @@ typedef struct {
     KvStore input_configs;
     const char *tag;
     bool chatty_core;
+    bool frame_ext;
     FilterOptions filter;
 } ArgsOptions;
 
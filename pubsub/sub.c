@@ -380,7 +380,7 @@ int main(int argc, char **argv)
     blit_src = args.source;
     blit_dest = args.dest;
 
-    xm_init(args.server_url);
+    xm_init(args.server_url, args.subject_prefix, args.region);
     xm_set_callback(xm_callback);
     while (!exit_main_loop) {
         // Virtually all work is done via callbacks, and SIGINT
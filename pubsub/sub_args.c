@@ -22,6 +22,8 @@
 bool args_parse(int argc, const char **argv, ArgsOptions *opts)
 {
     opts->server_url = NULL;
+    opts->subject_prefix = NULL;
+    opts->region = NULL;
     opts->log_path = NULL;
     opts->log_level = LOG_INFO;
     opts->log_overwrite = false;
@@ -36,6 +38,8 @@ bool args_parse(int argc, const char **argv, ArgsOptions *opts)
             fprintf(stdout, "  --src-rect          Source rectangle in server bitmap\n");
             fprintf(stdout, "  --dest-rect         Destination rectangle on LED matrix\n");
             fprintf(stdout, "  --content-rect      Content rectangle on LED matrix\n");
+            fprintf(stdout, "  --subject-prefix    NATS subject prefix of the cabinet (default: red)\n");
+            fprintf(stdout, "  --region            Receive only this region's frames from the frame relay\n");
             fprintf(stdout, "  --background        Run in background as a daemon\n");
             fprintf(stdout, "  --fps               Show server FPS\n");
             return false;
@@ -92,6 +96,18 @@ bool args_parse(int argc, const char **argv, ArgsOptions *opts)
                 return false;
             }
             opts->server_url = *(++arg);
+        } else if (strcmp(*arg, "--subject-prefix") == 0 || strcmp(*arg, "-sp") == 0) {
+            if (++i >= argc) {
+                log_e(LOG_TAG, "Missing argument for %s\n", *arg);
+                return false;
+            }
+            opts->subject_prefix = *(++arg);
+        } else if (strcmp(*arg, "--region") == 0 || strcmp(*arg, "-rg") == 0) {
+            if (++i >= argc) {
+                log_e(LOG_TAG, "Missing argument for %s\n", *arg);
+                return false;
+            }
+            opts->region = *(++arg);
         } else if (strcmp(*arg, "--output") == 0 || strcmp(*arg, "-o") == 0) {
             if (++i >= argc) {
                 log_e(LOG_TAG, "Missing argument for %s\n", *arg);
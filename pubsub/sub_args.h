@@ -21,6 +21,8 @@
 
 typedef struct {
     const char *server_url;
+    const char *subject_prefix;
+    const char *region;
     const char *log_path;
     bool log_overwrite;
     bool background;
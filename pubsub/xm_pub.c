@@ -14,8 +14,10 @@
 
 #include "xm_pub.h"
 
+#include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
+#include <time.h>
 #include <nats/nats.h>
 #include <lz4.h>
 #include "pb_decode.h"
@@ -28,16 +30,23 @@ static natsConnection *conn = NULL;
 static natsSubscription *sub = NULL;
 static uint8_t *msg_buf      = NULL;
 static size_t   msg_buf_size = 0;
+static bool     frame_ext    = false;
+static uint32_t sequence     = 0;
 
-static const char *pub_subject = "red.frames";
-static const char *sub_subject = "red.pub.request";
+static char pub_subject[128];
+static char sub_subject[128];
 
-void xm_init(const char *server_url)
+void xm_init(const char *server_url, const char *subject_prefix)
 {
     if (conn) {
         log_e(LOG_TAG, "NATS connection already initialized\n");
         return;
     }
+    if (!subject_prefix) {
+        subject_prefix = XM_DEFAULT_SUBJECT_PREFIX;
+    }
+    snprintf(pub_subject, sizeof(pub_subject), "%s.frames", subject_prefix);
+    snprintf(sub_subject, sizeof(sub_subject), "%s.pub.request", subject_prefix);
     // Connect to NATS server
     natsOptions *opts;
     natsOptions_Create(&opts);
@@ -130,6 +139,11 @@ void xm_poll_requests(const RequestHandler handler)
     }
 }
 
+void xm_set_frame_ext(bool enabled)
+{
+    frame_ext = enabled;
+}
+
 void xm_publish_frame(const FrameHeader *geometry, const unsigned char *content, size_t size)
 {
     if (!conn) {
@@ -138,8 +152,9 @@ void xm_publish_frame(const FrameHeader *geometry, const unsigned char *content,
     }
 
     // Ensure message buffer is large enough for header + worst-case compressed content
+    size_t header_size = sizeof(FrameHeader) + (frame_ext ? sizeof(FrameHeaderExt) : 0);
     int max_compressed = LZ4_compressBound(size);
-    size_t needed = sizeof(FrameHeader) + max_compressed;
+    size_t needed = header_size + max_compressed;
     if (needed > msg_buf_size) {
         free(msg_buf);
         msg_buf = malloc(needed);
@@ -153,9 +168,21 @@ void xm_publish_frame(const FrameHeader *geometry, const unsigned char *content,
 
     // Write header, then compress pixel data directly into the remainder
     memcpy(msg_buf, geometry, sizeof(FrameHeader));
+    if (frame_ext) {
+        struct timespec now;
+        clock_gettime(CLOCK_MONOTONIC, &now);
+        FrameHeaderExt ext = {
+            .version      = FRAME_EXT_VERSION,
+            .size         = sizeof(FrameHeaderExt),
+            .sequence     = sequence++,
+            .timestamp_us = (uint64_t)now.tv_sec * 1000000ULL + now.tv_nsec / 1000,
+        };
+        ((FrameHeader *)msg_buf)->attrs |= ATTR_EXT;
+        memcpy(msg_buf + sizeof(FrameHeader), &ext, sizeof(FrameHeaderExt));
+    }
     int compressed_size = LZ4_compress_fast(
         (const char *)content,
-        (char *)msg_buf + sizeof(FrameHeader),
+        (char *)msg_buf + header_size,
         size, max_compressed, 4
     );
     if (compressed_size <= 0) {
@@ -165,7 +192,7 @@ void xm_publish_frame(const FrameHeader *geometry, const unsigned char *content,
 
     // Publish to NATS
     natsStatus s = natsConnection_Publish(conn,
-        pub_subject, msg_buf, sizeof(FrameHeader) + compressed_size);
+        pub_subject, msg_buf, header_size + compressed_size);
     if (s != NATS_OK) {
         log_e(LOG_TAG, "Error publishing to '%s': %s\n",
             pub_subject, natsStatus_GetText(s));
@@ -15,6 +15,7 @@
 #ifndef __XM_PUB_H__
 #define __XM_PUB_H__
 
+#include <stdbool.h>
 #include <stddef.h>
 #include "frame.h"
 #include "requests.pb-c.h"
@@ -22,7 +23,8 @@
 
 typedef void (*RequestHandler)(const RequestEnvelope *request, ResponseEnvelope *response);
 
-void xm_init(const char *server_url);
+void xm_init(const char *server_url, const char *subject_prefix);
+void xm_set_frame_ext(bool enabled);
 void xm_publish_frame(const FrameHeader *geometry, const unsigned char *content, size_t size);
 void xm_poll_requests(const RequestHandler handler);
 void xm_cleanup();
@@ -12,7 +12,9 @@
 // See the License for the specific language governing permissions and
 // limitations under the License.
 
+#include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
 #include <nats/nats.h>
 #include <lz4.h>
 #include "frame.h"
@@ -23,7 +25,7 @@
 
 static void message_handler(natsConnection *nc, natsSubscription *sub, natsMsg *msg, void *closure);
 
-static const char *subject = "red.frames";
+static char subject[128];
 
 static natsConnection  *conn           = NULL;
 static natsSubscription *sub_handle    = NULL;
@@ -31,12 +33,21 @@ static xm_callback_t    frame_callback = NULL;
 static uint8_t         *decomp_buf     = NULL;
 static size_t           decomp_buf_size = 0;
 
-void xm_init(const char *server_url)
+void xm_init(const char *server_url, const char *subject_prefix, const char *region)
 {
     if (conn) {
         log_e(LOG_TAG, "NATS connection already initialized\n");
         return;
     }
+    if (!subject_prefix) {
+        subject_prefix = XM_DEFAULT_SUBJECT_PREFIX;
+    }
+    if (region) {
+        // Frames cropped to one region by the frame relay
+        snprintf(subject, sizeof(subject), "%s.frames.%s", subject_prefix, region);
+    } else {
+        snprintf(subject, sizeof(subject), "%s.frames", subject_prefix);
+    }
 
     // Connect to NATS server
     natsOptions *opts;
@@ -124,6 +135,20 @@ static void message_handler(natsConnection *nc, natsSubscription *sub, natsMsg *
     const FrameHeader *hdr = (const FrameHeader *)data;
     size_t decomp_size = (size_t)hdr->pitch * hdr->height;
 
+    // Skip the header extension, keeping the fields this version knows
+    int header_size = sizeof(FrameHeader);
+    FrameHeaderExt ext = {0};
+    if (hdr->attrs & ATTR_EXT) {
+        int ext_size = len >= header_size + 2 ? data[header_size + 1] : 0;
+        if (ext_size < 2 || len < header_size + ext_size) {
+            log_e(LOG_TAG, "Malformed header extension\n");
+            natsMsg_Destroy(msg);
+            return;
+        }
+        memcpy(&ext, data + header_size, ext_size < (int)sizeof(ext) ? ext_size : (int)sizeof(ext));
+        header_size += ext_size;
+    }
+
     // Grow decompression buffer only when needed (rare: resolution change)
     if (decomp_size > decomp_buf_size) {
         free(decomp_buf);
@@ -138,8 +163,8 @@ static void message_handler(natsConnection *nc, natsSubscription *sub, natsMsg *
     }
 
     // Decompress content
-    const char *compressed = (const char *)(data + sizeof(FrameHeader));
-    int compressed_len = len - (int)sizeof(FrameHeader);
+    const char *compressed = (const char *)(data + header_size);
+    int compressed_len = len - header_size;
     int result = LZ4_decompress_safe(compressed, (char *)decomp_buf, compressed_len, decomp_size);
     if (result < 0) {
         log_e(LOG_TAG, "LZ4 decompression failed: %d\n", result);
@@ -150,6 +175,7 @@ static void message_handler(natsConnection *nc, natsSubscription *sub, natsMsg *
     if (frame_callback) {
         Frame frame = {
             .header       = *hdr,
+            .ext          = ext,
             .content      = decomp_buf,
             .content_size = (size_t)result,
         };
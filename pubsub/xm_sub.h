@@ -17,7 +17,7 @@
 
 #include "frame.h"
 
-void xm_init(const char *server_url);
+void xm_init(const char *server_url, const char *subject_prefix, const char *region);
 void xm_set_callback(xm_callback_t callback);
 void xm_cleanup();
 
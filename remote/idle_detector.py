@@ -0,0 +1,100 @@
+## Copyright (c) 2026 Akop Karapetyan
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##    http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+
+import lz4.block
+import operator
+import struct
+
+# FrameHeader and the attrs flag for FrameHeaderExt, as in frame.h
+FRAME_HEADER = struct.Struct("<HHHBB")
+ATTR_EXT = 0x80
+
+DEFAULT_ACTIVE_AFTER = 0.5
+# Share of sampled bytes that must differ for the screen to count as
+# changing; small enough for a sprite, too large for a blinking cursor
+DEFAULT_THRESHOLD = 0.005
+# Frames are looked at no more often than this
+SAMPLE_INTERVAL = 0.2
+# Bytes between samples. Odd and not a divisor of any likely pitch, so
+# the samples cover every column and both bytes of 16-bit pixels
+SAMPLE_STRIDE = 61
+
+class IdleDetector:
+
+    # Tells a static screen (paused, or left on a menu) from one in use,
+    # by looking at a few frames a second. A frame published byte for
+    # byte as the last one looked at is unchanged without decompressing
+    # it; otherwise a sparse sample of its pixels is compared with the
+    # last one. The screen becomes idle once it has been static for
+    # idle_after seconds, and active again once it has been changing for
+    # active_after seconds, so brief flickers don't flip it back and
+    # forth.
+
+    def __init__(self, idle_after, active_after=DEFAULT_ACTIVE_AFTER, threshold=DEFAULT_THRESHOLD):
+        self.idle_after = idle_after
+        self.active_after = active_after
+        self.threshold = threshold
+        self.reset()
+
+    def reset(self):
+        # Starts over as active, e.g. for a new title
+        self.idle = False
+        self._payload = None
+        self._sample = None
+        self._next_check = 0
+        self._static_since = None
+        self._changing_since = None
+
+    def check(self, data, now):
+        # Looks at a published frame received at now (time.monotonic()).
+        # Returns True if this made the screen idle or active
+        if now < self._next_check or len(data) < FRAME_HEADER.size:
+            return False
+        self._next_check = now + SAMPLE_INTERVAL
+
+        pitch, _, height, _, attrs = FRAME_HEADER.unpack_from(data)
+        offset = FRAME_HEADER.size
+        if attrs & ATTR_EXT and len(data) > offset + 1:
+            # The extension changes with every frame; skip it
+            offset += data[offset + 1]
+        payload = data[offset:]
+
+        if payload == self._payload:
+            changing = False
+        else:
+            sample = lz4.block.decompress(payload, uncompressed_size=pitch * height)[::SAMPLE_STRIDE]
+            if self._sample is None or len(sample) != len(self._sample):
+                changing = True
+            else:
+                changed = sum(map(operator.ne, sample, self._sample))
+                changing = changed > self.threshold * len(sample)
+            self._payload = payload
+            self._sample = sample
+
+        if changing:
+            self._static_since = None
+            if self._changing_since is None:
+                self._changing_since = now
+        else:
+            self._changing_since = None
+            if self._static_since is None:
+                self._static_since = now
+
+        if not self.idle and self._static_since is not None and now - self._static_since >= self.idle_after:
+            self.idle = True
+            return True
+        if self.idle and self._changing_since is not None and now - self._changing_since >= self.active_after:
+            self.idle = False
+            return True
+        return False
@@ -15,33 +15,56 @@
 ## limitations under the License.
 
 from generated.common_pb2 import LaunchId
+from generated.events_pb2 import Heartbeat
+from generated.events_pb2 import StateEvent
 from generated.responses_pb2 import Result
 import argparse
 import alsaaudio
 import asyncio
-import generated.requests_pb2 as requests
 import generated.responses_pb2 as responses
 import glob
+import idle_detector as idd
 import logging
 import nats
 import os
 import pathlib
 import psutil
 import re
+import rpc
 import shlex
 import subprocess
+import time
+import uds
 import yaml
 
-SUBJECT = "red.query.*"
 LAUNCH_PROCESS_NAME = "pub"
 APP_ID_PATTERN = r"^[A-Za-z0-9_-]+$"
 TITLE_ID_PATTERN = r"^[A-Za-z0-9_-]+$"
 CORE_PATTERN = "*.so"
+WATCH_INTERVAL = 1
+HEARTBEAT_INTERVAL = 2
+# While nothing is running, only rescan the process list every this many
+# watch intervals
+IDLE_SCAN_INTERVALS = 5
 
 game_config_path = None
 platform_config_path = None
 game_configs = {}
 server_config = {}
+cabinet_id = None
+nats_url = None
+socket_path = None
+subjects = rpc.Subjects()
+nc = None
+# Callables taking (subject, data), notified of everything published;
+# used by socket clients and an in-process launcher
+listeners = []
+active_tag = None
+watched_proc = None
+last_volume = 0
+pending_events = []
+# Set if idle detection is configured
+idle_detector = None
 
 def reload_game_configs():
     if not pathlib.Path(game_config_path).is_file():
@@ -78,8 +101,33 @@ def reload_platform_config():
     if 'nats_url' not in server_config:
         raise ValueError("Missing NATS URL in configuration")
 
+    global nats_url, socket_path, subjects, idle_detector
+    settings = cabinet_config()
+    nats_url = settings['nats_url']
+    socket_path = settings.get('socket_path')
+    subjects = rpc.Subjects(settings['subject_prefix'])
+    idle_detector = None
+    if idle_after := settings.get('idle_after'):
+        idle_detector = idd.IdleDetector(
+            idle_after,
+            active_after=settings.get('active_after', idd.DEFAULT_ACTIVE_AFTER),
+            threshold=settings.get('idle_threshold', idd.DEFAULT_THRESHOLD),
+        )
+
     logging.info(f"Server configuration loaded")
 
+def cabinet_config():
+    # Settings of the cabinet served: top-level settings, overridden by
+    # those of the cabinet's entry, if serving a specific cabinet
+    if not (id := cabinet_id or server_config.get('cabinet')):
+        return { **server_config, 'subject_prefix': rpc.DEFAULT_SUBJECT_PREFIX }
+
+    for cabinet in server_config.get('cabinets', []):
+        if cabinet.get('id') == id:
+            return { **server_config, 'subject_prefix': rpc.cabinet_prefix(id), **cabinet }
+
+    raise ValueError(f"Cabinet not found in configuration: {id}")
+
 def find_proc_and_tag():
     found_proc = None
     for proc in psutil.process_iter(['name']):
@@ -104,16 +152,67 @@ def query_identifiers():
     return tag
 
 def current_volume():
+    global last_volume
     m = alsaaudio.Mixer('PCM')
     vol, _ = m.getvolume()
     logging.info(f"PCM mixer volume obtained: {vol}%")
-    return int(vol)
+    last_volume = int(vol)
+    return last_volume
 
-def get_state(data):
-    req = requests.StateRequest()
-    req.ParseFromString(data)
+def active_launch_id():
+    if not active_tag:
+        return None
 
-    _, tag = find_proc_and_tag()
+    app_id, title_id = active_tag
+    return LaunchId(
+        app_id=app_id,
+        title_id=title_id,
+    )
+
+def queue_state_event(type):
+    pending_events.append(StateEvent(
+        type=type,
+        is_running=active_tag is not None,
+        active=active_launch_id(),
+        volume=last_volume,
+        idle=is_idle(),
+    ))
+
+def is_idle():
+    return idle_detector is not None and idle_detector.idle
+
+def update_active(tag, proc=None):
+    # Records the running title, queueing an event if it has changed
+    global active_tag, watched_proc
+    tag = tuple(tag) if tag else None
+    watched_proc = proc
+    if tag == active_tag:
+        return
+
+    active_tag = tag
+    if idle_detector:
+        idle_detector.reset()
+    queue_state_event(StateEvent.Type.TYPE_LAUNCH if tag else StateEvent.Type.TYPE_EXIT)
+
+async def publish(subject, data):
+    if nc:
+        await nc.publish(subject, data)
+    for listener in list(listeners):
+        try:
+            listener(subject, data)
+        except Exception as e:
+            logging.warning(f"Error notifying listener of '{subject}': {e}")
+
+async def flush_state_events():
+    while pending_events:
+        event = pending_events.pop(0)
+        logging.debug(f"Publishing state event: {event}")
+        await publish(subjects.state, event.SerializeToString())
+
+def get_state(req):
+
+    proc, tag = find_proc_and_tag()
+    update_active(tag, proc)
     if tag:
         app_id, title_id = tag
         active = LaunchId(
@@ -127,25 +226,13 @@ def get_state(data):
         volume=current_volume(),
         active=active,
         is_running=active is not None,
+        idle=is_idle(),
         result=Result(
             status=Result.Status.STATUS_OK,
         )
     )
 
-def stop_process(data):
-    req = requests.StopRequest()
-    req.ParseFromString(data)
-
-    proc, _ = find_proc_and_tag()
-    if not proc:
-        logging.warning(f"Process {LAUNCH_PROCESS_NAME} not found")
-        return responses.StopResponse(
-            was_running=False,
-            result=Result(
-                status=Result.Status.STATUS_OK,
-            )
-        )
-
+def stop_proc(proc):
     logging.info(f"Stopping {LAUNCH_PROCESS_NAME} (pid: {proc.pid})...")
 
     # Send SIGINT to allow graceful shutdown, then wait for it to exit
@@ -157,6 +244,22 @@ def stop_process(data):
         logging.warning(f"Killing process due to timeout")
         # If it doesn't exit, kill it forcefully
         proc.kill()
+        proc.wait(timeout=2)
+
+def stop_process(req):
+
+    proc, _ = find_proc_and_tag()
+    if not proc:
+        logging.warning(f"Process {LAUNCH_PROCESS_NAME} not found")
+        return responses.StopResponse(
+            was_running=False,
+            result=Result(
+                status=Result.Status.STATUS_OK,
+            )
+        )
+
+    stop_proc(proc)
+    update_active(None)
 
     return responses.StopResponse(
         was_running=True,
@@ -165,9 +268,7 @@ def stop_process(data):
         )
     )
 
-def set_volume(data):
-    req = requests.SetVolumeRequest()
-    req.ParseFromString(data)
+def set_volume(req):
 
     vol = max(0, min(100, int(req.volume)))
     logging.info(f"Setting PCM mixer volume to: {vol}%...")
@@ -175,30 +276,27 @@ def set_volume(data):
     m = alsaaudio.Mixer('PCM')
     m.setvolume(vol)
 
+    volume = current_volume()
+    queue_state_event(StateEvent.Type.TYPE_VOLUME)
+
     return responses.SetVolumeResponse(
-        volume=current_volume(),
+        volume=volume,
         result=Result(
             status=Result.Status.STATUS_OK,
         )
     )
 
-def launch(data):
-    req = requests.LaunchRequest()
-    req.ParseFromString(data)
-
-    app_id = req.launch_id.app_id
-    title_id = req.launch_id.title_id
-    if not re.fullmatch(APP_ID_PATTERN, app_id):
-        raise ValueError(f"Invalid app_id: {app_id}")
-    if not re.fullmatch(TITLE_ID_PATTERN, title_id):
-        raise ValueError(f"Invalid title_id: {title_id}")
-
-    proc, _ = find_proc_and_tag()
-    if proc:
-        raise ValueError(f"{LAUNCH_PROCESS_NAME} is already running with pid: {proc.pid}")
-
-    logging.info(f"Launching ({app_id}/{title_id})...")
-
+def validate_launch_id(launch_id):
+    if not re.fullmatch(APP_ID_PATTERN, launch_id.app_id):
+        raise ValueError(f"Invalid app_id: {launch_id.app_id}")
+    if not re.fullmatch(TITLE_ID_PATTERN, launch_id.title_id):
+        raise ValueError(f"Invalid title_id: {launch_id.title_id}")
+
+def resolve_launch_args(app_id, title_id):
+    # Finds everything needed to launch the title, without touching what
+    # is running, so a title that can't be launched fails before a switch
+    # stops the current one. Returns the command line and the directory
+    # to run it in
     home_dir = pathlib.Path.home()
     cores_dir = home_dir / server_config['cores_path']
 
@@ -241,14 +339,32 @@ def launch(data):
     args += [
         "--tag", f"{app_id}:{title_id}",
         "--core", os.path.relpath(so_file, cores_dir),
-        "--server-url", server_config['nats_url'],
-        rom_path,
+        "--server-url", nats_url,
     ]
+    if subjects.prefix != rpc.DEFAULT_SUBJECT_PREFIX:
+        args += [ "--subject-prefix", subjects.prefix ]
+    args.append(rom_path)
+
+    return args, cores_dir
 
+def launch_title(args, cwd):
     logging.info(f"Launching {' '.join(args)}")
-    with subprocess.Popen(args, start_new_session=True, cwd=cores_dir) as proc:
+    with subprocess.Popen(args, start_new_session=True, cwd=cwd) as proc:
         logging.info(f"Process launched with pid: {proc.pid}")
 
+def launch(req):
+
+    validate_launch_id(req.launch_id)
+    logging.info(f"Launching ({req.launch_id.app_id}/{req.launch_id.title_id})...")
+    args, cwd = resolve_launch_args(req.launch_id.app_id, req.launch_id.title_id)
+
+    proc, _ = find_proc_and_tag()
+    if proc:
+        raise ValueError(f"{LAUNCH_PROCESS_NAME} is already running with pid: {proc.pid}")
+
+    launch_title(args, cwd)
+    update_active((req.launch_id.app_id, req.launch_id.title_id))
+
     return responses.LaunchResponse(
         result=Result(
             status=Result.Status.STATUS_OK,
@@ -256,38 +372,78 @@ def launch(data):
         launch_id=req.launch_id,
     )
 
+def switch(req):
+
+    validate_launch_id(req.launch_id)
+    logging.info(f"Switching to ({req.launch_id.app_id}/{req.launch_id.title_id})...")
+    args, cwd = resolve_launch_args(req.launch_id.app_id, req.launch_id.title_id)
+
+    # Stop whatever is running and launch the new title in one go, so the
+    # launcher needs a single round trip for a title change
+    started = time.perf_counter()
+    proc, tag = find_proc_and_tag()
+    previous = None
+    if proc:
+        if tag:
+            app_id, title_id = tag
+            previous = LaunchId(
+                app_id=app_id,
+                title_id=title_id,
+            )
+        stop_proc(proc)
+        update_active(None)
+
+    stopped = time.perf_counter()
+    launch_title(args, cwd)
+    launched = time.perf_counter()
+    update_active((req.launch_id.app_id, req.launch_id.title_id))
+
+    stop_usec = int((stopped - started) * 1e6)
+    launch_usec = int((launched - stopped) * 1e6)
+    logging.info(f"Switch complete (stop: {stop_usec / 1000:.1f}ms, launch: {launch_usec / 1000:.1f}ms)")
+
+    return responses.SwitchResponse(
+        result=Result(
+            status=Result.Status.STATUS_OK,
+        ),
+        launch_id=req.launch_id,
+        was_running=proc is not None,
+        previous=previous,
+        stop_usec=stop_usec,
+        launch_usec=launch_usec,
+    )
+
+dispatcher = rpc.Dispatcher({
+    "state": get_state,
+    "set_volume": set_volume,
+    "stop": stop_process,
+    "launch": launch,
+    "switch": switch,
+})
+
 def handle_topic(topic, data):
     logging.info(f"Handling request for topic: {topic}")
-    response = None
     try:
-        match topic:
-            case "state":
-                response = get_state(data)
-            case "set_volume":
-                response = set_volume(data)
-            case "stop":
-                response = stop_process(data)
-            case "launch":
-                response = launch(data)
-            case _:
-                raise ValueError(f"Unrecognized topic: {topic}")
-
+        method, handler = dispatcher.lookup(topic)
     except ValueError as e:
-        # FIXME: return a more specific error to client
         logging.error(f"Error handling topic '{topic}': {e}")
-        response = responses.GeneralResponse(
+        return responses.GeneralResponse(
             result=Result(
                 status=Result.Status.STATUS_ERROR,
             )
-        )
+        ).SerializeToString()
+
+    try:
+        response = handler(method.parse_request(data))
+
+    except ValueError as e:
+        # FIXME: return a more specific error to client
+        logging.error(f"Error handling topic '{topic}': {e}")
+        response = method.error_response()
 
     except Exception as e:
         logging.error(f"Unexpected error handling topic '{topic}': {e}")
-        response = responses.GeneralResponse(
-            result=Result(
-                status=Result.Status.STATUS_ERROR,
-            )
-        )
+        response = method.error_response()
 
     return response.SerializeToString()
 
@@ -298,13 +454,122 @@ async def handle_request(msg):
     response = handle_topic(topic, msg.data)
 
     await msg.respond(response)
+    await flush_state_events()
 
-async def start_listening():
-    nc = await nats.connect(server_config["nats_url"])
+async def handle_socket_client(reader, writer):
+    # Same requests as over NATS, from a launcher on this host. The client
+    # also gets everything published, as if subscribed to all subjects,
+    # and what it publishes is published in turn
+    logging.info(f"Socket client connected")
 
-    # Subscribe and get notified of any messages
-    await nc.subscribe(SUBJECT, cb=handle_request)
-    logging.info(f"Subscribed to '{SUBJECT}'...")
+    def listener(subject, data):
+        writer.write(uds.encode(uds.PUSH_ID, subject, data))
+
+    listeners.append(listener)
+    try:
+        while True:
+            id, subject, data = await uds.read(reader)
+            if id == uds.PUSH_ID:
+                await publish(subject, data)
+                continue
+            _, _, topic = subject.rpartition('.')
+            writer.write(uds.encode(id, subject, handle_topic(topic, data)))
+            await flush_state_events()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        logging.info(f"Socket client disconnected")
+    finally:
+        listeners.remove(listener)
+        writer.close()
+
+async def watch_state():
+    # Notices titles exiting (or starting) outside of requests. While a
+    # title is running only its process is checked, which is cheap
+    intervals = 0
+    while True:
+        await asyncio.sleep(WATCH_INTERVAL)
+        intervals += 1
+        try:
+            if watched_proc and watched_proc.is_running():
+                continue
+            if not watched_proc and not active_tag and intervals % IDLE_SCAN_INTERVALS:
+                continue
+
+            proc, tag = find_proc_and_tag()
+            update_active(tag, proc)
+            await flush_state_events()
+        except Exception as e:
+            logging.warning(f"Error watching state: {e}")
+
+async def send_heartbeats():
+    # Periodic summary of cached state, so the launcher can answer state
+    # queries without a round trip. Builds only on what the request
+    # handlers and the watcher already know; no process scans or mixer
+    # reads happen here
+    epoch = int(time.time())
+    seq = 0
+    while True:
+        heartbeat = Heartbeat(
+            epoch=epoch,
+            seq=seq,
+            is_running=active_tag is not None,
+            active=active_launch_id(),
+            volume=last_volume,
+            idle=is_idle(),
+        )
+        if proc := watched_proc:
+            try:
+                heartbeat.pid = proc.pid
+                heartbeat.uptime = int(time.time() - proc.create_time())
+            except psutil.Error:
+                pass
+
+        try:
+            await publish(subjects.heartbeat, heartbeat.SerializeToString())
+        except Exception as e:
+            logging.warning(f"Error sending heartbeat: {e}")
+
+        seq += 1
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+async def handle_frame(msg):
+    # Only a few frames a second are looked at; the rest return at once
+    if idle_detector.check(msg.data, time.monotonic()):
+        logging.info(f"Screen is {'idle' if idle_detector.idle else 'active'}")
+        queue_state_event(StateEvent.Type.TYPE_IDLE)
+        await flush_state_events()
+
+async def start_listening(use_nats=True, socket_path=None):
+    global nc
+    if use_nats:
+        nc = await nats.connect(nats_url)
+
+        # Subscribe and get notified of any messages
+        await nc.subscribe(subjects.queries, cb=handle_request)
+        logging.info(f"Subscribed to '{subjects.queries}'...")
+
+        if idle_detector:
+            await nc.subscribe(subjects.frames, cb=handle_frame)
+            logging.info(f"Watching '{subjects.frames}' for idle screens...")
+    elif idle_detector:
+        logging.warning(f"Idle detection requires NATS; not watching frames")
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        await asyncio.start_unix_server(handle_socket_client, path=socket_path)
+        logging.info(f"Listening on '{socket_path}'...")
+
+    # Establish initial state, then publish changes as they happen
+    try:
+        current_volume()
+        proc, tag = find_proc_and_tag()
+        update_active(tag, proc)
+        await flush_state_events()
+    except Exception as e:
+        logging.warning(f"Error determining initial state: {e}")
+
+    watcher = asyncio.create_task(watch_state())
+    heartbeat = asyncio.create_task(send_heartbeats())
 
     # Monitor config files for changes and reload if needed
     logging.info(f"Monitoring configs for changes...")
@@ -321,6 +586,15 @@ async def start_listening():
 
         await asyncio.sleep(2)
 
+def load_configs(platform_config, game_config, cabinet=None):
+    global game_config_path, platform_config_path, cabinet_id
+    game_config_path = game_config
+    platform_config_path = platform_config
+    cabinet_id = cabinet
+
+    reload_platform_config()
+    reload_game_configs()
+
 def main():
     # Parse command-line arguments
     parser = argparse.ArgumentParser()
@@ -329,6 +603,8 @@ def main():
     parser.add_argument("--output", "-o", help="Path to logging file (default: None, logs to console)")
     parser.add_argument("--output-overwrite", "-oo", help="True to overwrite the logging file (default: False)", action="store_true", default=False)
     parser.add_argument("--log-level", "-l", help="Logging level (default: INFO)", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"])
+    parser.add_argument("--socket", "-s", help="Path of a Unix domain socket to also accept requests on, for a launcher on the same host (default: socket_path setting of the cabinet, if any)")
+    parser.add_argument("--cabinet", "-cab", help="Id of the cabinet to serve, as listed under cabinets in the platform configuration (default: cabinet setting in the platform configuration, if any)")
     args = parser.parse_args()
 
     # Set up logging
@@ -340,16 +616,10 @@ def main():
     }
     logging.basicConfig(**log_config)
 
-    global game_config_path, platform_config_path
-    game_config_path = args.game_config
-    platform_config_path = args.platform_config
-
-    # Load configuration from files
-    reload_platform_config()
-    reload_game_configs()
+    load_configs(args.platform_config, args.game_config, args.cabinet)
 
     try:
-        asyncio.run(start_listening())
+        asyncio.run(start_listening(socket_path=args.socket or socket_path))
     except KeyboardInterrupt:
         logging.info("Shutting down...")
 
@@ -0,0 +1 @@
+../shared/rpc.py
\ No newline at end of file
@@ -0,0 +1,99 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Run from the remote directory with: python3 -m unittest discover tests
+
+from generated.common_pb2 import LaunchId
+from generated.requests_pb2 import SwitchRequest
+from generated.responses_pb2 import Result
+from generated.responses_pb2 import SwitchResponse
+from unittest import mock
+import pathlib
+import psutil
+import remote
+import subprocess
+import tempfile
+import unittest
+
+class SwitchTest(unittest.TestCase):
+
+    # A switch stops the running title only once the new one is known to
+    # be launchable
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.cores_dir = pathlib.Path(self._dir.name)
+        pub = self.cores_dir / remote.LAUNCH_PROCESS_NAME
+        pub.write_text("#!/bin/sh\nexit 0\n")
+        pub.chmod(0o755)
+        roms_dir = self.cores_dir / "fbneo" / "roms"
+        roms_dir.mkdir(parents=True)
+        (self.cores_dir / "fbneo" / "fbneo.so").touch()
+        (roms_dir / "galaga.zip").touch()
+
+        # Stands in for the running title
+        self.running = subprocess.Popen([ "sleep", "30" ])
+        self.proc = psutil.Process(self.running.pid)
+
+        patches = [
+            mock.patch.object(remote, 'server_config', { 'cores_path': str(self.cores_dir), 'platforms': {} }),
+            mock.patch.object(remote, 'nats_url', "nats://127.0.0.1:4222"),
+            mock.patch.object(remote, 'active_tag', ("fbneo", "sf2")),
+            mock.patch.object(remote, 'watched_proc', self.proc),
+            mock.patch.object(remote, 'pending_events', []),
+            mock.patch.object(remote, 'find_proc_and_tag', lambda: (self.proc, [ "fbneo", "sf2" ])),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.running.kill()
+        self.running.wait()
+        self._dir.cleanup()
+
+    def switch(self, app_id, title_id):
+        request = SwitchRequest(launch_id=LaunchId(app_id=app_id, title_id=title_id))
+        response = SwitchResponse()
+        response.ParseFromString(remote.handle_topic("switch", request.SerializeToString()))
+        return response
+
+    def test_missing_core_leaves_title_running(self):
+        response = self.switch("snes9x", "smw")
+        self.assertEqual(response.result.status, Result.Status.STATUS_ERROR)
+        self.assertTrue(self.proc.is_running())
+        self.assertEqual(remote.active_tag, ("fbneo", "sf2"))
+        self.assertEqual(remote.pending_events, [])
+
+    def test_missing_rom_leaves_title_running(self):
+        response = self.switch("fbneo", "sf3")
+        self.assertEqual(response.result.status, Result.Status.STATUS_ERROR)
+        self.assertTrue(self.proc.is_running())
+
+    def test_missing_launcher_leaves_title_running(self):
+        (self.cores_dir / remote.LAUNCH_PROCESS_NAME).unlink()
+        response = self.switch("fbneo", "galaga")
+        self.assertEqual(response.result.status, Result.Status.STATUS_ERROR)
+        self.assertTrue(self.proc.is_running())
+
+    def test_switch_stops_and_launches(self):
+        response = self.switch("fbneo", "galaga")
+        self.assertEqual(response.result.status, Result.Status.STATUS_OK)
+        self.assertTrue(response.was_running)
+        self.assertEqual(response.previous.title_id, "sf2")
+        self.running.wait(timeout=5)
+        self.assertEqual(remote.active_tag, ("fbneo", "galaga"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# RPC table shared by launcher and remote. Every FooRequest in
+# requests.proto with a matching FooResponse in responses.proto is a method
+# on topic "foo", requested on subject "<prefix>.query.foo", where the
+# prefix identifies the cabinet ("red" unless configured otherwise). The
+# table is built once at import, so calls involve no name mangling or
+# class lookups.
+
+from generated.responses_pb2 import Result
+import generated.requests_pb2 as requests
+import generated.responses_pb2 as responses
+import re
+
+DEFAULT_SUBJECT_PREFIX = "red"
+# Id of the only cabinet, when none are configured; it uses the default
+# prefix
+DEFAULT_CABINET_ID = "default"
+
+class Method:
+
+    def __init__(self, topic, request_type, response_type):
+        self.topic = topic
+        self.subject = query_subject(DEFAULT_SUBJECT_PREFIX, topic)
+        self.request_type = request_type
+        self.response_type = response_type
+
+    def parse_request(self, data):
+        request = self.request_type()
+        request.ParseFromString(data)
+        return request
+
+    def parse_response(self, data):
+        response = self.response_type()
+        response.ParseFromString(data)
+        return response
+
+    def error_response(self):
+        return self.response_type(
+            result=Result(
+                status=Result.Status.STATUS_ERROR,
+            )
+        )
+
+class Dispatcher:
+
+    # Server side of the table: maps topics to handlers that take a parsed
+    # request and return a response. The table is validated against the
+    # methods up front, so a typo in a topic fails at startup.
+
+    def __init__(self, handlers):
+        self._table = {}
+        for topic, handler in handlers.items():
+            if topic not in TOPICS:
+                raise ValueError(f"No RPC method for topic: {topic}")
+            self._table[topic] = (TOPICS[topic], handler)
+
+    def lookup(self, topic):
+        if not (entry := self._table.get(topic)):
+            raise ValueError(f"Unrecognized topic: {topic}")
+        return entry
+
+class Subjects:
+
+    # All subjects used by one cabinet, computed once per prefix
+
+    def __init__(self, prefix=DEFAULT_SUBJECT_PREFIX):
+        self.prefix = prefix
+        self.queries = query_subject(prefix, '*')
+        self.state = f"{prefix}.state"
+        self.heartbeat = f"{prefix}.heartbeat"
+        self.frames = f"{prefix}.frames"
+        self.pub_request = f"{prefix}.pub.request"
+        self._queries = { topic: query_subject(prefix, topic) for topic in TOPICS }
+
+    def query(self, topic):
+        return self._queries[topic]
+
+def cabinet_prefix(cabinet_id):
+    # Prefix of a cabinet configured without one
+    return f"{DEFAULT_SUBJECT_PREFIX}.{cabinet_id}"
+
+def query_subject(prefix, topic):
+    return f"{prefix}.query.{topic}"
+
+def topic_name(name):
+    # "SetVolume" -> "set_volume"
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', name).lower()
+
+def build_methods():
+    methods = {}
+    response_names = responses.DESCRIPTOR.message_types_by_name
+    for name in requests.DESCRIPTOR.message_types_by_name:
+        if not name.endswith('Request'):
+            continue
+        base_name = name.removesuffix('Request')
+        if f"{base_name}Response" not in response_names:
+            continue
+        request_type = getattr(requests, name)
+        methods[request_type] = Method(
+            topic_name(base_name),
+            request_type,
+            getattr(responses, f"{base_name}Response"),
+        )
+    return methods
+
+# Keyed by request class
+METHODS = build_methods()
+# Keyed by topic
+TOPICS = { method.topic: method for method in METHODS.values() }
+
+def method_for(request):
+    return METHODS[type(request)]
@@ -0,0 +1,37 @@
+# Copyright (C) 2026 Akop Karapetyan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Framing for talking to the remote over a Unix domain socket, for when
+# launcher and remote share a host. Messages mirror NATS messages: a
+# subject and opaque data, plus an id matching responses to requests.
+# Messages the remote sends unprompted (state events, heartbeats) carry
+# PUSH_ID, as do those a client publishes through the remote.
+
+import struct
+
+DEFAULT_SOCKET_PATH = "/tmp/red-remote.sock"
+PUSH_ID = 0
+
+# id(u32), subject length(u16), data length(u32)
+HEADER = struct.Struct("<IHI")
+
+def encode(id, subject, data):
+    subject = subject.encode()
+    return HEADER.pack(id, len(subject), len(data)) + subject + data
+
+async def read(reader):
+    # Raises asyncio.IncompleteReadError once the peer disconnects
+    id, subject_len, data_len = HEADER.unpack(await reader.readexactly(HEADER.size))
+    body = await reader.readexactly(subject_len + data_len)
+    return id, body[:subject_len].decode(), body[subject_len:]